@@ -0,0 +1,89 @@
+# Decode the lines of a (huge) gcode file in parallel chunks (see: gdecoder --jobs)
+#
+# The decoded text of a line doesn't depend on the PrinterModel, so the text is created by worker processes,
+# each for a chunk of lines (the file is split at line boundaries).
+# The PrinterModel changes are applied afterwards by the main process, line by line in the original order
+# (see: GDecoderLine.apply_gcode_line), so the result is the same as decoding the file in a single process.
+# The main process also formats the lines: the gcode column may grow while reading (see: create_line_formatter).
+#
+# Generator dependent commands (e.g. M204) need the meta infos of all previous lines:
+# only the worker of the first chunk knows them, for all other chunks the main process decodes these lines.
+
+from FileMetaInfos import FileMetaInfos
+from GCodeTokenizer import tokenize_line
+from GDecoderLine import GDecoderLine
+from collections import deque
+import io
+import os
+
+# approximate size of a chunk (bytes)
+CHUNK_SIZE = 256 * 1024
+
+
+def split_chunks(file_name, chunk_size=CHUNK_SIZE):
+    # (start, end) byte offsets, each chunk ends after a line break (or at the end of the file)
+    chunks = []
+    file_size = os.path.getsize(file_name)
+    start = 0
+    with open(file_name, 'rb') as file1:
+        while start < file_size:
+            file1.seek(start + chunk_size)
+            file1.readline()
+            end = min(file1.tell(), file_size)
+            chunks.append((start, end))
+            start = end
+    return chunks
+
+
+def decode_chunk(file_name, start, end, first_chunk, stop_on_undecoded):
+    # worker: the decoded text of each line of the chunk ("" for a comment line),
+    # None if it must be decoded by the main process
+    # if decoding a line fails, the exception is returned (instead of the texts of the remaining lines)
+    meta_infos = FileMetaInfos()
+    decode_line = GDecoderLine()
+    decode_line.stop_on_undecoded = stop_on_undecoded
+    decoded_texts = []
+
+    with open(file_name, 'rb') as file1:
+        file1.seek(start)
+        data = file1.read(end - start)
+
+    # same line breaks as reading the file in text mode (universal newlines)
+    try:
+        for raw_line in io.StringIO(data.decode('utf-8'), newline=None):
+            line, splitted = tokenize_line(raw_line)
+            meta_infos.process_stripped_line(raw_line, line)
+
+            if splitted is None:
+                decoded_texts.append("")
+                continue
+
+            if not first_chunk and _is_generator_dependent(decode_line, splitted):
+                decoded_texts.append(None)
+                continue
+
+            decoded_texts.append(decode_line.decode_gcode_text(meta_infos, line, splitted))
+    except Exception as exception:
+        return decoded_texts, exception
+
+    return decoded_texts, None
+
+
+def _is_generator_dependent(decode_line, splitted):
+    if len(splitted) == 0:
+        return False
+    command = decode_line.commands.get(splitted[0])
+    return command is not None and command.generators is not None
+
+
+def decode_chunks(executor, file_name, args, window):
+    # decode all chunks in the process pool, the results are returned in the file order
+    # (at most "window" chunks are decoded in advance, so the memory usage doesn't depend on the file size)
+    pending = deque()
+    for index, (start, end) in enumerate(split_chunks(file_name)):
+        pending.append(executor.submit(decode_chunk, file_name, start, end, index == 0, args.stopOnUndecoded))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+
+    while pending:
+        yield pending.popleft().result()
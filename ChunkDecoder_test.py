@@ -0,0 +1,69 @@
+from ChunkDecoder import decode_chunk
+from ChunkDecoder import split_chunks
+import pytest
+pytestmark = pytest.mark.unittests
+
+
+def write_gcode(tmp_path, text):
+    file_name = tmp_path / "test.gcode"
+    file_name.write_bytes(text.encode('utf-8'))
+    return str(file_name)
+
+
+def test_split_chunks_at_line_breaks(tmp_path):
+    # arrange
+    file_name = write_gcode(tmp_path, "G90\nG1 X1\r\nG1 X2\nM84")
+
+    # act
+    chunks = split_chunks(file_name, 2)
+
+    # assert
+    assert(chunks) == [(0, 4), (4, 11), (11, 17), (17, 20)]
+
+
+def test_split_chunks_empty_file(tmp_path):
+    # arrange
+    file_name = write_gcode(tmp_path, "")
+
+    # act
+    chunks = split_chunks(file_name)
+
+    # assert
+    assert(chunks) == []
+
+
+def test_decode_chunk_outputs(tmp_path):
+    # arrange
+    file_name = write_gcode(tmp_path, "; comment\r\nG90\n\nM84\n")
+
+    # act
+    decoded_texts, error = decode_chunk(file_name, 0, 22, True, False)
+
+    # assert
+    assert(decoded_texts) == ["", "Set to Absolute Positioning", "", "Stop idle hold (disable motors)"]
+    assert(error) is None
+
+
+def test_decode_chunk_generator_dependent_decoded_in_first_chunk_only(tmp_path):
+    # arrange
+    file_name = write_gcode(tmp_path, "; generated by PrusaSlicer\nM204 S1000\n")
+
+    # act
+    first_decoded_texts, first_error = decode_chunk(file_name, 0, 38, True, False)
+    decoded_texts, error = decode_chunk(file_name, 0, 38, False, False)
+
+    # assert
+    assert(first_decoded_texts) == ["", "Set default acceleration, normal: 1000 mm/s²"]
+    assert(decoded_texts) == ["", None]
+
+
+def test_decode_chunk_stop_on_undecoded_error(tmp_path):
+    # arrange
+    file_name = write_gcode(tmp_path, "G90\nX1\nG91\n")
+
+    # act
+    decoded_texts, error = decode_chunk(file_name, 0, 11, True, True)
+
+    # assert
+    assert(decoded_texts) == ["Set to Absolute Positioning"]
+    assert(error.args[0]) == "Unknown gcode: X1"
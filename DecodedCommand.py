@@ -0,0 +1,44 @@
+# A decoded gcode line as a compact record (see: GDecoderLine.decode_gcode_command)
+#
+# The command word, the parameters as numbers, the line number and the diagnostics (error messages) are known
+# right after decoding, e.g. for the summary or other analyzers. The human readable text (the same as
+# GDecoderLine.decode_gcode_line) is only created when it's used: most lines are never shown.
+
+
+class DecodedCommand:
+    __slots__ = ("word", "parameters", "line_number", "diagnostics", "_text", "_render")
+
+    def __init__(self, word, parameters, line_number=None, diagnostics=None, text=None, render=None):
+        # e.g. "G1"
+        self.word = word
+        # parameter letter -> float, None if the value is no number (e.g. G28 W)
+        self.parameters = parameters
+        self.line_number = line_number
+        self.diagnostics = diagnostics if diagnostics is not None else []
+        # the text, or a function creating it
+        self._text = text
+        self._render = render
+
+    @property
+    def text(self):
+        if self._text is None:
+            self._text = self._render() if self._render is not None else ""
+            self._render = None
+        return self._text
+
+    def get(self, letter, default=None):
+        # value of a parameter, default if it's not given
+        value = self.parameters.get(letter)
+        return default if value is None else value
+
+    def to_dict(self):
+        # JSON serializable, without the text
+        return {
+            "line": self.line_number,
+            "command": self.word,
+            "parameters": self.parameters,
+            "diagnostics": self.diagnostics,
+        }
+
+    def __repr__(self):
+        return "DecodedCommand(" + self.word + ", " + repr(self.parameters) + ", line " + str(self.line_number) + ")"
@@ -0,0 +1,60 @@
+from DecodedCommand import DecodedCommand
+import json
+import pytest
+pytestmark = pytest.mark.unittests
+
+
+def test_text_rendered_once():
+    # arrange
+    calls = []
+
+    def render():
+        calls.append(1)
+        return "Linear Move (print)"
+    decoded = DecodedCommand("G1", {}, render=render)
+
+    # act
+    texts = [decoded.text, decoded.text]
+
+    # assert
+    assert(texts) == ["Linear Move (print)"] * 2
+    assert(len(calls)) == 1
+
+
+def test_text_given():
+    # act
+    decoded = DecodedCommand("X1", {}, 3, ["Unknown gcode: X1"], text="Unknown gcode: X1")
+
+    # assert
+    assert(decoded.text) == "Unknown gcode: X1"
+
+
+def test_get_default_for_missing_and_no_number():
+    # arrange
+    decoded = DecodedCommand("G28", {"X": 0.0, "W": None})
+
+    # act / assert
+    assert(decoded.get("X", 5)) == 0
+    assert(decoded.get("W", 5)) == 5
+    assert(decoded.get("Y")) is None
+
+
+def test_to_dict_json_serializable():
+    # arrange
+    decoded = DecodedCommand("G1", {"X": 1.5, "F": 1200.0}, 7, ["Unknown subtoken: Q in: ['G1', 'Q']"])
+
+    # act
+    data = json.loads(json.dumps(decoded.to_dict()))
+
+    # assert
+    assert(data) == {"line": 7, "command": "G1", "parameters": {"X": 1.5, "F": 1200.0},
+                     "diagnostics": ["Unknown subtoken: Q in: ['G1', 'Q']"]}
+
+
+def test_slots_no_instance_dict():
+    # act
+    decoded = DecodedCommand("G1", {})
+
+    # assert
+    with pytest.raises(AttributeError):
+        decoded.other = 1
@@ -1,6 +1,64 @@
 # Analyze meta infos from the .gcode input file
-
+#
+# The infos are collected line by line while the file is decoded (see: process_line),
+# so the file is only read once and never kept in memory as a whole.
+# The input can also be stdin (a pipe): the infos are complete after the last line (e.g. the size is counted).
+
+import bz2
+import gzip
+import hashlib
+import io
+import lzma
+import mmap
 import os
+import re
+import sys
+import time
+
+# input file name of stdin
+STDIN = "-"
+
+# the text of a line (without the line break) with at least N bytes, starting at the start of a line
+# (universal newlines: the line break is LF, CR LF or CR)
+_LONG_LINE = rb"(?<![^\r\n])[^\r\n]{%d,}"
+
+# compressed gcode files are decompressed as a stream while reading (no temporary file, not in memory as a whole)
+_COMPRESSED_OPENERS = {".gz": gzip.open, ".bz2": bz2.open, ".xz": lzma.open}
+
+
+def is_compressed(file_name):
+    return os.path.splitext(file_name)[1].lower() in _COMPRESSED_OPENERS
+
+
+def open_gcode(file_name, binary=False):
+    # text mode: UTF-8 and universal newlines, the same for plain and compressed files
+    opener = _COMPRESSED_OPENERS.get(os.path.splitext(file_name)[1].lower(), open)
+    if binary:
+        return opener(file_name, 'rb')
+    return opener(file_name, 'rt', encoding='utf-8')
+
+
+class _ByteCounter(io.RawIOBase):
+    # raw stream counting the bytes read into the file size of the meta infos (stdin has no size in advance)
+
+    def __init__(self, stream, meta_infos):
+        self.stream = stream
+        self.meta_infos = meta_infos
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        # the data already available, don't wait until the buffer is full (a pipe from a slicer)
+        count = self.stream.readinto1(buffer)
+        if count:
+            self.meta_infos.file_size += count
+        return count
+
+
+def is_layer_change_comment(line):
+    # (stripped) comment line at the start of a new layer: PrusaSlicer ";LAYER_CHANGE", Cura ";LAYER:<number>"
+    return line.startswith(";LAYER_CHANGE") or line.startswith(";LAYER:")
 
 
 class FileMetaInfos:
@@ -14,6 +72,7 @@ class FileMetaInfos:
     modified_time = ""
     longest_line = 0
     line_count = 0
+    content_hash = ""
 
     def _decode_comment_line(self, line):
         if "Generated with Cura_SteamEngine" in line:
@@ -36,8 +95,10 @@ class FileMetaInfos:
             return
 
     def _decode_line(self, line):
+        self._decode_stripped_line(line, line.strip())
+
+    def _decode_stripped_line(self, line, stripped_line):
         current_len = len(line)
-        stripped_line = line.strip()
 
         if stripped_line.startswith(";"):
             self._decode_comment_line(stripped_line)
@@ -45,16 +106,95 @@ class FileMetaInfos:
             if current_len > self.longest_line and len(stripped_line) > 0:
                 self.longest_line = current_len
 
-    def read_meta_infos(self, file_name):
-        self.file_name = file_name
-
-        file1 = open(file_name, 'r', encoding='utf-8')
-        lines = file1.readlines()
+    def read_file_infos(self, file_name):
+        if file_name == STDIN:
+            # the size is counted while reading (see: open_input)
+            self.file_name = "<stdin>"
+            self.file_size = 0
+            self.modified_time = time.time()
+            return
 
+        self.file_name = file_name
         self.file_size = os.path.getsize(file_name)
         self.modified_time = os.path.getmtime(file_name)
 
-        for line in lines:
-            self.line_count += 1
+    def open_input(self, file_name, binary=False):
+        # same as open_gcode, for stdin as well
+        if file_name != STDIN:
+            return open_gcode(file_name, binary)
+
+        stream = io.BufferedReader(_ByteCounter(sys.stdin.buffer, self))
+        if binary:
+            return stream
+        return io.TextIOWrapper(stream, encoding='utf-8')
+
+    def read_content_hash(self, file_name):
+        # fast hash of the file content (e.g. to cache results of the same file, see: ResultCache)
+        content_hash = hashlib.blake2b(digest_size=20)
+        with open(file_name, 'rb') as file1:
+            while True:
+                block = file1.read(1024 * 1024)
+                if not block:
+                    break
+                content_hash.update(block)
+        self.content_hash = content_hash.hexdigest()
+        return self.content_hash
+
+    def process_line(self, line):
+        self.process_stripped_line(line, line.strip())
+
+    def process_stripped_line(self, line, stripped_line):
+        # same as process_line, the line is already stripped (see: tokenize_line)
+        self.line_count += 1
+
+        self._decode_stripped_line(line, stripped_line)
+
+    def process_bytes_line(self, raw_line, stripped_line):
+        # same as process_line, for a line read in binary mode (stripped_line: raw_line.strip())
+        # only comment lines and non-ASCII lines are decoded, for all others the byte count is the length
+        if stripped_line.startswith(b";") or not raw_line.isascii():
+            line = raw_line.decode('utf-8')
+            # same line length as in text mode (universal newlines)
+            if line.endswith("\r\n"):
+                line = line[:-2] + "\n"
+            self.process_line(line)
+            return
+
+        self.line_count += 1
+        current_len = len(raw_line) - 1 if raw_line.endswith(b"\r\n") else len(raw_line)
+        if current_len > self.longest_line and stripped_line:
+            self.longest_line = current_len
+
+    def scan_longest_line(self, file_name):
+        # The column width of the decoded output must be known before the first line is printed
+        # (a plain file only, stdin or a compressed file is read only once).
+        # The memory mapped bytes are searched for lines longer than the longest so far (the loop over all lines is
+        # done by the regular expression), only these lines are decoded.
+        # (the character count of a line is never larger than its byte count)
+        longest_line = 0
+        with open(file_name, 'rb') as file1:
+            if os.fstat(file1.fileno()).st_size == 0:
+                # an empty file can't be mapped
+                return 0
+            with mmap.mmap(file1.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                # a line is longer if its text has at least as many characters (the line break is counted, too)
+                long_line = re.compile(_LONG_LINE % max(longest_line, 1))
+                match = long_line.search(data)
+                while match is not None:
+                    line = match.group().decode('utf-8')
+                    stripped_line = line.strip()
+                    # same line length as in text mode (the last line may have no line break)
+                    length = len(line) + (1 if match.end() < len(data) else 0)
+                    if length > longest_line and stripped_line and not stripped_line.startswith(";"):
+                        longest_line = length
+                        long_line = re.compile(_LONG_LINE % longest_line)
+                    match = long_line.search(data, match.end())
+
+        return longest_line
+
+    def read_meta_infos(self, file_name):
+        self.read_file_infos(file_name)
 
-            self._decode_line(line)
+        with self.open_input(file_name) as file1:
+            for line in file1:
+                self.process_line(line)
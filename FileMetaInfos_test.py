@@ -1,4 +1,9 @@
 from FileMetaInfos import FileMetaInfos
+from FileMetaInfos import is_compressed
+import bz2
+import gzip
+import io
+import lzma
 import pytest
 pytestmark = pytest.mark.unittests
 
@@ -108,3 +113,115 @@ def test__decode_line_generator_line():
     assert(meta_infos.generator_line) == line
     assert(meta_infos.generator) == "PrusaSlicer"
     assert(meta_infos.longest_line) == 0
+
+
+def test_process_line_counts_lines():
+    # arrange
+    meta_infos = FileMetaInfos()
+
+    # act
+    meta_infos.process_line("; generated by PrusaSlicer\n")
+    meta_infos.process_line("G1 X1\n")
+    meta_infos.process_line("\n")
+
+    # assert
+    assert(meta_infos.line_count) == 3
+    assert(meta_infos.generator) == "PrusaSlicer"
+    assert(meta_infos.longest_line) == 6
+
+
+def test_process_stripped_line_same_as_process_line():
+    # arrange
+    lines = ["; generated by PrusaSlicer\n", "  G1 X1 ; move\n", "\n", "   \n", "G28\n"]
+    meta_infos = FileMetaInfos()
+    expected_meta_infos = FileMetaInfos()
+
+    # act
+    for line in lines:
+        meta_infos.process_stripped_line(line, line.strip())
+        expected_meta_infos.process_line(line)
+
+    # assert
+    assert(meta_infos.line_count) == expected_meta_infos.line_count == 5
+    assert(meta_infos.generator) == expected_meta_infos.generator
+    assert(meta_infos.longest_line) == expected_meta_infos.longest_line == 15
+
+
+def test_read_meta_infos_file(tmp_path):
+    # arrange
+    meta_infos = FileMetaInfos()
+    file_name = tmp_path / "test.gcode"
+    file_name.write_text(";Generated with Cura_SteamEngine 5.5.0\n;FLAVOR:Marlin\nG1 X1 Y2\nG28\n", encoding="utf-8")
+
+    # act
+    meta_infos.read_meta_infos(str(file_name))
+
+    # assert
+    assert(meta_infos.file_name) == str(file_name)
+    assert(meta_infos.file_size) == 67
+    assert(meta_infos.line_count) == 4
+    assert(meta_infos.longest_line) == 9
+    assert(meta_infos.generator) == "Cura"
+    assert(meta_infos.generator_flavor) == "Marlin"
+
+
+scan_longest_line_testdata = [
+    ("G1 X1 Y2\nG28\n", 9),
+    ("G28\nG1 X1 Y2", 8),                          # last line without newline
+    ("G28\r\nG1 X1 Y2\r\n", 9),                    # same length as in text mode
+    ("G28\rG1 X1 Y2\rG1\r", 9),                     # (old Mac) CR only line breaks
+    ("; a very long comment line\nG28\n", 4),      # comment lines are ignored
+    ("G28\n                              \n", 4),  # whitespace only lines are ignored
+    ("M117 äöü\n", 9),                             # characters, not bytes
+    ("M117 äöü\nM117 abcd\n", 10),
+    ("", 0),
+]
+
+
+@pytest.mark.parametrize("content,expected_longest", scan_longest_line_testdata)
+def test_scan_longest_line_same_as_decode_line(tmp_path, content, expected_longest):
+    # arrange
+    meta_infos = FileMetaInfos()
+    file_name = tmp_path / "test.gcode"
+    file_name.write_bytes(content.encode("utf-8"))
+
+    # act
+    longest_line = meta_infos.scan_longest_line(str(file_name))
+
+    # assert
+    assert(longest_line) == expected_longest
+    meta_infos.read_meta_infos(str(file_name))
+    assert(meta_infos.longest_line) == expected_longest
+
+
+@pytest.mark.parametrize("extension, compress", [(".gz", gzip.compress), (".bz2", bz2.compress), (".xz", lzma.compress)])
+def test_read_meta_infos_compressed_file(tmp_path, extension, compress):
+    # arrange
+    meta_infos = FileMetaInfos()
+    file_name = tmp_path / ("test.gcode" + extension)
+    file_name.write_bytes(compress(";generated by PrusaSlicer\r\nG1 X1 Y2\r\nG28\r\n".encode("utf-8")))
+
+    # act
+    meta_infos.read_meta_infos(str(file_name))
+
+    # assert
+    assert(is_compressed(str(file_name))) is True
+    assert(meta_infos.line_count) == 3
+    assert(meta_infos.longest_line) == 9
+    assert(meta_infos.generator) == "PrusaSlicer"
+
+
+def test_read_meta_infos_stdin(monkeypatch):
+    # arrange
+    meta_infos = FileMetaInfos()
+    monkeypatch.setattr("sys.stdin", io.TextIOWrapper(io.BytesIO(b";generated by PrusaSlicer\nG1 X1 Y2\nG28\n")))
+
+    # act
+    meta_infos.read_meta_infos("-")
+
+    # assert
+    assert(meta_infos.file_name) == "<stdin>"
+    assert(meta_infos.file_size) == 39
+    assert(meta_infos.line_count) == 3
+    assert(meta_infos.longest_line) == 9
+    assert(meta_infos.generator) == "PrusaSlicer"
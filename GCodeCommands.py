@@ -0,0 +1,474 @@
+# Table of the known gcode commands
+#
+# Each command word (e.g. "G1") is mapped to a GCodeCommand, the parameters of a command are
+# described declaratively by GCodeParameter (label, unit, PrinterModel setter).
+# GDecoderLine needs a single dict lookup to find the command, the text formatting is shared.
+# Each command prepares its handler functions once (closures), a line only looks up its parameter letters.
+#
+# Hint: Many gcode details can be found at:
+# https://reprap.org/wiki/G-code
+# https://marlinfw.org/meta/gcode/
+
+from printer_model.PrinterModel import PrinterModel
+
+
+# the messages of the decoding errors (see: GDecoderLine.error_...)
+
+def subtoken_error_message(splitted, token):
+    return "Unknown subtoken: " + token + " in: " + str(splitted)
+
+
+def generator_error_message(meta_infos, splitted):
+    return "Unexpected generator " + meta_infos.generator + " for firmware dependent: " + str(splitted)
+
+
+def out_of_range_error_message(line, value):
+    return "Value " + value + " out of range in: " + line
+
+
+def _number(value):
+    # a parameter value as float, None if it's no number (e.g. G28 W)
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+class GCodeParameter:
+    __slots__ = ("label", "unit", "setter", "show_value", "prefix", "suffix")
+
+    def __init__(self, label, unit="", setter=None, show_value=True):
+        # decoded text: ", " + label + value + " " + unit
+        self.label = label
+        self.unit = unit
+        # PrinterModel method called with the value as float, e.g. PrinterModel.set_feedrate
+        self.setter = setter
+        self.show_value = show_value
+        # precompiled text parts
+        self.prefix = ", " + label
+        self.suffix = " " + unit if unit != "" else ""
+
+    def describe(self, decoder, line, value):
+        if self.show_value:
+            return self.prefix + value + self.suffix
+        return self.prefix + self.suffix
+
+    def check(self, line, value):
+        # the error message of an invalid value (see: describe), None if it's valid
+        return None
+
+
+class StepperCurrentParameter(GCodeParameter):
+    # the unit of the stepper current depends on the value range
+
+    def describe(self, decoder, line, value):
+        decoded = ""
+        current = float(value)
+        if current <= 2.50:
+            unit = "A"
+        elif current <= 200:
+            unit = "%"
+        elif current <= 2500:
+            unit = "mA"
+        else:
+            decoded += decoder.error_value_out_of_range(line, value)
+            unit = "?"
+        return decoded + self.prefix + value + " " + unit
+
+    def check(self, line, value):
+        current = _number(value)
+        if current is not None and current > 2500:
+            return out_of_range_error_message(line, value)
+        return None
+
+
+class GCodeCommand:
+    __slots__ = ("title", "parameters", "model_call", "model_args", "empty_value", "generators", "cura_needs_marlin",
+                 "handler", "text_handler", "model_handler", "record_handler")
+
+    def __init__(self, title, parameters=None, model_call=None, model_args="", empty_value=None, generators=None,
+                 cura_needs_marlin=False):
+        self.title = title
+        # parameter letter -> GCodeParameter
+        self.parameters = parameters if parameters is not None else {}
+        # PrinterModel method called after the parameter setters, with the values of the model_args letters
+        # (e.g. PrinterModel.move with "XYZ") as floats, None for a parameter not given in the line
+        self.model_call = model_call
+        self.model_args = model_args
+        # model_call value of a parameter letter without a value (e.g. "G1 X"), None: as if not given
+        # (the setters are skipped)
+        self.empty_value = empty_value
+        # firmware dependent commands: generators known to create this command
+        self.generators = generators
+        self.cura_needs_marlin = cura_needs_marlin
+
+        # function(decoder, meta_infos, line, splitted, printer) -> decoded text
+        self.handler = self._create_handler()
+        # the same split into the text part (no PrinterModel changes) and the PrinterModel part (no text)
+        self.text_handler = self._create_handler(model=False)
+        self.model_handler = self._create_handler(text=False)
+        # function(decoder, meta_infos, line, splitted, printer) -> parameters, diagnostics
+        # (the PrinterModel part and the parsed line, see: GDecoderLine.decode_gcode_command)
+        self.record_handler = self._create_record_handler()
+
+    def check_generator(self, decoder, meta_infos, splitted):
+        decoded = ""
+        for check in range(self._generator_error_count(meta_infos)):
+            decoded += decoder.error_firmware_dependent_but_unknown_generator(meta_infos, splitted) + " "
+        return decoded
+
+    def _generator_error_count(self, meta_infos):
+        # unexpected generator, Cura without Marlin flavor
+        if self.generators is None:
+            return 0
+        count = 0 if meta_infos.generator in self.generators else 1
+        if self.cura_needs_marlin and meta_infos.generator == "Cura" and meta_infos.generator_flavor != "Marlin":
+            count += 1
+        return count
+
+    def _generator_diagnostics(self, decoder, meta_infos, splitted):
+        return [decoder.error(generator_error_message(meta_infos, splitted))
+                for check in range(self._generator_error_count(meta_infos))]
+
+    def _create_handler(self, text=True, model=True):
+        # a handler function specialized for this command, the parts needed for each line are prepared once
+        # (a handler without text returns None)
+        apply_values = self._create_model_function() if model else None
+        if not text:
+            return _no_model_effects if apply_values is None else self._create_model_handler(apply_values)
+
+        title = self.title
+        check_generator = self.check_generator if self.generators is not None else None
+        # parameter letter -> index of its value in the values of a line
+        indexes = {key: index for index, key in enumerate(self.parameters)}
+        describers = [parameter.describe for parameter in self.parameters.values()]
+        # hint: the last value is always None (see: _create_model_function)
+        count = len(indexes) + 1
+
+        def handler(decoder, meta_infos, line, splitted, printer):
+            decoded = title if check_generator is None else check_generator(decoder, meta_infos, splitted) + title
+            values = [None] * count
+            for token in splitted[1:]:
+                index = indexes.get(token[0])
+                if index is None:
+                    decoded += decoder.error_undecoded_gcode_subtoken(splitted, token)
+                    continue
+                value = values[index] = token[1:]
+                decoded += describers[index](decoder, line, value)
+            if apply_values is not None:
+                apply_values(printer, values)
+            return decoded
+
+        return handler
+
+    def _create_model_handler(self, apply_values):
+        # the PrinterModel part only: unknown parameters are ignored
+        indexes = {key: index for index, key in enumerate(self.parameters)}
+        count = len(indexes) + 1
+
+        def handler(decoder, meta_infos, line, splitted, printer):
+            values = [None] * count
+            for token in splitted[1:]:
+                index = indexes.get(token[0])
+                if index is not None:
+                    values[index] = token[1:]
+            apply_values(printer, values)
+
+        return handler
+
+    def _create_record_handler(self):
+        # the PrinterModel part, the values as numbers (letter -> float, None if it's no number) and the same
+        # errors as in the decoded text (raised if decoder.stop_on_undecoded), in a single pass over the tokens
+        apply_values = self._create_model_function()
+        generator_diagnostics = self._generator_diagnostics if self.generators is not None else None
+        indexes = {key: index for index, key in enumerate(self.parameters)}
+        checks = [parameter.check for parameter in self.parameters.values()]
+        count = len(indexes) + 1
+
+        def handler(decoder, meta_infos, line, splitted, printer):
+            diagnostics = [] if generator_diagnostics is None else generator_diagnostics(decoder, meta_infos, splitted)
+            values = [None] * count
+            parameters = {}
+            for token in splitted[1:]:
+                index = indexes.get(token[0])
+                if index is None:
+                    diagnostics.append(decoder.error(subtoken_error_message(splitted, token)))
+                    continue
+                value = values[index] = token[1:]
+                parameters[token[0]] = _number(value)
+                message = checks[index](line, value)
+                if message is not None:
+                    diagnostics.append(decoder.error(message))
+            if apply_values is not None:
+                apply_values(printer, values)
+            return parameters, diagnostics
+
+        return handler
+
+    def _create_model_function(self):
+        # function(printer, values) applying the value texts (in the order of the parameters, None: not given,
+        # followed by a None) to the PrinterModel, None if the command doesn't change it
+        setters = [(index, parameter.setter) for index, parameter in enumerate(self.parameters.values())
+                   if parameter.setter is not None]
+        model_call = self.model_call
+        empty_value = self.empty_value
+        if not setters and model_call is None:
+            return None
+        keys = list(self.parameters)
+        # a model_args letter which isn't a parameter: the last value (None)
+        arguments = [keys.index(key) if key in keys else len(keys) for key in self.model_args]
+
+        def apply_values(printer, values):
+            for index, setter in setters:
+                value = values[index]
+                if value:
+                    setter(printer, float(value))
+            if model_call is not None:
+                model_call(printer, *[_model_value(values[index], empty_value) for index in arguments])
+
+        return apply_values
+
+
+def _model_value(value, empty_value):
+    # the value text as float, None: not given, "": a parameter letter without a value
+    if value is None:
+        return None
+    return float(value) if value else empty_value
+
+
+def _no_model_effects(decoder, meta_infos, line, splitted, printer):
+    return None
+
+
+class MessageCommand(GCodeCommand):
+    # the rest of the line is a message text, not a list of parameters
+
+    def _create_handler(self, text=True, model=True):
+        return self._decode_message if text else _no_model_effects
+
+    def _create_record_handler(self):
+        return self._parse_message
+
+    def _parse_message(self, decoder, meta_infos, line, splitted, printer):
+        return {}, []
+
+    def _decode_message(self, decoder, meta_infos, line, splitted, printer):
+        return self.title + ": \"" + line[5:] + "\""
+
+
+class UndecodedCommand(GCodeCommand):
+    # known command, but the parameters are not decoded (yet)
+
+    def _create_handler(self, text=True, model=True):
+        return self._decode_undecoded if text else _no_model_effects
+
+    def _create_record_handler(self):
+        return self._parse_undecoded
+
+    def _parse_undecoded(self, decoder, meta_infos, line, splitted, printer):
+        return {}, self._generator_diagnostics(decoder, meta_infos, splitted)
+
+    def _decode_undecoded(self, decoder, meta_infos, line, splitted, printer):
+        return self.check_generator(decoder, meta_infos, splitted) + self.title + ": " + str(splitted)
+
+
+def _absolute_positioning(printer):
+    printer.set_positioning_mode("absolute")
+
+
+def _relative_positioning(printer):
+    printer.set_positioning_mode("relative")
+
+
+def _absolute_extruder(printer):
+    printer.set_extruder_move_mode("absolute")
+
+
+def _relative_extruder(printer):
+    printer.set_extruder_move_mode("relative")
+
+
+def _fan_off(printer):
+    printer.set_fan(0.0)
+
+
+# parameters used by several commands
+FEEDRATE = GCodeParameter("Feedrate: ", "mm/min", setter=PrinterModel.set_feedrate)
+POSITION_E = GCodeParameter("E: ", "mm")
+POSITION_X = GCodeParameter("X: ", "mm")
+POSITION_Y = GCodeParameter("Y: ", "mm")
+POSITION_Z = GCodeParameter("Z: ", "mm")
+ARC_I = GCodeParameter("I (distant X): ")
+ARC_J = GCodeParameter("J (distant Y): ")
+ARC_R = GCodeParameter("R (radius): ")
+ARC_X = GCodeParameter("X:")
+ARC_Y = GCodeParameter("Y:")
+EXTRUDER_TARGET = GCodeParameter("Target: ", "°C", setter=PrinterModel.set_extruder_temperature)
+
+
+def _time_estimator_setter(method_name, letter):
+    # setter passing the parameter letter and value to a PrintTimeEstimator method, e.g. set_jerk("X", value)
+    def setter(printer, value):
+        getattr(printer.time_estimator, method_name)(letter, value)
+    return setter
+
+
+def _axes_parameters(unit, method_name=None):
+    return {
+        axis: GCodeParameter(axis + ": ", unit,
+                             setter=_time_estimator_setter(method_name, axis) if method_name is not None else None)
+        for axis in "EXYZ"
+    }
+
+
+GCODE_COMMANDS = {
+    # G0: Rapid Move
+    # https://marlinfw.org/docs/gcode/G000-G001.html
+    "G0": GCodeCommand("Rapid Move (no print)", {
+        "X": POSITION_X, "Y": POSITION_Y, "Z": POSITION_Z, "F": FEEDRATE,
+    }, model_call=PrinterModel.move, model_args="XYZ"),
+    # G1: Linear Move
+    # https://marlinfw.org/docs/gcode/G000-G001.html
+    "G1": GCodeCommand("Linear Move (print)", {
+        "X": POSITION_X, "Y": POSITION_Y, "Z": POSITION_Z, "E": POSITION_E, "F": FEEDRATE,
+    }, model_call=PrinterModel.print_linear, model_args="XYZE"),
+    # G2: Controlled Clockwise Arc Move
+    "G2": GCodeCommand("Clockwise Arc Move (print)", {
+        "X": ARC_X, "Y": ARC_Y, "I": ARC_I, "J": ARC_J, "R": ARC_R, "E": POSITION_E, "F": FEEDRATE,
+    }, model_call=PrinterModel.print_cw, model_args="XYIJRE"),
+    # G3: Controlled Counter-Clockwise Arc Move
+    "G3": GCodeCommand("Counter-Clockwise Arc Move (print)", {
+        "X": ARC_X, "Y": ARC_Y, "I": ARC_I, "J": ARC_J, "R": ARC_R, "E": POSITION_E, "F": FEEDRATE,
+    }, model_call=PrinterModel.print_ccw, model_args="XYIJRE"),
+    # G4: Dwell (aka Pause)
+    # https://marlinfw.org/docs/gcode/G004.html
+    "G4": GCodeCommand("Dwell (aka: Pause)", {
+        "P": GCodeParameter("duration: ", "ms", setter=PrinterModel.dwell_milliseconds),
+        "S": GCodeParameter("duration: ", "s", setter=PrinterModel.dwell),
+    }),
+    # G21: Set Units to Millimeters
+    "G21": GCodeCommand("Set Units to Millimeters"),
+    # G28: Move to Origin (Home)
+    # https://all3dp.com/2/g28-g-code-homing/
+    # https://marlinfw.org/docs/gcode/G028.html
+    # https://cncphilosophy.com/g28-g-code-demystified/
+    # "G28 X Y": home X and Y (without a value, like X0 Y0)
+    "G28": GCodeCommand("Move to Origin (Home, often: X=0, Y=0; Z=0)", {
+        # TODO: What is this doing exactly?
+        "F": GCodeParameter("unknown parameter (maybe feedrate?): F"),
+        "W": GCodeParameter("Suppress mesh bed leveling (Prusa only)", show_value=False),
+        "X": GCodeParameter("X axis origin: "),
+        "Y": GCodeParameter("Y axis origin: "),
+    }, model_call=PrinterModel.home, model_args="XY", empty_value=0.0),
+    # G80: Mesh-based Z probe
+    # https://marlinfw.org/docs/gcode/G080.html G80 - Cancel Current Motion Mode
+    # TODO: What is this doing exactly?
+    "G80": GCodeCommand("Mesh-based Z probe"),
+    # G90: Set to Absolute Positioning
+    # https://all3dp.com/2/g91-g90-g-code/
+    # https://marlinfw.org/docs/gcode/G090.html
+    "G90": GCodeCommand("Set to Absolute Positioning", model_call=_absolute_positioning),
+    # G91: Set to Relative Positioning
+    # https://all3dp.com/2/g91-g90-g-code/
+    # https://marlinfw.org/docs/gcode/G091.html
+    "G91": GCodeCommand("Set to Relative Positioning", model_call=_relative_positioning),
+    # G92: Set Position
+    "G92": GCodeCommand("Set Position", {
+        "E": GCodeParameter("new extruder position: ", "mm", setter=PrinterModel.set_extruder_position),
+    }),
+    # M73: Set/Get build percentage
+    "M73": GCodeCommand("Set/Get build percentage", {
+        "P": GCodeParameter("Normal mode: ", "%"),
+        "Q": GCodeParameter("Silent mode: ", "%"),
+        "R": GCodeParameter("Remaining in normal mode: ", "min."),
+        "S": GCodeParameter("Remaining in silent mode: ", "min."),
+    }),
+    # M82: Set extruder to absolute mode
+    "M82": GCodeCommand("Set extruder to absolute mode", model_call=_absolute_extruder),
+    # M83: Set extruder to relative mode
+    "M83": GCodeCommand("Set extruder to relative mode", model_call=_relative_extruder),
+    # M84: Stop idle hold
+    "M84": GCodeCommand("Stop idle hold (disable motors)"),
+    # M104: Set Extruder Temperature
+    "M104": GCodeCommand("Set Extruder Temperature", {"S": EXTRUDER_TARGET}),
+    # M105: Get Extruder Temperature
+    "M105": GCodeCommand("Get Extruder Temperature"),
+    # M106: Fan On
+    "M106": GCodeCommand("Fan On", {
+        "S": GCodeParameter("Fan Speed: ", "(0-255)", setter=PrinterModel.set_fan),
+    }),
+    # M107: Fan Off
+    "M107": GCodeCommand("Fan Off", model_call=_fan_off),
+    # M109: Set Extruder Temperature and Wait
+    "M109": GCodeCommand("Set Extruder Temperature and Wait", {
+        "S": GCodeParameter("Target: ", "°C", setter=PrinterModel.wait_extruder_temperature),
+    }),
+    # M115: Get Firmware Version and Capabilities
+    "M115": GCodeCommand("Get Firmware Version and Capabilities", {
+        "U": GCodeParameter("Check the firmware version: "),
+    }),
+    # M117: Display Message
+    "M117": MessageCommand("Display Message"),
+    # M140: Set Bed Temperature (Fast)
+    "M140": GCodeCommand("Set Bed Temperature (Fast)", {
+        "S": GCodeParameter("Target: ", "°C", setter=PrinterModel.set_bed_temperature),
+    }),
+    # M190: Wait for bed temperature to reach target temp
+    "M190": GCodeCommand("Wait for bed temperature to reach target temp", {
+        "S": GCodeParameter("Target: ", "°C", setter=PrinterModel.wait_bed_temperature),
+    }),
+    # M201: Set max acceleration
+    "M201": GCodeCommand("Set max acceleration", _axes_parameters("mm/s²", "set_max_acceleration")),
+    # M203: Firmware dependent
+    # M203: Set maximum feedrate
+    "M203": GCodeCommand("Set maximum feedrate", _axes_parameters("mm/s²", "set_max_feedrate"), generators=("PrusaSlicer",)),
+    # M204: Firmware dependent
+    # https://reprap.org/wiki/G-code#M204:_Firmware_dependent
+    # M204: Set default acceleration
+    "M204": GCodeCommand("Set default acceleration", {
+        "P": GCodeParameter("printing: ", "mm/s²", setter=_time_estimator_setter("set_default_acceleration", "P")),
+        "R": GCodeParameter("retract: ", "mm/s²", setter=_time_estimator_setter("set_default_acceleration", "R")),
+        "S": GCodeParameter("normal: ", "mm/s²", setter=_time_estimator_setter("set_default_acceleration", "S")),
+        "T": GCodeParameter("travel: ", "mm/s²", setter=_time_estimator_setter("set_default_acceleration", "T")),
+    }, generators=("PrusaSlicer", "Cura", "Slic3r"), cura_needs_marlin=True),
+    # M205: Firmware dependent
+    # https://reprap.org/wiki/G-code#M205:_Firmware_dependent
+    # M205: Advanced Settings
+    "M205": GCodeCommand("Advanced settings", {
+        "E": GCodeParameter("E jerk: ", "mm/s", setter=_time_estimator_setter("set_jerk", "E")),
+        "S": GCodeParameter("min. print speed: ", "mm/s"),
+        "T": GCodeParameter("min. travel speed: ", "mm/s"),
+        "X": GCodeParameter("X Jerk: ", "mm/s", setter=_time_estimator_setter("set_jerk", "X")),
+        "Y": GCodeParameter("Y Jerk: ", "mm/s", setter=_time_estimator_setter("set_jerk", "Y")),
+        "Z": GCodeParameter("Z Jerk: ", "mm/s", setter=_time_estimator_setter("set_jerk", "Z")),
+    }, generators=("PrusaSlicer", "Cura"), cura_needs_marlin=True),
+    # M221: Set extrude factor override percentage
+    "M221": GCodeCommand("Set extrude factor override percentage", {
+        # TODO: What is this doing exactly?
+        "S": GCodeParameter("Extrude factor override percentage: ", "%"),
+    }, generators=("Slic3r", "PrusaSlicer")),
+    # M300: Play beep sound
+    "M300": GCodeCommand("Play beep sound", {
+        "P": GCodeParameter("duration: ", "ms"),
+        "S": GCodeParameter("frequency: ", "Hz"),
+    }),
+    # M862.1: Check nozzle diameter (prusa only)
+    "M862.1": UndecodedCommand("Check nozzle diameter (prusa only, undecoded)", generators=("PrusaSlicer",)),
+    # M862.3: Model name (prusa only)
+    "M862.3": UndecodedCommand("Model name (prusa only, undecoded)", generators=("PrusaSlicer",)),
+    # M900 Set Linear Advance Scaling Factors
+    # https://marlinfw.org/docs/features/lin_advance.html
+    "M900": GCodeCommand("Set Linear Advance Scaling Factors", {
+        # TODO: What is this doing exactly?
+        "K": GCodeParameter("Advance K factor: "),
+    }, generators=("Slic3r", "PrusaSlicer")),
+    # M907: Set digital trimpot motor current
+    "M907": GCodeCommand("Set digital trimpot motor current", {
+        "E": StepperCurrentParameter("Set E stepper current: "),
+    }, generators=("PrusaSlicer",)),
+}
+
+
+def register_command(word, command):
+    # add (or replace) a command, e.g. another member of the M862.x family
+    GCODE_COMMANDS[word] = command
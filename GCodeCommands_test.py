@@ -0,0 +1,90 @@
+from GCodeCommands import GCODE_COMMANDS
+from GCodeCommands import GCodeCommand
+from GCodeCommands import GCodeParameter
+from GCodeCommands import UndecodedCommand
+from GCodeCommands import register_command
+from GDecoderLine import GDecoderLine
+from printer_model.PrinterModel import PrinterModel
+from FileMetaInfos import FileMetaInfos
+import pytest
+pytestmark = pytest.mark.unittests
+
+
+def test_parameter_describe_with_unit():
+    # arrange
+    parameter = GCodeParameter("Target: ", "°C")
+
+    # act
+    decoded = parameter.describe(GDecoderLine(), "M104 S200", "200")
+
+    # assert
+    assert(decoded) == ", Target: 200 °C"
+
+
+def test_parameter_describe_without_value():
+    # arrange
+    parameter = GCodeParameter("Suppress mesh bed leveling (Prusa only)", show_value=False)
+
+    # act
+    decoded = parameter.describe(GDecoderLine(), "G28 W", "")
+
+    # assert
+    assert(decoded) == ", Suppress mesh bed leveling (Prusa only)"
+
+
+def test_command_handler_calls_setter_and_model():
+    # arrange
+    calls = []
+    command = GCodeCommand("Test Move", {
+        "F": GCodeParameter("Feedrate: ", "mm/min", setter=lambda printer, value: calls.append(("F", value))),
+        "X": GCodeParameter("X: ", "mm"),
+    }, model_call=lambda printer, x, y: calls.append(("move", x, y)), model_args="XY")
+
+    # act
+    decoded = command.handler(GDecoderLine(), FileMetaInfos(), "T1 X1 F100", ["T1", "X1", "F100"], PrinterModel())
+
+    # assert
+    assert(decoded) == "Test Move, X: 1 mm, Feedrate: 100 mm/min"
+    assert(calls) == [("F", 100.0), ("move", 1.0, None)]
+
+
+def test_command_model_handler_no_text_unknown_parameter_ignored():
+    # arrange
+    calls = []
+    command = GCodeCommand("Test Move", {
+        "X": GCodeParameter("X: ", "mm"),
+    }, model_call=lambda printer, x, y: calls.append(("move", x, y)), model_args="XY")
+
+    # act
+    decoded = command.model_handler(GDecoderLine(), FileMetaInfos(), "T1 X1 Q2", ["T1", "X1", "Q2"], PrinterModel())
+
+    # assert
+    assert(decoded) is None
+    assert(calls) == [("move", 1.0, None)]
+
+
+def test_command_handler_unknown_parameter():
+    # arrange
+    command = GCodeCommand("Test")
+
+    # act
+    decoded = command.handler(GDecoderLine(), FileMetaInfos(), "T1 X1", ["T1", "X1"], PrinterModel())
+
+    # assert
+    assert(decoded) == "Test, Unknown subtoken: X1 in: ['T1', 'X1']"
+
+
+def test_register_command_new_command_decoded():
+    # arrange
+    meta_infos = FileMetaInfos()
+    meta_infos.generator = "PrusaSlicer"
+    decode_line = GDecoderLine()
+    assert(decode_line.decode_gcode_line(meta_infos, "M862.2 P300", PrinterModel())) == "Unknown gcode: M862.2 P300"
+
+    # act
+    register_command("M862.2", UndecodedCommand("Check model code (prusa only, undecoded)", generators=("PrusaSlicer",)))
+    decoded = decode_line.decode_gcode_line(meta_infos, "M862.2 P300", PrinterModel())
+    del GCODE_COMMANDS["M862.2"]
+
+    # assert
+    assert(decoded) == "Check model code (prusa only, undecoded): ['M862.2', 'P300']"
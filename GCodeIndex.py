@@ -0,0 +1,212 @@
+# Sidecar index of a gcode file, for random access to its layers and lines (see: gdecoder --layers, --from-line)
+#
+# The index is built once by a single pass over the file (only the PrinterModel changes are applied, no text)
+# and stored next to the gcode file as <file>.gdindex (JSON). For the start of each layer (layer change comment,
+# see: is_layer_change_comment) and every CHECKPOINT_LINES lines (checkpoints) it holds the byte offset,
+# the line number, the meta infos and the PrinterModel state, so decoding some layers of a huge file can seek
+# directly to the first of them. To start at any other line, only the lines after the nearest layer start or
+# checkpoint are replayed.
+# The stored index is rebuilt, if the size or the modification time of the gcode file changed.
+#
+# Hint: The lines are split at "\n" (byte offsets), a file with "\r" (old Mac) line breaks has no layers.
+
+from printer_model.PrinterModel import PrinterModel
+from FileMetaInfos import FileMetaInfos
+from FileMetaInfos import is_layer_change_comment
+from FileMetaInfos import open_gcode
+from GCodeTokenizer import tokenize_line
+from GDecoderLine import GDecoderLine
+from GDecoderLine import process_comment_line
+import bisect
+import json
+import os
+import tempfile
+
+# changed, whenever the stored infos change (an old index is rebuilt)
+INDEX_VERSION = 3
+INDEX_EXTENSION = ".gdindex"
+# a checkpoint every N lines
+CHECKPOINT_LINES = 100000
+
+
+def index_file_name(file_name):
+    return file_name + INDEX_EXTENSION
+
+
+def read_lines(file1):
+    # (byte offset, text line) of a binary file, the same lines as text mode ("\r\n" -> "\n")
+    offset = file1.tell()
+    for raw_line in file1:
+        line = raw_line.decode('utf-8')
+        if line.endswith("\r\n"):
+            line = line[:-2] + "\n"
+        yield offset, line
+        offset += len(raw_line)
+
+
+class GCodeIndex:
+
+    checkpoint_lines = CHECKPOINT_LINES
+
+    def __init__(self):
+        # the gcode file, when the index was built
+        self.file_size = 0
+        self.modified_time_ns = 0
+        self.line_count = 0
+        self.longest_line = 0
+        # each layer/checkpoint: {"offset": byte offset, "line": line number of the first line,
+        #                         "meta": meta infos and gcode command count, "state": PrinterModel.get_state()}
+        # (the values before the first line), each layer also: "z": Z height
+        self.layers = []
+        self.checkpoints = []
+
+    def build(self, file_name):
+        stat = os.stat(file_name)
+        self.file_size = stat.st_size
+        self.modified_time_ns = stat.st_mtime_ns
+        self.layers = []
+        self.checkpoints = []
+        meta_infos = FileMetaInfos()
+        decode_line = GDecoderLine()
+        printer = PrinterModel()
+        gcode_command_count = 0
+        # the last layer, until its Z height is known (the first Z move of the layer)
+        layer = None
+
+        with open_gcode(file_name, binary=True) as file1:
+            for offset, line in read_lines(file1):
+                stripped, splitted = tokenize_line(line)
+
+                if meta_infos.line_count > 0 and meta_infos.line_count % self.checkpoint_lines == 0:
+                    self.checkpoints.append(_create_entry(offset, meta_infos, printer, gcode_command_count))
+
+                if splitted is None and is_layer_change_comment(stripped):
+                    layer = _create_entry(offset, meta_infos, printer, gcode_command_count)
+                    layer["z"] = printer.position_z.get()
+                    self.layers.append(layer)
+
+                meta_infos.process_stripped_line(line, stripped)
+
+                if splitted is None:
+                    process_comment_line(printer, stripped)
+                    continue
+
+                if decode_line.apply_gcode_line(stripped, printer, splitted):
+                    gcode_command_count += 1
+
+                if layer is not None:
+                    z = printer.position_z.get()
+                    if z != layer["z"] and not z != z:
+                        layer["z"] = z
+                        layer = None
+
+        self.line_count = meta_infos.line_count
+        self.longest_line = meta_infos.longest_line
+
+    def load(self, file_name):
+        # False if there's no stored index (or it's outdated)
+        try:
+            stat = os.stat(file_name)
+            with open(index_file_name(file_name), encoding='utf-8') as file1:
+                data = json.load(file1)
+            if data["version"] != INDEX_VERSION or data["size"] != stat.st_size \
+                    or data["mtime_ns"] != stat.st_mtime_ns:
+                return False
+            self.file_size = data["size"]
+            self.modified_time_ns = data["mtime_ns"]
+            self.line_count = data["line_count"]
+            self.longest_line = data["longest_line"]
+            self.layers = data["layers"]
+            self.checkpoints = data["checkpoints"]
+        except (OSError, ValueError, KeyError, TypeError):
+            return False
+        return True
+
+    def save(self, file_name):
+        # written to a temporary file first and then renamed (a reader never sees an incomplete index)
+        data = {
+            "version": INDEX_VERSION,
+            "size": self.file_size,
+            "mtime_ns": self.modified_time_ns,
+            "line_count": self.line_count,
+            "longest_line": self.longest_line,
+            "layers": self.layers,
+            "checkpoints": self.checkpoints,
+        }
+        name = index_file_name(file_name)
+        try:
+            handle, temp_name = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(name)), suffix=".tmp")
+        except OSError:
+            # e.g. a read-only directory: the index is just built again next time
+            return
+        try:
+            with os.fdopen(handle, 'w', encoding='utf-8') as file1:
+                json.dump(data, file1, ensure_ascii=False)
+            os.replace(temp_name, name)
+        except OSError:
+            # e.g. disk full
+            try:
+                os.remove(temp_name)
+            except OSError:
+                pass
+
+    def read_layers(self, file_name, first, last):
+        # the text lines from the start of layer first to the end of layer last
+        end = self.layers[last + 1]["offset"] if last + 1 < len(self.layers) else None
+        return read_lines_at(file_name, self.layers[first]["offset"], end)
+
+    def find_entry(self, line_number):
+        # the nearest layer start or checkpoint at or before the line, None if there's none (start of the file)
+        entry = None
+        for entries in (self.layers, self.checkpoints):
+            # both are sorted by the line number
+            position = bisect.bisect_right(entries, line_number, key=lambda item: item["line"])
+            if position > 0 and (entry is None or entries[position - 1]["line"] > entry["line"]):
+                entry = entries[position - 1]
+        return entry
+
+
+def _create_entry(offset, meta_infos, printer, gcode_command_count):
+    return {
+        "offset": offset,
+        "line": meta_infos.line_count + 1,
+        "meta": {
+            "generator_line": meta_infos.generator_line,
+            "generator": meta_infos.generator,
+            "generator_flavor": meta_infos.generator_flavor,
+            "longest_line": meta_infos.longest_line,
+            "gcode_commands": gcode_command_count,
+        },
+        "state": printer.get_state(),
+    }
+
+
+def restore_entry(entry, meta_infos, printer):
+    # meta infos and PrinterModel before the first line of the layer/checkpoint, returns the gcode command count
+    printer.set_state(entry["state"])
+    meta = entry["meta"]
+    meta_infos.generator_line = meta["generator_line"]
+    meta_infos.generator = meta["generator"]
+    meta_infos.generator_flavor = meta["generator_flavor"]
+    meta_infos.longest_line = meta["longest_line"]
+    meta_infos.line_count = entry["line"] - 1
+    return meta["gcode_commands"]
+
+
+def read_lines_at(file_name, start, end=None):
+    # the text lines from byte offset start to end (None: the end of the file)
+    with open_gcode(file_name, binary=True) as file1:
+        file1.seek(start)
+        for offset, line in read_lines(file1):
+            if end is not None and offset >= end:
+                break
+            yield line
+
+
+def get_index(file_name):
+    # the stored index, built (and stored) if there's none or the gcode file changed
+    index = GCodeIndex()
+    if not index.load(file_name):
+        index.build(file_name)
+        index.save(file_name)
+    return index
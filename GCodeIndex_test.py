@@ -0,0 +1,177 @@
+from GCodeIndex import GCodeIndex
+from GCodeIndex import get_index
+from GCodeIndex import index_file_name
+import json
+import os
+import pytest
+pytestmark = pytest.mark.unittests
+
+GCODE = ("; generated by PrusaSlicer\n"
+         "M104 S200\n"
+         "G28\n"
+         ";LAYER_CHANGE\n"
+         "G1 Z0.2\n"
+         "G1 X10 Y10 E1\n"
+         ";LAYER_CHANGE\n"
+         "G1 Z0.4\n"
+         "G1 X20 Y10 E2\n")
+
+
+def write_file(file_name, text):
+    with open(file_name, 'w', newline="") as file1:
+        file1.write(text)
+
+
+def test_build_layers(tmp_path):
+    # arrange
+    write_file(tmp_path / "a.gcode", GCODE)
+    index = GCodeIndex()
+
+    # act
+    index.build(str(tmp_path / "a.gcode"))
+
+    # assert
+    assert([layer["offset"] for layer in index.layers]) == [GCODE.index(";LAYER"), GCODE.rindex(";LAYER")]
+    assert([layer["line"] for layer in index.layers]) == [4, 7]
+    assert([layer["z"] for layer in index.layers]) == [0.2, 0.4]
+    assert([layer["meta"]["generator"] for layer in index.layers]) == ["PrusaSlicer", "PrusaSlicer"]
+    assert(index.line_count) == 9
+    assert(index.longest_line) == 14
+
+
+def test_build_layer_state(tmp_path):
+    # arrange
+    write_file(tmp_path / "a.gcode", GCODE)
+    index = GCodeIndex()
+
+    # act
+    index.build(str(tmp_path / "a.gcode"))
+
+    # assert
+    state = index.layers[1]["state"]
+    assert(state["values"]["position_x"][0]) == 10
+    assert(state["values"]["position_z"][0]) == 0.2
+    assert(state["values"]["extruder_temp"][0]) == 200
+    assert(state["values"]["extruder_physical"][0]) == 1
+
+
+def test_build_crlf_offsets(tmp_path):
+    # arrange
+    write_file(tmp_path / "a.gcode", GCODE.replace("\n", "\r\n"))
+    index = GCodeIndex()
+
+    # act
+    index.build(str(tmp_path / "a.gcode"))
+
+    # assert
+    assert([layer["offset"] for layer in index.layers]) == [GCODE.index(";LAYER") + 3, GCODE.rindex(";LAYER") + 6]
+    assert(index.longest_line) == 14
+
+
+def test_read_layers_lines(tmp_path):
+    # arrange
+    write_file(tmp_path / "a.gcode", GCODE)
+    index = GCodeIndex()
+    index.build(str(tmp_path / "a.gcode"))
+
+    # act
+    first_lines = list(index.read_layers(str(tmp_path / "a.gcode"), 0, 0))
+    last_lines = list(index.read_layers(str(tmp_path / "a.gcode"), 1, 1))
+
+    # assert
+    assert(first_lines) == [";LAYER_CHANGE\n", "G1 Z0.2\n", "G1 X10 Y10 E1\n"]
+    assert(last_lines) == [";LAYER_CHANGE\n", "G1 Z0.4\n", "G1 X20 Y10 E2\n"]
+
+
+def test_save_load_same_index(tmp_path):
+    # arrange
+    write_file(tmp_path / "a.gcode", GCODE)
+    index = GCodeIndex()
+    index.build(str(tmp_path / "a.gcode"))
+    loaded_index = GCodeIndex()
+
+    # act
+    index.save(str(tmp_path / "a.gcode"))
+    loaded = loaded_index.load(str(tmp_path / "a.gcode"))
+
+    # assert
+    assert(loaded) is True
+    # (NaN values are never equal)
+    assert(json.dumps(loaded_index.layers)) == json.dumps(index.layers)
+    assert(loaded_index.line_count) == 9
+
+
+def test_load_changed_file_false(tmp_path):
+    # arrange
+    write_file(tmp_path / "a.gcode", GCODE)
+    index = GCodeIndex()
+    index.build(str(tmp_path / "a.gcode"))
+    index.save(str(tmp_path / "a.gcode"))
+
+    # act
+    os.utime(tmp_path / "a.gcode", ns=(0, 1))
+
+    # assert
+    assert(GCodeIndex().load(str(tmp_path / "a.gcode"))) is False
+
+
+def test_load_no_index_false(tmp_path):
+    # arrange
+    write_file(tmp_path / "a.gcode", GCODE)
+
+    # act
+    loaded = GCodeIndex().load(str(tmp_path / "a.gcode"))
+
+    # assert
+    assert(loaded) is False
+
+
+def test_get_index_stored(tmp_path):
+    # arrange
+    write_file(tmp_path / "a.gcode", GCODE)
+
+    # act
+    index = get_index(str(tmp_path / "a.gcode"))
+
+    # assert
+    assert(len(index.layers)) == 2
+    assert(os.path.exists(index_file_name(str(tmp_path / "a.gcode"))))
+
+
+def test_build_checkpoints(tmp_path):
+    # arrange
+    write_file(tmp_path / "a.gcode", GCODE)
+    index = GCodeIndex()
+    index.checkpoint_lines = 4
+
+    # act
+    index.build(str(tmp_path / "a.gcode"))
+
+    # assert
+    assert([checkpoint["line"] for checkpoint in index.checkpoints]) == [5, 9]
+    assert([checkpoint["meta"]["gcode_commands"] for checkpoint in index.checkpoints]) == [2, 5]
+    assert(index.checkpoints[1]["state"]["values"]["extruder_logical"]) == [1.0, 0.0, 1.0]
+
+
+find_entry_testdata = [
+    (1, None),
+    (4, 4),
+    (5, 5),
+    (8, 7),
+    (9, 9),
+]
+
+
+@pytest.mark.parametrize("line_number,expected_line", find_entry_testdata)
+def test_find_entry_nearest_before(tmp_path, line_number, expected_line):
+    # arrange
+    write_file(tmp_path / "a.gcode", GCODE)
+    index = GCodeIndex()
+    index.checkpoint_lines = 4
+    index.build(str(tmp_path / "a.gcode"))
+
+    # act
+    entry = index.find_entry(line_number)
+
+    # assert
+    assert(None if entry is None else entry["line"]) == expected_line
@@ -0,0 +1,21 @@
+# Split each line of a gcode file once, for all stages (see: tokenize_line)
+#
+# Each raw line is stripped and classified (comment or gcode line) once, a gcode line is split once into the
+# command word and its parameters (without a trailing comment). All stages use this result: the meta infos
+# (FileMetaInfos.process_stripped_line), the comment lines (process_comment_line), the decoder (GDecoderLine)
+# and the PrinterModel changes (the GCodeCommand handlers get the tokens).
+
+
+def split_tokens(line):
+    # command word and parameters of a stripped gcode line: "G1 X10 E1.5 ; move" -> ["G1", "X10", "E1.5"]
+    if ";" in line:
+        line = line[:line.index(";")]
+    return line.split()
+
+
+def tokenize_line(line):
+    # (stripped line, tokens) of a raw line, tokens: None for a comment line, [] for an empty line
+    stripped_line = line.strip()
+    if stripped_line.startswith(";"):
+        return stripped_line, None
+    return stripped_line, split_tokens(stripped_line)
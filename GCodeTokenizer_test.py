@@ -0,0 +1,41 @@
+from GCodeTokenizer import split_tokens
+from GCodeTokenizer import tokenize_line
+import pytest
+pytestmark = pytest.mark.unittests
+
+split_tokens_testdata = [
+    ("G1 X10 E1.5", ["G1", "X10", "E1.5"]),
+    ("G1 X10 E1.5 ; move", ["G1", "X10", "E1.5"]),
+    ("G1\tX10  E1.5;move;again", ["G1", "X10", "E1.5"]),
+    ("M117 Hello world", ["M117", "Hello", "world"]),
+    ("", []),
+]
+
+
+@pytest.mark.parametrize("line,expected_tokens", split_tokens_testdata)
+def test_split_tokens(line, expected_tokens):
+    # act
+    tokens = split_tokens(line)
+
+    # assert
+    assert(tokens) == expected_tokens
+    # the same as the former split
+    assert(tokens) == line.split(";")[0].split()
+
+
+tokenize_line_testdata = [
+    ("G1 X10 ; move\n", "G1 X10 ; move", ["G1", "X10"]),
+    ("  ;TYPE:SKIRT\r\n", ";TYPE:SKIRT", None),
+    ("\n", "", []),
+    ("Filament-specific end gcode\n", "Filament-specific end gcode", ["Filament-specific", "end", "gcode"]),
+]
+
+
+@pytest.mark.parametrize("line,expected_stripped,expected_tokens", tokenize_line_testdata)
+def test_tokenize_line(line, expected_stripped, expected_tokens):
+    # act
+    stripped_line, tokens = tokenize_line(line)
+
+    # assert
+    assert(stripped_line) == expected_stripped
+    assert(tokens) == expected_tokens
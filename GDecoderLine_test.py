@@ -1,6 +1,7 @@
 from GDecoderLine import GDecoderLine
 from printer_model.PrinterModel import PrinterModel
 from FileMetaInfos import FileMetaInfos
+import math
 import pytest
 pytestmark = pytest.mark.unittests
 
@@ -260,14 +261,14 @@ def test_decode_gcode_line_valid_command_with_feedrate_expected_feedrate(gcode,
 
     # assert
     assert(decoded) == expected_decode_part + ", Feedrate: 100 mm/min"
-    assert(printer.feedrate) == "100"
+    assert(printer.feedrate) == 100
 
 
 def test_decode_gcode_line_g0_x1_y2_z3_position_ok():
     # arrange
     meta_infos = FileMetaInfos()
     printer = PrinterModel()
-    printer.home("", "")
+    printer.home(None, None)
     decode_line = GDecoderLine()
 
     # act
@@ -275,16 +276,16 @@ def test_decode_gcode_line_g0_x1_y2_z3_position_ok():
 
     # assert
     assert(decoded) == "Rapid Move (no print), X: 1 mm, Y: 2 mm, Z: 3 mm"
-    assert(printer.position_x.get()) == "1"
-    assert(printer.position_y.get()) == "2"
-    assert(printer.position_z.get()) == "3"
+    assert(printer.position_x.get()) == 1
+    assert(printer.position_y.get()) == 2
+    assert(printer.position_z.get()) == 3
 
 
 def test_decode_gcode_line_g1_x1_y2_z3_e4_position_ok():
     # arrange
     meta_infos = FileMetaInfos()
     printer = PrinterModel()
-    printer.home("", "")
+    printer.home(None, None)
     decode_line = GDecoderLine()
 
     # act
@@ -292,17 +293,17 @@ def test_decode_gcode_line_g1_x1_y2_z3_e4_position_ok():
 
     # assert
     assert(decoded) == "Linear Move (print), X: 1 mm, Y: 2 mm, Z: 3 mm, E: 4 mm"
-    assert(printer.position_x.get()) == "1"
-    assert(printer.position_y.get()) == "2"
-    assert(printer.position_z.get()) == "3"
-    assert(printer.extruder_physical.get()) == "4.0"
+    assert(printer.position_x.get()) == 1
+    assert(printer.position_y.get()) == 2
+    assert(printer.position_z.get()) == 3
+    assert(printer.extruder_physical.get()) == 4.0
 
 
 def test_decode_gcode_line_g2_x1_y2_i3_j4_e5_position_ok():
     # arrange
     meta_infos = FileMetaInfos()
     printer = PrinterModel()
-    printer.home("", "")
+    printer.home(None, None)
     decode_line = GDecoderLine()
 
     # act
@@ -310,16 +311,16 @@ def test_decode_gcode_line_g2_x1_y2_i3_j4_e5_position_ok():
 
     # assert
     assert(decoded) == "Clockwise Arc Move (print), X:1, Y:2, I (distant X): 3, J (distant Y): 4, E: 5 mm"
-    assert(printer.position_x.get()) == "1"
-    assert(printer.position_y.get()) == "2"
-    assert(printer.extruder_physical.get()) == "5.0"
+    assert(printer.position_x.get()) == 1
+    assert(printer.position_y.get()) == 2
+    assert(printer.extruder_physical.get()) == 5.0
 
 
 def test_decode_gcode_line_g3_x1_y2_i3_j4_e5_position_ok():
     # arrange
     meta_infos = FileMetaInfos()
     printer = PrinterModel()
-    printer.home("", "")
+    printer.home(None, None)
     decode_line = GDecoderLine()
 
     # act
@@ -327,13 +328,32 @@ def test_decode_gcode_line_g3_x1_y2_i3_j4_e5_position_ok():
 
     # assert
     assert(decoded) == "Counter-Clockwise Arc Move (print), X:1, Y:2, I (distant X): 3, J (distant Y): 4, E: 5 mm"
-    assert(printer.position_x.get()) == "1"
-    assert(printer.position_y.get()) == "2"
-    assert(printer.extruder_physical.get()) == "5.0"
+    assert(printer.position_x.get()) == 1
+    assert(printer.position_y.get()) == 2
+    assert(printer.extruder_physical.get()) == 5.0
+
+
+def test_decode_gcode_line_g2_r_bounding_box_ok():
+    # arrange
+    meta_infos = FileMetaInfos()
+    printer = PrinterModel()
+    printer.home(None, None)
+    decode_line = GDecoderLine()
+
+    # act
+    decoded = decode_line.decode_gcode_line(meta_infos, "G2 X20 Y0 R10 E5", printer)
+
+    # assert
+    assert(decoded) == "Clockwise Arc Move (print), X:20, Y:0, R (radius): 10, E: 5 mm"
+    assert(printer.position_x.get()) == 20
+    assert(printer.print_position_y.get()) == 0
+    assert(printer.print_position_y.get_max()) == 10
 
 
 simple_gcode_testdata = [
     ("G4", "Dwell (aka: Pause)"),
+    ("G4 P500", "Dwell (aka: Pause), duration: 500 ms"),
+    ("G4 S2", "Dwell (aka: Pause), duration: 2 s"),
     ("G21", "Set Units to Millimeters"),
     ("G28 F100 W",
         "Move to Origin (Home, often: X=0, Y=0; Z=0), "
@@ -370,9 +390,12 @@ def test_decode_gcode_line_simple_command_message(gcode, expected_message):
 
 
 g28_xy_testdata = [
-    ("", "Move to Origin (Home, often: X=0, Y=0; Z=0)", "0", "0"),
-    ("X0", "Move to Origin (Home, often: X=0, Y=0; Z=0), X axis origin: 0", "0", "20"),
-    ("Y0", "Move to Origin (Home, often: X=0, Y=0; Z=0), Y axis origin: 0", "10", "0"),
+    ("", "Move to Origin (Home, often: X=0, Y=0; Z=0)", 0, 0),
+    ("X0", "Move to Origin (Home, often: X=0, Y=0; Z=0), X axis origin: 0", 0, 20),
+    ("Y0", "Move to Origin (Home, often: X=0, Y=0; Z=0), Y axis origin: 0", 10, 0),
+    # an axis without a value is homed
+    ("X Y", "Move to Origin (Home, often: X=0, Y=0; Z=0), X axis origin: , Y axis origin: ", 0, 0),
+    ("X", "Move to Origin (Home, often: X=0, Y=0; Z=0), X axis origin: ", 0, 20),
 ]
 
 
@@ -381,9 +404,9 @@ def test_decode_gcode_line_g28xy_position_xy(xy, expected_message, expected_x, e
     # arrange
     meta_infos = FileMetaInfos()
     printer = PrinterModel()
-    printer.home("", "")
-    printer._move_x("10")
-    printer._move_y("20")
+    printer.home(None, None)
+    printer._move_x(10)
+    printer._move_y(20)
     decode_line = GDecoderLine()
 
     # act
@@ -395,13 +418,40 @@ def test_decode_gcode_line_g28xy_position_xy(xy, expected_message, expected_x, e
     assert(printer.position_y.get()) == expected_y
 
 
+empty_value_testdata = [
+    ("G1 X", "Linear Move (print), X:  mm"),
+    ("G1 X5 Y F", "Linear Move (print), X: 5 mm, Y:  mm, Feedrate:  mm/min"),
+    ("M104 S", "Set Extruder Temperature, Target:  °C"),
+]
+
+
+@pytest.mark.parametrize("gcode,expected_message", empty_value_testdata)
+def test_decode_gcode_line_parameter_without_value_not_set(gcode, expected_message):
+    # arrange
+    meta_infos = FileMetaInfos()
+    printer = PrinterModel()
+    printer.print_linear(1, 2, None, None)
+    printer.set_feedrate(600)
+    decode_line = GDecoderLine()
+
+    # act
+    decoded = decode_line.decode_gcode_line(meta_infos, gcode, printer)
+
+    # assert
+    assert(decoded) == expected_message
+    assert(printer.position_x.get()) == (5 if "X5" in gcode else 1)
+    assert(printer.position_y.get()) == 2
+    assert(printer.feedrate) == 600
+    assert(math.isnan(printer.extruder_temp.get()))
+
+
 def test_decode_gcode_line_g92_e10_extruder_position_ok():
     # arrange
     meta_infos = FileMetaInfos()
     printer = PrinterModel()
-    printer.set_extruder_position("0")
-    assert(printer.extruder_logical.get()) == "0"
-    assert(printer.extruder_physical.get()) == "0"
+    printer.set_extruder_position(0)
+    assert(printer.extruder_logical.get()) == 0
+    assert(printer.extruder_physical.get()) == 0
     decode_line = GDecoderLine()
 
     # act
@@ -409,15 +459,15 @@ def test_decode_gcode_line_g92_e10_extruder_position_ok():
 
     # assert
     assert(decoded) == "Set Position, new extruder position: 10 mm"
-    assert(printer.extruder_logical.get()) == "10"
-    assert(printer.extruder_physical.get()) == "0"
+    assert(printer.extruder_logical.get()) == 10
+    assert(printer.extruder_physical.get()) == 0
 
 
 def test_decode_gcode_line_m104_s50_extruder_temp_ok():
     # arrange
     meta_infos = FileMetaInfos()
     printer = PrinterModel()
-    assert(printer.extruder_temp.get()) == "?"
+    assert(math.isnan(printer.extruder_temp.get()))
     decode_line = GDecoderLine()
 
     # act
@@ -425,14 +475,14 @@ def test_decode_gcode_line_m104_s50_extruder_temp_ok():
 
     # assert
     assert(decoded) == "Set Extruder Temperature, Target: 50 °C"
-    assert(printer.extruder_temp.get()) == "50"
+    assert(printer.extruder_temp.get()) == 50
 
 
 def test_decode_gcode_line_m106_s50_fan_ok():
     # arrange
     meta_infos = FileMetaInfos()
     printer = PrinterModel()
-    assert(printer.fan.get()) == "?"
+    assert(math.isnan(printer.fan.get()))
     decode_line = GDecoderLine()
 
     # act
@@ -440,14 +490,14 @@ def test_decode_gcode_line_m106_s50_fan_ok():
 
     # assert
     assert(decoded) == "Fan On, Fan Speed: 50 (0-255)"
-    assert(printer.fan.get()) == "50"
+    assert(printer.fan.get()) == 50
 
 
 def test_decode_gcode_line_m109_s50_extruder_temp_ok():
     # arrange
     meta_infos = FileMetaInfos()
     printer = PrinterModel()
-    assert(printer.extruder_temp.get()) == "?"
+    assert(math.isnan(printer.extruder_temp.get()))
     decode_line = GDecoderLine()
 
     # act
@@ -455,14 +505,66 @@ def test_decode_gcode_line_m109_s50_extruder_temp_ok():
 
     # assert
     assert(decoded) == "Set Extruder Temperature and Wait, Target: 50 °C"
-    assert(printer.extruder_temp.get()) == "50"
+    assert(printer.extruder_temp.get()) == 50
+
+
+def test_decode_gcode_line_g4_p500_dwell_time_ok():
+    # arrange
+    meta_infos = FileMetaInfos()
+    printer = PrinterModel()
+    decode_line = GDecoderLine()
+
+    # act
+    decode_line.decode_gcode_line(meta_infos, "G4 P500", printer)
+
+    # assert
+    assert(printer.time_estimator.wait_time) == 0.5
+
+
+def test_decode_gcode_line_m109_s220_heat_up_time_ok():
+    # arrange
+    meta_infos = FileMetaInfos()
+    printer = PrinterModel()
+    decode_line = GDecoderLine()
+
+    # act
+    decode_line.decode_gcode_line(meta_infos, "M109 S220", printer)
+
+    # assert
+    # heat-up from the ambient temperature (see: ThermalModel)
+    assert(printer.time_estimator.wait_time) == pytest.approx(91.3, abs=0.1)
+
+
+def test_decode_gcode_line_m204_m205_time_estimator_limits_ok():
+    # arrange
+    meta_infos = FileMetaInfos()
+    meta_infos.generator = "PrusaSlicer"
+    printer = PrinterModel()
+    decode_line = GDecoderLine()
+
+    # act
+    decode_line.decode_gcode_line(meta_infos, "M201 X100 Y200", printer)
+    decode_line.decode_gcode_line(meta_infos, "M203 Z8", printer)
+    decode_line.decode_gcode_line(meta_infos, "M204 P1 R2 T3", printer)
+    decode_line.decode_gcode_line(meta_infos, "M205 X4 E5 S6", printer)
+
+    # assert
+    estimator = printer.time_estimator
+    assert(estimator.max_acceleration["X"]) == 100
+    assert(estimator.max_acceleration["Y"]) == 200
+    assert(estimator.max_feedrate["Z"]) == 8
+    assert(estimator.print_acceleration) == 1
+    assert(estimator.retract_acceleration) == 2
+    assert(estimator.travel_acceleration) == 3
+    assert(estimator.jerk["X"]) == 4
+    assert(estimator.jerk["E"]) == 5
 
 
 def test_decode_gcode_line_m140_s50_bed_temp_ok():
     # arrange
     meta_infos = FileMetaInfos()
     printer = PrinterModel()
-    assert(printer.bed_temp.get()) == "?"
+    assert(math.isnan(printer.bed_temp.get()))
     decode_line = GDecoderLine()
 
     # act
@@ -470,4 +572,235 @@ def test_decode_gcode_line_m140_s50_bed_temp_ok():
 
     # assert
     assert(decoded) == "Set Bed Temperature (Fast), Target: 50 °C"
-    assert(printer.bed_temp.get()) == "50"
+    assert(printer.bed_temp.get()) == 50
+
+
+def test_decode_gcode_text_printer_unchanged():
+    # arrange
+    meta_infos = FileMetaInfos()
+    decode_line = GDecoderLine()
+
+    # act
+    decoded = decode_line.decode_gcode_text(meta_infos, "G1 X1 Y2 F100")
+
+    # assert
+    assert(decoded) == "Linear Move (print), X: 1 mm, Y: 2 mm, Feedrate: 100 mm/min"
+
+
+def test_apply_gcode_line_same_printer_as_decode_gcode_line():
+    # arrange
+    meta_infos = FileMetaInfos()
+    decode_line = GDecoderLine()
+    printer = PrinterModel()
+    expected_printer = PrinterModel()
+    lines = ["G28", "G1 X1 Y2 Z0.2 E1 F100", "M104 S200", "M106 S255", "G91", "G0 Z1", "unknown"]
+
+    # act
+    applied = [decode_line.apply_gcode_line(line, printer) for line in lines + [""]]
+    for line in lines:
+        decode_line.decode_gcode_line(meta_infos, line, expected_printer)
+
+    # assert
+    assert(applied) == [True] * len(lines) + [False]
+    assert(printer.position_x.get()) == expected_printer.position_x.get()
+    assert(printer.position_z.get()) == expected_printer.position_z.get() == 1.2
+    assert(printer.extruder_physical.get()) == expected_printer.extruder_physical.get()
+    assert(printer.feedrate) == expected_printer.feedrate
+    assert(printer.extruder_temp.get()) == expected_printer.extruder_temp.get()
+    assert(printer.fan.get()) == expected_printer.fan.get()
+    assert(printer.positioning_mode) == expected_printer.positioning_mode
+
+
+def test_decode_gcode_line_repeated_line_cached_and_applied():
+    # arrange
+    meta_infos = FileMetaInfos()
+    decode_line = GDecoderLine()
+    printer = PrinterModel()
+    decode_line.decode_gcode_line(meta_infos, "M83", printer)
+
+    # act
+    decoded = [decode_line.decode_gcode_line(meta_infos, "G1 E0.8 F2100", printer) for index in range(3)]
+
+    # assert
+    assert(decoded) == ["Linear Move (print), E: 0.8 mm, Feedrate: 2100 mm/min"] * 3
+    assert(printer.extruder_physical.get()) == pytest.approx(2.4)
+    assert(decode_line.cache_hits) == 2
+    assert(decode_line.cache_misses) == 2
+
+
+def test_decode_gcode_line_generator_dependent_not_cached():
+    # arrange
+    meta_infos = FileMetaInfos()
+    decode_line = GDecoderLine()
+    printer = PrinterModel()
+    unknown_generator = decode_line.decode_gcode_line(meta_infos, "M204 S500", printer)
+
+    # act
+    meta_infos.generator = "PrusaSlicer"
+    decoded = decode_line.decode_gcode_line(meta_infos, "M204 S500", printer)
+
+    # assert
+    assert(unknown_generator).startswith("Unexpected generator")
+    assert(decoded) == "Set default acceleration, normal: 500 mm/s²"
+    assert(decode_line.cache_hits) == 0
+
+
+def test_decode_gcode_line_cache_size_bounded():
+    # arrange
+    meta_infos = FileMetaInfos()
+    decode_line = GDecoderLine()
+    decode_line.cache_size = 2
+    printer = PrinterModel()
+
+    # act
+    # "G1 X1" is used in each generation (kept), "G1 X2" is not (dropped)
+    for line in ["G1 X1", "G1 X2", "G1 X1", "G1 X3", "G1 X1", "G1 X2"]:
+        decode_line.decode_gcode_line(meta_infos, line, printer)
+
+    # assert
+    assert(decode_line.cache_hits) == 2
+    assert(decode_line.cache_misses) == 4
+    assert(printer.position_x.get()) == 2
+
+
+def test_decode_gcode_line_given_tokens_same_as_split():
+    # arrange
+    meta_infos = FileMetaInfos()
+    decode_line = GDecoderLine()
+    printer = PrinterModel()
+    expected_printer = PrinterModel()
+    line = "G1 X1 Y2 E0.5 F100 ; comment"
+
+    # act
+    decoded = decode_line.decode_gcode_line(meta_infos, line, printer, ["G1", "X1", "Y2", "E0.5", "F100"])
+    expected_decoded = GDecoderLine().decode_gcode_line(meta_infos, line, expected_printer)
+
+    # assert
+    assert(decoded) == expected_decoded
+    assert(printer.position_y.get()) == expected_printer.position_y.get() == 2
+
+
+@pytest.mark.parametrize("gcode,expected_decode,expected_message", invalid_gcode_testdata)
+def test_decode_gcode_command_invalid_command_same_text_and_diagnostics(gcode, expected_decode, expected_message):
+    # arrange
+    meta_infos = FileMetaInfos()
+    printer = PrinterModel()
+    decode_line = GDecoderLine()
+
+    # act
+    decoded = decode_line.decode_gcode_command(meta_infos, gcode, printer, 12)
+
+    # assert
+    assert(decoded.text) == expected_decode + expected_message
+    assert(decoded.diagnostics) == [expected_message]
+    assert(decoded.line_number) == 12
+
+
+@pytest.mark.parametrize("gcode,expected_decode,expected_message", invalid_gcode_testdata)
+def test_decode_gcode_command_invalid_command_raises_exception(gcode, expected_decode, expected_message):
+    # arrange
+    meta_infos = FileMetaInfos()
+    printer = PrinterModel()
+    decode_line = GDecoderLine()
+    decode_line.stop_on_undecoded = True
+
+    # act
+    with pytest.raises(Exception) as e_info:
+        decode_line.decode_gcode_command(meta_infos, gcode, printer)
+
+    # assert
+    assert(e_info.value.args[0]) == expected_message
+
+
+@pytest.mark.parametrize("gcode,generator,expected_message", generator_specific_gcode_testdata)
+def test_decode_gcode_command_generator_specific_same_text(gcode, generator, expected_message):
+    # arrange
+    meta_infos = FileMetaInfos()
+    meta_infos.generator = generator
+    printer = PrinterModel()
+    decode_line = GDecoderLine()
+
+    # act
+    decoded = decode_line.decode_gcode_command(meta_infos, gcode, printer)
+
+    # assert
+    assert(decoded.text) == expected_message
+
+
+def test_decode_gcode_command_out_of_range_and_wrong_generator_diagnostics():
+    # arrange
+    meta_infos = FileMetaInfos()
+    meta_infos.generator = "Cura"
+    printer = PrinterModel()
+    decode_line = GDecoderLine()
+
+    # act
+    decoded = decode_line.decode_gcode_command(meta_infos, "M907 E10000", printer)
+
+    # assert
+    assert(decoded.parameters) == {"E": 10000}
+    assert(decoded.diagnostics) == ["Unexpected generator Cura for firmware dependent: ['M907', 'E10000']",
+                                    "Value 10000 out of range in: M907 E10000"]
+
+
+def test_decode_gcode_command_parameters_and_printer_changes():
+    # arrange
+    meta_infos = FileMetaInfos()
+    decode_line = GDecoderLine()
+    printer = PrinterModel()
+    expected_printer = PrinterModel()
+    lines = ["G28 W", "G1 X1 Y2 Z0.2 E1 F100", "M117 Hello X1", "M862.3 P \"MK3S\""]
+
+    # act
+    decoded = [decode_line.decode_gcode_command(meta_infos, line, printer) for line in lines]
+    for line in lines:
+        decode_line.decode_gcode_line(meta_infos, line, expected_printer)
+
+    # assert
+    assert([command.word for command in decoded]) == ["G28", "G1", "M117", "M862.3"]
+    assert(decoded[0].parameters) == {"W": None}
+    assert(decoded[1].parameters) == {"X": 1, "Y": 2, "Z": 0.2, "E": 1, "F": 100}
+    assert(decoded[2].parameters) == {}
+    assert(decoded[3].diagnostics) == ["Unexpected generator  for firmware dependent: ['M862.3', 'P', '\"MK3S\"']"]
+    assert(printer.position_x.get()) == expected_printer.position_x.get() == 1
+    assert(printer.extruder_physical.get()) == expected_printer.extruder_physical.get()
+    assert(printer.feedrate) == expected_printer.feedrate
+
+
+def test_decode_gcode_command_parameter_without_value():
+    # arrange
+    meta_infos = FileMetaInfos()
+    decode_line = GDecoderLine()
+    printer = PrinterModel()
+    printer.move(10, 20, None)
+
+    # act
+    decoded = decode_line.decode_gcode_command(meta_infos, "G28 X Y", printer)
+
+    # assert
+    assert(decoded.parameters) == {"X": None, "Y": None}
+    assert(decoded.diagnostics) == []
+    assert(printer.position_x.get()) == 0
+    assert(printer.position_y.get()) == 0
+
+
+def test_decode_gcode_command_text_created_on_demand():
+    # arrange
+    meta_infos = FileMetaInfos()
+    decode_line = GDecoderLine()
+
+    # act
+    decoded = decode_line.decode_gcode_command(meta_infos, "G1 X1 Y2 F100", PrinterModel())
+
+    # assert
+    assert(decoded._text) is None
+    assert(decoded.text) == "Linear Move (print), X: 1 mm, Y: 2 mm, Feedrate: 100 mm/min"
+    assert(decoded._render) is None
+
+
+def test_decode_gcode_command_empty_line():
+    # act
+    decoded = GDecoderLine().decode_gcode_command(FileMetaInfos(), "", PrinterModel())
+
+    # assert
+    assert(decoded) is None
@@ -0,0 +1,93 @@
+# Buffered output of the decoded lines (see: gdecoder --output)
+#
+# Calling print() for every line is slow for large files, so the output is collected and written in large blocks.
+# The writer is a (minimal) text stream: print() can use it as well (e.g. contextlib.redirect_stdout),
+# so the summary and the verbose output stay in order with the decoded lines.
+
+# write to the stream if this number of characters is buffered
+BUFFER_SIZE = 1024 * 1024
+# initial width of the gcode column, if the longest line isn't known in advance
+ADAPTIVE_WIDTH = 32
+
+
+class OutputWriter:
+
+    def __init__(self, stream, buffer_size=BUFFER_SIZE):
+        self.stream = stream
+        self.buffer_size = buffer_size
+        self._parts = []
+        self._size = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        # the output up to an exception is still written
+        self.flush()
+
+    def write(self, text):
+        self._parts.append(text)
+        self._size += len(text)
+        if self._size >= self.buffer_size:
+            self._write_parts()
+        return len(text)
+
+    def flush(self):
+        self._write_parts()
+        self.stream.flush()
+
+    def _write_parts(self):
+        if self._parts:
+            self.stream.write("".join(self._parts))
+            self._parts.clear()
+            self._size = 0
+
+
+def create_line_formatter(column_width, hide_gcode, hide_decoded):
+    # the output of a gcode (not comment) line: formatter(line, decoded)
+    # the options are resolved once, the returned function only does the necessary string operations
+    # column_width None: not known in advance (stdin, a compressed file or --follow),
+    # the column grows with the longest line so far
+    if column_width is None:
+        return _create_adaptive_line_formatter(hide_gcode, hide_decoded)
+    return _create_fixed_line_formatter(column_width + 1, hide_gcode, hide_decoded)
+
+
+def _create_fixed_line_formatter(width, hide_gcode, hide_decoded):
+
+    if hide_gcode is False and hide_decoded is False:
+        def format_line(line, decoded):
+            if decoded != "":
+                return line.ljust(width) + " ; " + decoded + "\n"
+            return line.ljust(width) + "\n"
+    elif hide_gcode is False:
+        def format_line(line, decoded):
+            return line.ljust(width) + "\n"
+    elif hide_decoded is False:
+        def format_line(line, decoded):
+            if decoded != "":
+                return " ; " + decoded + "\n"
+            return ""
+    else:
+        def format_line(line, decoded):
+            return ""
+
+    return format_line
+
+
+def _create_adaptive_line_formatter(hide_gcode, hide_decoded):
+    if hide_gcode is True:
+        # no gcode column to align
+        return _create_fixed_line_formatter(0, hide_gcode, hide_decoded)
+    width = ADAPTIVE_WIDTH
+
+    def format_line(line, decoded):
+        nonlocal width
+        # at least the width of a file with this line as the longest line (including the line break)
+        if len(line) + 2 > width:
+            width = len(line) + 2
+        if hide_decoded is False and decoded != "":
+            return line.ljust(width) + " ; " + decoded + "\n"
+        return line.ljust(width) + "\n"
+
+    return format_line
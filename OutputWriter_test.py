@@ -0,0 +1,91 @@
+from OutputWriter import OutputWriter
+from OutputWriter import create_line_formatter
+import contextlib
+import io
+import pytest
+pytestmark = pytest.mark.unittests
+
+
+@pytest.mark.parametrize("hide_gcode, hide_decoded, expected", [
+    (False, False, "G90   ; Set to Absolute Positioning\n"),
+    (False, True, "G90  \n"),
+    (True, False, " ; Set to Absolute Positioning\n"),
+    (True, True, ""),
+])
+def test_create_line_formatter_options(hide_gcode, hide_decoded, expected):
+    # arrange
+    format_line = create_line_formatter(4, hide_gcode, hide_decoded)
+
+    # act
+    output = format_line("G90", "Set to Absolute Positioning")
+
+    # assert
+    assert(output) == expected
+
+
+def test_create_line_formatter_nothing_decoded():
+    # arrange
+    format_line = create_line_formatter(4, False, False)
+
+    # act
+    output = format_line("G90", "")
+
+    # assert
+    assert(output) == "G90  \n"
+
+
+def test_write_buffered_until_size_reached():
+    # arrange
+    stream = io.StringIO()
+    writer = OutputWriter(stream, 10)
+
+    # act
+    writer.write("12345")
+    before = stream.getvalue()
+    writer.write("67890")
+
+    # assert
+    assert(before) == ""
+    assert(stream.getvalue()) == "1234567890"
+
+
+def test_print_in_order_with_write():
+    # arrange
+    stream = io.StringIO()
+
+    # act
+    with OutputWriter(stream) as writer, contextlib.redirect_stdout(writer):
+        writer.write("G90\n")
+        print("summary", end="")
+
+    # assert
+    assert(stream.getvalue()) == "G90\nsummary"
+
+
+def test_exception_output_written():
+    # arrange
+    stream = io.StringIO()
+
+    # act
+    with pytest.raises(Exception):
+        with OutputWriter(stream) as writer:
+            writer.write("G90\n")
+            raise Exception("stop")
+
+    # assert
+    assert(stream.getvalue()) == "G90\n"
+
+
+def test_create_line_formatter_adaptive_width_grows():
+    # arrange
+    format_line = create_line_formatter(None, False, False)
+
+    # act
+    short_output = format_line("G90", "Set to Absolute Positioning")
+    long_output = format_line("G1 X100.123 Y100.123 Z10.123 E100.12345 F3000", "Linear Move")
+    short_output_after_long = format_line("G90", "Set to Absolute Positioning")
+
+    # assert
+    assert(short_output.index(";")) == 33
+    assert(long_output.index(";")) == 48
+    assert(short_output_after_long.index(";")) == 48
@@ -0,0 +1,118 @@
+# Profile of a gdecoder run (see: gdecoder --profile)
+#
+# Collected: the wall time of the phases (e.g. decoding the lines, the summary),
+# the wall time and number of calls of the per line steps (meta infos, decoding, output) and, for each gcode
+# command word, the time of tokenizing, creating the text and applying the PrinterModel changes.
+# The peak memory is the max. resident set size of the process (not available on Windows).
+#
+# Without --profile, nothing of this is used (no overhead): the profiled steps are the same functions,
+# wrapped by timing functions (see: Profiler.timed), the decoded lines are timed by GDecoderLine.timing_hook.
+
+import contextlib
+import json
+import sys
+import time
+
+try:
+    import resource
+except ImportError:
+    # Windows
+    resource = None
+
+
+def peak_memory_mb():
+    # max. resident set size of this process so far, None if not known
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # bytes on macOS, kB on Linux
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+class Profiler:
+
+    def __init__(self):
+        self.start_time = time.perf_counter()
+        # name -> [count, seconds]
+        self.phases = {}
+        self.calls = {}
+        # command word -> [count, cached count, tokenize seconds, text seconds, model seconds]
+        self.commands = {}
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        entry = self.phases.setdefault(name, [0, 0.0])
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            entry[0] += 1
+            entry[1] += time.perf_counter() - start
+
+    def timed(self, name, function):
+        # a function with the same results, counting and timing the calls
+        entry = self.calls.setdefault(name, [0, 0.0])
+        perf_counter = time.perf_counter
+
+        def timed_function(*args):
+            start = perf_counter()
+            result = function(*args)
+            entry[1] += perf_counter() - start
+            entry[0] += 1
+            return result
+
+        return timed_function
+
+    def add_command(self, word, cached, tokenize_time, text_time, model_time):
+        # see: GDecoderLine.timing_hook
+        entry = self.commands.get(word)
+        if entry is None:
+            entry = self.commands[word] = [0, 0, 0.0, 0.0, 0.0]
+        entry[0] += 1
+        if cached:
+            entry[1] += 1
+        entry[2] += tokenize_time
+        entry[3] += text_time
+        entry[4] += model_time
+
+    def to_dict(self):
+        # JSON serializable (times in s, memory in MB)
+        return {
+            "total": time.perf_counter() - self.start_time,
+            "peak_memory_mb": peak_memory_mb(),
+            "phases": {name: {"count": count, "time": seconds} for name, (count, seconds) in self.phases.items()},
+            "calls": {name: {"count": count, "time": seconds} for name, (count, seconds) in self.calls.items()},
+            "commands": {word: {"count": count, "cached": cached, "tokenize": tokenize, "text": text, "model": model}
+                         for word, (count, cached, tokenize, text, model) in self.commands.items()},
+        }
+
+    def print_report(self, stream):
+        profile = self.to_dict()
+        total = profile["total"]
+        memory = "?" if profile["peak_memory_mb"] is None else str(profile["peak_memory_mb"])
+
+        def percent(seconds):
+            return f"{seconds / total * 100 if total > 0 else 0:5.1f} %"
+
+        lines = [";Profile", f";  Total     : {total:.3f} s, peak memory: {memory} MB", ";Phases"]
+        for name, entry in profile["phases"].items():
+            lines.append(f";  {name:24} {entry['time']:10.3f} s {percent(entry['time'])}")
+        lines.append(";Calls")
+        for name, entry in profile["calls"].items():
+            lines.append(f";  {name:24} {entry['time']:10.3f} s {percent(entry['time'])} {entry['count']:>10} calls")
+        lines.append(";Commands" + " " * 22 + "calls     cached   tokenize       text      model (s)")
+        # the most expensive first
+        commands = sorted(profile["commands"].items(),
+                          key=lambda item: -(item[1]["tokenize"] + item[1]["text"] + item[1]["model"]))
+        for word, entry in commands:
+            lines.append(f";  {word:24} {entry['count']:>10} {entry['cached']:>10} {entry['tokenize']:10.3f} "
+                         f"{entry['text']:10.3f} {entry['model']:10.3f}")
+        stream.write("\n".join(lines) + "\n")
+
+    def write_report(self, destination):
+        # "-": text report to stderr, otherwise a JSON file
+        if destination == "-":
+            self.print_report(sys.stderr)
+            return
+        with open(destination, 'w', encoding='utf-8') as file1:
+            json.dump(self.to_dict(), file1, indent=1)
@@ -0,0 +1,108 @@
+from printer_model.PrinterModel import PrinterModel
+from FileMetaInfos import FileMetaInfos
+from GDecoderLine import GDecoderLine
+from Profiler import Profiler
+import io
+import json
+import pytest
+pytestmark = pytest.mark.unittests
+
+
+def test_timed_same_result_and_counted():
+    # arrange
+    profiler = Profiler()
+
+    # act
+    timed_max = profiler.timed("max", max)
+    result = [timed_max(1, 2), timed_max(4, 3)]
+
+    # assert
+    assert(result) == [2, 4]
+    assert(profiler.calls["max"][0]) == 2
+    assert(profiler.calls["max"][1]) >= 0
+
+
+def test_phase_counted_on_exception():
+    # arrange
+    profiler = Profiler()
+
+    # act
+    with pytest.raises(Exception, match="abc"):
+        with profiler.phase("a"):
+            raise Exception("abc")
+    with profiler.phase("a"):
+        pass
+
+    # assert
+    assert(profiler.phases["a"][0]) == 2
+
+
+def test_timing_hook_same_as_decode_line():
+    # arrange
+    lines = ["G90", "G1 X10 Y10 F1200", "G1 X10 Y10 F1200", "G1 X20 E1.5", "M104 S200", "G28", "G1 X10 Y10 F1200"]
+    decode_line = GDecoderLine()
+    printer = PrinterModel()
+    profiler = Profiler()
+    profiling_decode_line = GDecoderLine()
+    profiling_decode_line.timing_hook = profiler.add_command
+    profiling_printer = PrinterModel()
+
+    # act
+    decoded = [decode_line.decode_gcode_line(FileMetaInfos(), line, printer) for line in lines]
+    profiling_decoded = [profiling_decode_line.decode_gcode_line(FileMetaInfos(), line, profiling_printer)
+                         for line in lines]
+
+    # assert
+    assert(profiling_decoded) == decoded
+    assert(json.dumps(profiling_printer.get_state())) == json.dumps(printer.get_state())
+    assert(profiler.commands["G1"][0:2]) == [4, 2]
+    assert(profiler.commands["G28"][0:2]) == [1, 0]
+
+
+def test_timing_hook_undecoded():
+    # arrange
+    profiler = Profiler()
+    decode_line = GDecoderLine()
+    decode_line.timing_hook = profiler.add_command
+    decode_line.stop_on_undecoded = True
+
+    # act / assert
+    with pytest.raises(Exception):
+        decode_line.decode_gcode_line(FileMetaInfos(), "X123", PrinterModel())
+    assert(profiler.commands) == {}
+
+
+def test_print_report():
+    # arrange
+    profiler = Profiler()
+    with profiler.phase("decode lines"):
+        decode_line = GDecoderLine()
+        decode_line.timing_hook = profiler.add_command
+        decode_line.decode_gcode_line(FileMetaInfos(), "G28", PrinterModel())
+    stream = io.StringIO()
+
+    # act
+    profiler.print_report(stream)
+
+    # assert
+    report = stream.getvalue().splitlines()
+    assert(report[0]) == ";Profile"
+    assert(report[3].startswith(";  decode lines")) is True
+    assert(report[-1].startswith(";  G28")) is True
+
+
+def test_write_report_json(tmp_path):
+    # arrange
+    profiler = Profiler()
+    decode_line = GDecoderLine()
+    decode_line.timing_hook = profiler.add_command
+    decode_line.decode_gcode_line(FileMetaInfos(), "G28", PrinterModel())
+
+    # act
+    profiler.write_report(str(tmp_path / "profile.json"))
+
+    # assert
+    with open(tmp_path / "profile.json", encoding='utf-8') as file1:
+        profile = json.load(file1)
+    assert(profile["commands"]["G28"]["count"]) == 1
+    assert(profile["commands"]["G28"]["cached"]) == 0
@@ -0,0 +1,140 @@
+# Persistent on-disk cache of results (e.g. summaries) of gcode files, see: gdecoder_batch --cache
+#
+# The results are content addressed: stored under a hash of the file content, so a copied or renamed file
+# gets the same result. To avoid reading the file again, the content hash is remembered for the file name,
+# size and modification time (the index).
+#
+# Each index entry and each result is a small JSON file, written to a temporary file first and then renamed,
+# so several processes can use the same cache directory at the same time without locks
+# (a reader sees either the complete old or the complete new file).
+# The cache size is bounded: if it's exceeded, the least recently used results and index entries are removed
+# (the modification time of a result file or index entry is updated on each hit).
+# The size is scanned once, then kept up to date by each write of this process: the directory is only scanned
+# again if the size is exceeded (the files written by other processes are found then).
+
+from FileMetaInfos import FileMetaInfos
+import hashlib
+import json
+import os
+import tempfile
+
+# changed, whenever the stored results change (old results are not used anymore)
+CACHE_VERSION = "3"
+# default max. size of the results and the index (bytes)
+MAX_SIZE = 100 * 1024 * 1024
+
+
+class ResultCache:
+
+    def __init__(self, directory, max_size=MAX_SIZE):
+        self.directory = directory
+        self.max_size = max_size
+        self.index_directory = os.path.join(directory, "index")
+        self.results_directory = os.path.join(directory, "results")
+        os.makedirs(self.index_directory, exist_ok=True)
+        os.makedirs(self.results_directory, exist_ok=True)
+        # size of the stored files (bytes)
+        self.size = sum(size for mtime, size, path in self._scan_all())
+
+    def get(self, file_name):
+        # the stored result of the file content, None if there's none
+        result_name = self._result_name(self.content_hash(file_name))
+        try:
+            with open(result_name, encoding='utf-8') as file1:
+                result = json.load(file1)
+            # least recently used: a hit makes the result "new"
+            os.utime(result_name)
+        except (OSError, ValueError):
+            # not stored, just removed by another process or incomplete (e.g. disk full)
+            return None
+        return result
+
+    def put(self, file_name, result):
+        self._write(self._result_name(self.content_hash(file_name)), result)
+        if self.size > self.max_size:
+            self.evict()
+
+    def content_hash(self, file_name):
+        # hash of the file content, read only if the file was changed since the last call
+        stat = os.stat(file_name)
+        key = [os.path.abspath(file_name), stat.st_size, stat.st_mtime_ns]
+        # a single entry per file name (replaced if the file changes)
+        index_name = os.path.join(self.index_directory, self._hash(key[0]) + ".json")
+        try:
+            with open(index_name, encoding='utf-8') as file1:
+                entry = json.load(file1)
+            if entry["key"] == key:
+                os.utime(index_name)
+                return entry["content_hash"]
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+
+        content_hash = FileMetaInfos().read_content_hash(file_name)
+        self._write(index_name, {"key": key, "content_hash": content_hash})
+        return content_hash
+
+    def evict(self):
+        # remove the least recently used results and index entries, until the max. size isn't exceeded
+        # hint: without its index entry, the file is only read again (for the content hash)
+        files = self._scan_all()
+        total_size = sum(size for mtime, size, path in files)
+
+        files.sort()
+        for mtime, size, path in files:
+            if total_size <= self.max_size:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                # already removed by another process (or in use on Windows)
+                pass
+            total_size -= size
+        self.size = total_size
+
+    def _scan_all(self):
+        return self._scan(self.results_directory) + self._scan(self.index_directory)
+
+    def _scan(self, directory):
+        # (modification time, size, path) of the stored files
+        files = []
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if not entry.name.endswith(".json"):
+                    # temporary file of another process
+                    continue
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                files.append((stat.st_mtime_ns, stat.st_size, entry.path))
+        return files
+
+    def _result_name(self, content_hash):
+        return os.path.join(self.results_directory, self._hash(CACHE_VERSION + content_hash) + ".json")
+
+    def _hash(self, text):
+        return hashlib.blake2b(text.encode('utf-8'), digest_size=20).hexdigest()
+
+    def _write(self, file_name, data):
+        handle, temp_name = tempfile.mkstemp(dir=os.path.dirname(file_name), suffix=".tmp")
+        try:
+            with os.fdopen(handle, 'w', encoding='utf-8') as file1:
+                json.dump(data, file1, ensure_ascii=False)
+                file1.flush()
+                size = os.fstat(file1.fileno()).st_size
+            replaced_size = self._file_size(file_name)
+            os.replace(temp_name, file_name)
+            self.size += size - replaced_size
+        except OSError:
+            # e.g. disk full or (Windows) the file is just read by another process: just not cached
+            try:
+                os.remove(temp_name)
+            except OSError:
+                pass
+
+    def _file_size(self, file_name):
+        # 0 if the file doesn't exist (yet)
+        try:
+            return os.path.getsize(file_name)
+        except OSError:
+            return 0
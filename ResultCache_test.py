@@ -0,0 +1,164 @@
+from ResultCache import ResultCache
+import os
+import pytest
+pytestmark = pytest.mark.unittests
+
+
+def write_file(file_name, text):
+    with open(file_name, 'w') as file1:
+        file1.write(text)
+
+
+def test_get_not_stored_none(tmp_path):
+    # arrange
+    write_file(tmp_path / "a.gcode", "G1 X1\n")
+    cache = ResultCache(str(tmp_path / "cache"))
+
+    # act
+    result = cache.get(str(tmp_path / "a.gcode"))
+
+    # assert
+    assert(result) is None
+
+
+def test_put_get_same_result(tmp_path):
+    # arrange
+    write_file(tmp_path / "a.gcode", "G1 X1\n")
+    cache = ResultCache(str(tmp_path / "cache"))
+
+    # act
+    cache.put(str(tmp_path / "a.gcode"), {"lines": 1})
+
+    # assert
+    assert(cache.get(str(tmp_path / "a.gcode"))) == {"lines": 1}
+
+
+def test_get_same_content_other_file_hit(tmp_path):
+    # arrange
+    write_file(tmp_path / "a.gcode", "G1 X1\n")
+    write_file(tmp_path / "b.gcode", "G1 X1\n")
+    cache = ResultCache(str(tmp_path / "cache"))
+    cache.put(str(tmp_path / "a.gcode"), {"lines": 1})
+
+    # act
+    result = cache.get(str(tmp_path / "b.gcode"))
+
+    # assert
+    assert(result) == {"lines": 1}
+
+
+def test_get_changed_file_none(tmp_path):
+    # arrange
+    write_file(tmp_path / "a.gcode", "G1 X1\n")
+    cache = ResultCache(str(tmp_path / "cache"))
+    cache.put(str(tmp_path / "a.gcode"), {"lines": 1})
+
+    # act
+    write_file(tmp_path / "a.gcode", "G1 X1\nG1 X2\n")
+    os.utime(tmp_path / "a.gcode", ns=(0, 1))
+
+    # assert
+    assert(cache.get(str(tmp_path / "a.gcode"))) is None
+
+
+def test_get_other_process_cache_hit(tmp_path):
+    # arrange
+    write_file(tmp_path / "a.gcode", "G1 X1\n")
+    ResultCache(str(tmp_path / "cache")).put(str(tmp_path / "a.gcode"), {"lines": 1})
+
+    # act
+    result = ResultCache(str(tmp_path / "cache")).get(str(tmp_path / "a.gcode"))
+
+    # assert
+    assert(result) == {"lines": 1}
+
+
+def test_get_broken_result_none(tmp_path):
+    # arrange
+    write_file(tmp_path / "a.gcode", "G1 X1\n")
+    cache = ResultCache(str(tmp_path / "cache"))
+    cache.put(str(tmp_path / "a.gcode"), {"lines": 1})
+
+    # act
+    for name in os.listdir(cache.results_directory):
+        write_file(os.path.join(cache.results_directory, name), '{"lines": ')
+
+    # assert
+    assert(cache.get(str(tmp_path / "a.gcode"))) is None
+
+
+def stored_files(cache):
+    return [os.path.join(directory, name) for directory in (cache.results_directory, cache.index_directory)
+            for name in os.listdir(directory)]
+
+
+def test_put_max_size_least_recently_used_removed(tmp_path):
+    # arrange
+    for name in "abc":
+        write_file(tmp_path / (name + ".gcode"), name + "\n")
+    cache = ResultCache(str(tmp_path / "cache"))
+    cache.put(str(tmp_path / "a.gcode"), {"name": "a"})
+    cache.put(str(tmp_path / "b.gcode"), {"name": "b"})
+    # space for two results and their index entries
+    cache.max_size = sum(os.path.getsize(file_name) for file_name in stored_files(cache))
+    for file_name in stored_files(cache):
+        os.utime(file_name, ns=(0, 1))
+    # "a" is used again, "b" is now the least recently used
+    cache.get(str(tmp_path / "a.gcode"))
+
+    # act
+    cache.put(str(tmp_path / "c.gcode"), {"name": "c"})
+
+    # assert
+    assert(len(stored_files(cache))) == 4
+    assert(cache.get(str(tmp_path / "a.gcode"))) == {"name": "a"}
+    assert(cache.get(str(tmp_path / "b.gcode"))) is None
+    assert(cache.get(str(tmp_path / "c.gcode"))) == {"name": "c"}
+
+
+def test_put_max_size_index_entries_removed(tmp_path):
+    # arrange
+    cache = ResultCache(str(tmp_path / "cache"), 0)
+    for name in "abc":
+        write_file(tmp_path / (name + ".gcode"), name + "\n")
+        # a miss: only the index entry is stored
+        cache.get(str(tmp_path / (name + ".gcode")))
+    write_file(tmp_path / "d.gcode", "d\n")
+
+    # act
+    cache.put(str(tmp_path / "d.gcode"), {"name": "d"})
+
+    # assert
+    assert(os.listdir(cache.index_directory)) == []
+    assert(os.listdir(cache.results_directory)) == []
+
+
+def test_put_size_kept_without_scan(tmp_path, monkeypatch):
+    # arrange
+    write_file(tmp_path / "a.gcode", "a\n")
+    write_file(tmp_path / "b.gcode", "b\n")
+    cache = ResultCache(str(tmp_path / "cache"))
+    cache.put(str(tmp_path / "a.gcode"), {"name": "a"})
+    scanned = []
+    monkeypatch.setattr(cache, "_scan", lambda directory: scanned.append(directory) or [])
+
+    # act
+    cache.put(str(tmp_path / "b.gcode"), {"name": "b"})
+    cache.put(str(tmp_path / "a.gcode"), {"name": "a2"})
+
+    # assert
+    # below the max. size: no scan of the directory
+    assert(scanned) == []
+    assert(cache.size) == sum(os.path.getsize(file_name) for file_name in stored_files(cache))
+
+
+def test_init_size_of_stored_files(tmp_path):
+    # arrange
+    write_file(tmp_path / "a.gcode", "a\n")
+    ResultCache(str(tmp_path / "cache")).put(str(tmp_path / "a.gcode"), {"name": "a"})
+
+    # act
+    cache = ResultCache(str(tmp_path / "cache"))
+
+    # assert
+    assert(cache.size) == sum(os.path.getsize(file_name) for file_name in stored_files(cache))
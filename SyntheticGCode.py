@@ -0,0 +1,188 @@
+# Large synthetic gcode files, e.g. for benchmarks (see: gdecoder_benchmark)
+#
+# The files mimic the layout of real slicer output (header, start gcode, layers, end gcode, settings comments):
+# - Cura: Marlin flavor, absolute extrusion, ";LAYER:<n>" and ";TYPE:" comments
+# - PrusaSlicer: relative extrusion, ";LAYER_CHANGE", ";Z:" and ";TYPE:" comments, M73 progress, settings at the end
+# - Slic3r: absolute extrusion (reset by G92 E0 at each layer), no layer comments, settings at the end
+# Each layer has some perimeter loops and a zigzag infill with retracts and travel moves, the coordinates vary
+# slightly (seeded random numbers, the same file for the same parameters).
+# The lines are written as they are generated, the memory usage doesn't depend on the number of lines.
+
+import itertools
+import math
+import random
+
+LAYOUTS = ("cura", "prusaslicer", "slic3r")
+
+# center and radius of the printed part (mm), layer height (mm)
+_CENTER = 100.0
+_RADIUS = 30.0
+_LAYER_HEIGHT = 0.2
+# segments of a perimeter loop, number of perimeter loops and infill lines per layer
+_SEGMENTS = 48
+_PERIMETERS = 3
+_INFILL_LINES = 40
+# extruded length per mm of the path (mm)
+_E_PER_MM = 0.033
+# lines written at once
+_WRITE_LINES = 10000
+
+
+def _layer_moves(rng, layer):
+    # ("type", [(x, y), ...]) of the paths of a layer, the first point of each path is reached by a travel move
+    paths = []
+    for perimeter in range(_PERIMETERS):
+        radius = _RADIUS - perimeter * 0.45 + rng.uniform(-0.01, 0.01)
+        start = rng.uniform(0, 2 * math.pi)
+        points = [(_CENTER + radius * math.cos(start + 2 * math.pi * index / _SEGMENTS),
+                   _CENTER + radius * math.sin(start + 2 * math.pi * index / _SEGMENTS)) for index in range(_SEGMENTS + 1)]
+        paths.append(("outer" if perimeter == 0 else "inner", points))
+
+    # zigzag inside the perimeters, the direction changes with each layer
+    points = []
+    size = _RADIUS - _PERIMETERS * 0.45
+    for index in range(_INFILL_LINES):
+        offset = -size * 0.7 + 1.4 * size * index / (_INFILL_LINES - 1)
+        half = math.sqrt(max(size * size - offset * offset, 0.0)) * 0.95
+        ends = [(-half, offset), (half, offset)] if index % 2 == 0 else [(half, offset), (-half, offset)]
+        for a, b in ends:
+            if layer % 2 == 1:
+                a, b = b, a
+            points.append((_CENTER + a, _CENTER + b))
+    paths.append(("infill", points))
+    return paths
+
+
+def _distance(a, b):
+    return math.hypot(b[0] - a[0], b[1] - a[1])
+
+
+def _cura_lines(rng):
+    yield from (";FLAVOR:Marlin", ";TIME:12345", ";Filament used: 12.3456m", ";Layer height: 0.2",
+                ";MINX:70 ;MINY:70 ;MINZ:0.2", ";Generated with Cura_SteamEngine 5.5.0",
+                "M140 S60", "M105", "M190 S60", "M104 S200", "M105", "M109 S200", "M82 ;absolute extrusion mode",
+                "M204 P500.00 R1000.00 T500.00", "M205 X8.00 Y8.00 Z0.40 E5.00",
+                "G28 ;Home", "G92 E0", "G1 Z2.0 F3000", "G1 X0.1 Y20 Z0.3 F5000.0", "G1 X0.1 Y200.0 Z0.3 F1500.0 E15",
+                "G92 E0", "G1 Z2.0 F3000", "G92 E0", "G92 E0", "G1 F2700 E-5", ";LAYER_COUNT:1000000")
+    e = -5.0
+    for layer in itertools.count():
+        z = round((layer + 1) * _LAYER_HEIGHT, 2)
+        yield ";LAYER:" + str(layer)
+        if layer == 1:
+            yield "M106 S255"
+        for path_type, points in _layer_moves(rng, layer):
+            yield ";TYPE:" + {"outer": "WALL-OUTER", "inner": "WALL-INNER", "infill": "FILL"}[path_type]
+            yield "G0 F6000 X%.3f Y%.3f Z%.1f" % (points[0][0], points[0][1], z)
+            e += 5
+            yield "G1 F2700 E%.5f" % e
+            position = points[0]
+            yield "G1 F1500"
+            for point in points[1:]:
+                e += _distance(position, point) * _E_PER_MM
+                position = point
+                yield "G1 X%.3f Y%.3f E%.5f" % (point[0], point[1], e)
+            e -= 5
+            yield "G1 F2700 E%.5f" % e
+        yield ";TIME_ELAPSED:%.6f" % (layer * 12.3)
+
+
+def _cura_end_lines():
+    return ["M140 S0", "M107", "G91 ;Relative positioning", "G1 E-2 F2700", "G1 E-2 Z0.2 F2400",
+            "G90 ;Absolute positioning", "G1 X0 Y235 F3000", "M106 S0", "M104 S0", "M140 S0", "M84",
+            "M82 ;absolute extrusion mode", "M104 S0", ";End of Gcode", ";SETTING_3 {\"global_quality\": \"[general]\\n\"}"]
+
+
+def _prusaslicer_lines(rng):
+    yield from ("; generated by PrusaSlicer 2.7.1+win64 on 2024-01-01 at 12:00:00 UTC", "", "; external perimeters "
+                "extrusion width = 0.45mm", "; perimeters extrusion width = 0.45mm", "; infill extrusion width = 0.45mm",
+                "", "M73 P0 R200", "M201 X1000 Y1000 Z200 E5000", "M203 X200 Y200 Z12 E120",
+                "M204 P1250 R1250 T1250", "M205 X8.00 Y8.00 Z0.40 E4.50", "M107", ";TYPE:Custom", "M862.3 P \"MK3S\"",
+                "M862.1 P0.4", "G90", "M83", "M104 S215", "M140 S60", "M190 S60", "M109 S215", "G28 W", "G1 Z0.2 F720",
+                "G1 Y-3 F1000", "G1 X60 E9 F1000", "G1 X100 E12.5 F1000", "G92 E0", "M221 S95", "G21", "G90", "M83",
+                "M900 K0.06", "G1 E-.8 F2100")
+    for layer in itertools.count():
+        z = round((layer + 1) * _LAYER_HEIGHT, 2)
+        yield from (";LAYER_CHANGE", ";Z:%g" % z, ";HEIGHT:0.2", ";BEFORE_LAYER_CHANGE", "G92 E0.0", ";%g" % z, "",
+                    "G1 Z%g F720" % z, ";AFTER_LAYER_CHANGE", ";%g" % z)
+        if layer % 10 == 0:
+            yield "M73 P%d R%d" % (layer // 10 % 100, 200 - layer // 10 % 200)
+        if layer == 1:
+            yield "M106 S255"
+        for path_type, points in _layer_moves(rng, layer):
+            yield "G1 X%.3f Y%.3f F9000" % points[0]
+            yield "G1 E.8 F2100"
+            yield ";TYPE:" + {"outer": "External perimeter", "inner": "Perimeter", "infill": "Solid infill"}[path_type]
+            yield ";WIDTH:0.45"
+            yield "G1 F1800"
+            position = points[0]
+            for point in points[1:]:
+                yield "G1 X%.3f Y%.3f E%.5f" % (point[0], point[1], _distance(position, point) * _E_PER_MM)
+                position = point
+            yield "G1 E-.8 F2100"
+
+
+def _prusaslicer_end_lines():
+    return ["M107", ";TYPE:Custom", "G1 Z30 F720", "M104 S0", "M140 S0", "M107", "G1 X0 Y200 F3000", "M84",
+            "M73 P100 R0", "", "; filament used [mm] = 12345.67", "; filament used [g] = 36.82",
+            "; estimated printing time (normal mode) = 3h 20m 1s", "", "; prusaslicer_config = begin",
+            "; avoid_crossing_perimeters = 0", "; bed_temperature = 60", "; external_perimeter_speed = 25",
+            "; first_layer_temperature = 215", "; layer_height = 0.2", "; perimeters = 3", "; temperature = 215",
+            "; prusaslicer_config = end"]
+
+
+def _slic3r_lines(rng):
+    yield from ("; generated by Slic3r 1.3.0 on 2024-01-01 at 12:00:00", "", "; external perimeters extrusion width "
+                "= 0.45mm", "; perimeters extrusion width = 0.45mm", "", "M107", "M104 S200 ; set temperature",
+                "G28 ; home all axes", "G1 Z5 F5000 ; lift nozzle", "M109 S200 ; wait for temperature to be reached",
+                "G21 ; set units to millimeters", "G90 ; use absolute coordinates",
+                "M82 ; use absolute distances for extrusion", "G92 E0", "M204 S1000")
+    for layer in itertools.count():
+        z = round((layer + 1) * _LAYER_HEIGHT, 3)
+        yield "G92 E0"
+        yield "G1 Z%.3f F7800.000" % z
+        if layer == 1:
+            yield "M106 S255"
+        e = 0.0
+        for path_type, points in _layer_moves(rng, layer):
+            yield "G1 X%.3f Y%.3f F7800.000" % points[0]
+            e += 2
+            yield "G1 E%.5f F2400.00000" % e
+            yield "G1 F1800.000"
+            position = points[0]
+            for point in points[1:]:
+                e += _distance(position, point) * _E_PER_MM
+                position = point
+                yield "G1 X%.3f Y%.3f E%.5f" % (point[0], point[1], e)
+            e -= 2
+            yield "G1 E%.5f F2400.00000" % e
+
+
+def _slic3r_end_lines():
+    return ["M107", "M104 S0 ; turn off temperature", "G28 X0  ; home X axis", "M84     ; disable motors", "",
+            "; filament used = 12345.7mm (29.7cm3)", "", "; avoid_crossing_perimeters = 0",
+            "; bed_temperature = 0", "; extrusion_multiplier = 1", "; layer_height = 0.2", "; perimeters = 3",
+            "; temperature = 200"]
+
+
+_LAYOUT_LINES = {
+    "cura": (_cura_lines, _cura_end_lines),
+    "prusaslicer": (_prusaslicer_lines, _prusaslicer_end_lines),
+    "slic3r": (_slic3r_lines, _slic3r_end_lines),
+}
+
+
+def write_synthetic_gcode(file_name, line_count, layout="prusaslicer", seed=0):
+    # a file with exactly line_count lines (at least the end gcode)
+    if layout not in _LAYOUT_LINES:
+        raise Exception("Unknown layout: " + layout + " (known: " + ", ".join(LAYOUTS) + ")")
+    lines, end_lines = _LAYOUT_LINES[layout]
+    end_lines = end_lines()
+    body = itertools.islice(lines(random.Random(seed)), max(line_count - len(end_lines), 0))
+
+    with open(file_name, 'w', encoding='utf-8', newline="\n") as file1:
+        while True:
+            block = list(itertools.islice(body, _WRITE_LINES))
+            if not block:
+                break
+            file1.write("\n".join(block) + "\n")
+        file1.write("\n".join(end_lines) + "\n")
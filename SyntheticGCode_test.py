@@ -0,0 +1,64 @@
+from FileMetaInfos import FileMetaInfos
+from SyntheticGCode import LAYOUTS
+from SyntheticGCode import write_synthetic_gcode
+from gdecoder import gdecoder
+from gdecoder import parse_args
+import pytest
+pytestmark = pytest.mark.unittests
+
+generator_testdata = [
+    ("cura", "Cura", "Marlin"),
+    ("prusaslicer", "PrusaSlicer", ""),
+    ("slic3r", "Slic3r", ""),
+]
+
+
+@pytest.mark.parametrize("layout", LAYOUTS)
+def test_write_line_count(tmp_path, layout):
+    # act
+    write_synthetic_gcode(tmp_path / "a.gcode", 5000, layout)
+
+    # assert
+    with open(tmp_path / "a.gcode", 'rb') as file1:
+        assert(len(file1.readlines())) == 5000
+
+
+@pytest.mark.parametrize("layout,generator,flavor", generator_testdata)
+def test_write_generator_detected(tmp_path, layout, generator, flavor):
+    # arrange
+    write_synthetic_gcode(tmp_path / "a.gcode", 5000, layout)
+    meta_infos = FileMetaInfos()
+
+    # act
+    meta_infos.read_meta_infos(str(tmp_path / "a.gcode"))
+
+    # assert
+    assert(meta_infos.generator) == generator
+    assert(meta_infos.generator_flavor) == flavor
+
+
+@pytest.mark.parametrize("layout", LAYOUTS)
+def test_write_all_lines_decoded(tmp_path, capsys, layout):
+    # arrange
+    write_synthetic_gcode(tmp_path / "a.gcode", 5000, layout)
+
+    # act (stop on undecoded gcode)
+    gdecoder(parse_args(["-i", str(tmp_path / "a.gcode"), "-u", "-c", "-g", "-d"]))
+
+    # assert
+    assert(";  Lines     : 5000\n" in capsys.readouterr().out)
+
+
+def test_write_same_seed_same_file(tmp_path):
+    # act
+    write_synthetic_gcode(tmp_path / "a.gcode", 2000, "cura", seed=1)
+    write_synthetic_gcode(tmp_path / "b.gcode", 2000, "cura", seed=1)
+
+    # assert
+    assert((tmp_path / "a.gcode").read_bytes()) == (tmp_path / "b.gcode").read_bytes()
+
+
+def test_write_unknown_layout_exception(tmp_path):
+    # act / assert
+    with pytest.raises(Exception, match="Unknown layout"):
+        write_synthetic_gcode(tmp_path / "a.gcode", 100, "simplify3d")
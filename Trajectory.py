@@ -0,0 +1,433 @@
+# Extract the motion commands of a gcode file into columns, one row per motion command
+#
+# The columns are contiguous typed arrays (array.array). The summary values are reductions over
+# these columns, done by C implemented builtins (min, max, itertools.compress, bytes.translate),
+# instead of PrinterModel method calls for every single line.
+# No decoded text is created, so this is much faster than the annotated decode.
+#
+# The file is memory mapped and tokenized as bytes: only comment lines and (rare) non-ASCII lines are decoded
+# to str (for the meta infos), parameter values are only converted if they are used.
+
+from printer_model.ArcGeometry import arc_geometries
+from printer_model.MoveStatistics import MoveStatistics
+from printer_model.PrinterModel import PrinterModel
+from printer_model.PrinterModelValue import format_value
+from printer_model.PrintTimeEstimator import PrintTimeEstimator
+from printer_model.ThermalModel import ThermalModel
+from FileMetaInfos import STDIN
+from FileMetaInfos import is_compressed
+from array import array
+from itertools import chain
+from itertools import compress
+import io
+import math
+import mmap
+import os
+import re
+
+# command codes: G-codes by their number, M-codes by 1000 + their number
+CODE_G0 = 0
+CODE_G1 = 1
+CODE_G2 = 2
+CODE_G3 = 3
+CODE_G28 = 28
+CODE_M104 = 1104
+CODE_M106 = 1106
+CODE_M107 = 1107
+CODE_M109 = 1109
+CODE_M140 = 1140
+CODE_M190 = 1190
+# not a gcode: ;TYPE:SKIRT comment, value is the current Z position
+CODE_SKIRT = 9999
+
+# row flags
+FLAG_PRINT = 1
+FLAG_X = 2
+FLAG_Y = 4
+FLAG_Z = 8
+FLAG_E = 16
+
+# the geometry of the G2/G3 moves is computed in batches of this many arcs (see: arc_geometries)
+ARC_BATCH = 4096
+
+_MOTION_CODES = {b"G0": CODE_G0, b"G1": CODE_G1, b"G2": CODE_G2, b"G3": CODE_G3}
+_EVENT_CODES = {b"M104": CODE_M104, b"M106": CODE_M106, b"M109": CODE_M109, b"M140": CODE_M140, b"M190": CODE_M190}
+
+# parameter letters (first byte of a token)
+_LETTER_E = ord("E")
+_LETTER_F = ord("F")
+_LETTER_I = ord("I")
+_LETTER_J = ord("J")
+_LETTER_P = ord("P")
+_LETTER_R = ord("R")
+_LETTER_S = ord("S")
+_LETTER_X = ord("X")
+_LETTER_Y = ord("Y")
+_LETTER_Z = ord("Z")
+
+# CR not followed by LF: an (old Mac) line break
+_LONE_CR = re.compile(b"\r(?!\n)")
+
+# M104/M106/... S value -> ThermalModel (hint: M190 doesn't change the bed temperature values, see: PrinterModel)
+_THERMAL_MODEL_CALLS = {
+    CODE_M104: lambda thermal_model, value: thermal_model.set_target("extruder", value),
+    CODE_M106: ThermalModel.set_fan,
+    CODE_M109: lambda thermal_model, value: thermal_model.wait_target("extruder", value),
+    CODE_M140: lambda thermal_model, value: thermal_model.set_target("bed", value),
+    CODE_M190: lambda thermal_model, value: thermal_model.wait_target("bed", value),
+}
+# letter and value of M201/M203/M204/M205 -> PrintTimeEstimator (unknown letters are ignored there)
+_TIME_ESTIMATOR_SETTERS = {
+    b"M201": PrintTimeEstimator.set_max_acceleration,
+    b"M203": PrintTimeEstimator.set_max_feedrate,
+    b"M204": PrintTimeEstimator.set_default_acceleration,
+    b"M205": PrintTimeEstimator.set_jerk,
+}
+
+
+def _mask_table(required, any_of=0):
+    # translation table: flags byte -> 1 if all "required" and (one of "any_of") flags are set, else 0
+    return bytes(1 if (flags & required) == required and (any_of == 0 or flags & any_of) else 0
+                 for flags in range(256))
+
+
+_PRINT_X = _mask_table(FLAG_PRINT | FLAG_X)
+_PRINT_Y = _mask_table(FLAG_PRINT | FLAG_Y)
+_PRINT_XYZ = _mask_table(FLAG_PRINT, FLAG_X | FLAG_Y | FLAG_Z)
+
+
+def _given(splitted):
+    # the parameter tokens with a value, a letter without a value is taken as not given
+    # (like in the decoded path, see: GCodeCommand.empty_value)
+    return [token for token in splitted[1:] if len(token) > 1]
+
+
+def _value_range(values):
+    # (min, max) of the known values (NaN: not known), NaN if there is none
+    known = array('d', filter(math.isfinite, values))
+    if len(known) == 0:
+        return math.nan, math.nan
+    return min(known), max(known)
+
+
+class Trajectory:
+
+    def __init__(self):
+        # one row per motion command, positions are absolute after the command was executed
+        self.code = array('H')
+        self.x = array('d')
+        self.y = array('d')
+        self.z = array('d')
+        # physical extruder position (total extruded length)
+        self.e = array('d')
+        self.f = array('d')
+        self.line = array('L')
+        self.flags = bytearray()
+
+        # bounding box of the G2/G3 arcs (they bulge past their start and end points), one row per arc
+        self.arc_x_min = array('d')
+        self.arc_x_max = array('d')
+        self.arc_y_min = array('d')
+        self.arc_y_max = array('d')
+
+        # sparse events (temperatures, fan, ...), one row per event
+        self.event_code = array('H')
+        self.event_value = array('d')
+        self.event_line = array('L')
+
+        self.gcode_command_count = 0
+        # print time and move statistics, fed while reading (the planner needs the moves in sequence anyway)
+        self.time_estimator = PrintTimeEstimator()
+        self.thermal_model = ThermalModel(self.time_estimator)
+        self.move_statistics = MoveStatistics()
+        # moves waiting for the geometry of an arc batch before they are passed to the time estimator and the
+        # statistics (in sequence): (dx, dy, dz, de, feedrate, row) and (start X, start Y, end X, end Y, I, J, R,
+        # clockwise, row) of the arcs
+        self._pending_moves = []
+        self._pending_arcs = []
+
+        # state while reading, same semantics as in PrinterModel
+        self._x = math.nan
+        self._y = math.nan
+        self._z = math.nan
+        self._e_physical = 0.0
+        self._e_logical = 0.0
+        self._feedrate = math.nan
+        self._relative_positioning = False
+        self._relative_extruder = False
+
+    def read(self, file_name, meta_infos):
+        if file_name == STDIN or is_compressed(file_name):
+            # no memory map, the (decompressed) lines are streamed
+            with meta_infos.open_input(file_name, binary=True) as file1:
+                self.read_lines(file1, meta_infos)
+            return
+
+        with open(file_name, 'rb') as file1:
+            if os.fstat(file1.fileno()).st_size == 0:
+                # an empty file can't be mapped
+                return
+            with mmap.mmap(file1.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                if _LONE_CR.search(data):
+                    # (old Mac) CR only line breaks: bytes lines would differ from text mode (universal newlines)
+                    file1.seek(0)
+                    self.read_lines((line.encode('utf-8') for line in io.TextIOWrapper(file1, encoding='utf-8')),
+                                    meta_infos)
+                    return
+                self.read_lines(iter(data.readline, b""), meta_infos)
+
+    def read_lines(self, lines, meta_infos):
+        # lines: bytes, including the line breaks
+        line_number = 0
+
+        for raw_line in lines:
+            line_number += 1
+            line = raw_line.strip()
+            if line.startswith(b";"):
+                meta_infos.process_bytes_line(raw_line, line)
+                if b";type:skirt" in line.lower():
+                    self._add_event(CODE_SKIRT, self._z, line_number)
+                continue
+
+            # a short ASCII line can't change the meta infos, except for the line count
+            if len(raw_line) > meta_infos.longest_line or not raw_line.isascii():
+                meta_infos.process_bytes_line(raw_line, line)
+            else:
+                meta_infos.line_count += 1
+
+            if line == b"":
+                continue
+            # avoid a strange gcode line (bug in Slic3r 1.37.2.1-prusa3d-win64?)
+            if line == b"Filament-specific end gcode":
+                continue
+
+            self.gcode_command_count += 1
+            splitted = line.split(b";", 1)[0].split()
+            word = splitted[0]
+
+            code = _MOTION_CODES.get(word)
+            if code is not None:
+                self._read_motion(code, splitted, line_number)
+                continue
+
+            code = _EVENT_CODES.get(word)
+            if code is not None:
+                self._read_event(code, splitted, line_number)
+                continue
+
+            self._read_other(word, splitted, line_number)
+        self._add_pending_moves()
+
+    def _read_motion(self, code, splitted, line_number):
+        start_x, start_y, start_z, start_e = self._x, self._y, self._z, self._e_physical
+        flags = FLAG_PRINT if code != CODE_G0 else 0
+        for token in _given(splitted):
+            key = token[0]
+            if key == _LETTER_X:
+                if self._relative_positioning:
+                    raise Exception("relative X positions not implemented")
+                self._x = float(token[1:])
+                flags |= FLAG_X
+            elif key == _LETTER_Y:
+                if self._relative_positioning:
+                    raise Exception("relative Y positions not implemented")
+                self._y = float(token[1:])
+                flags |= FLAG_Y
+            elif key == _LETTER_Z and code <= CODE_G1:
+                self._read_z(float(token[1:]))
+                flags |= FLAG_Z
+            elif key == _LETTER_E and code != CODE_G0:
+                self._read_e(float(token[1:]))
+                flags |= FLAG_E
+            elif key == _LETTER_F:
+                self._feedrate = float(token[1:])
+
+        if code >= CODE_G2:
+            self._read_arc(code, splitted, start_x, start_y)
+        self._add_row(code, flags, line_number)
+        dx = self._x - start_x
+        dy = self._y - start_y
+        dz = self._z - start_z
+        de = self._e_physical - start_e
+        self._add_move(dx, dy, dz, de)
+
+    def _add_move(self, dx, dy, dz, de):
+        # the move of the last row, in sequence after the pending moves
+        if self._pending_arcs:
+            self._pending_moves.append((dx, dy, dz, de, self._feedrate, len(self.code) - 1))
+            if len(self._pending_arcs) >= ARC_BATCH:
+                self._add_pending_moves()
+            return
+        self.time_estimator.add_move(dx, dy, dz, de, self._feedrate)
+        self.move_statistics.add_move(dx, dy, dz, de, self._feedrate)
+
+    def _read_arc(self, code, splitted, start_x, start_y):
+        # an arc of the next row, its geometry is computed with the pending arcs (see: _add_pending_moves)
+        i = j = r = None
+        for token in _given(splitted):
+            key = token[0]
+            if key == _LETTER_I:
+                i = float(token[1:])
+            elif key == _LETTER_J:
+                j = float(token[1:])
+            elif key == _LETTER_R:
+                r = float(token[1:])
+        self._pending_arcs.append((start_x, start_y, self._x, self._y, i, j, r, code == CODE_G2, len(self.code)))
+
+    def _add_pending_moves(self):
+        # the geometry of the pending arcs in one batch, then the pending moves in their sequence
+        # hint: needed before anything else depends on the time estimator (thermal model, dwell, settings)
+        if not self._pending_arcs:
+            return
+        *columns, rows = zip(*self._pending_arcs)
+        lengths = {}
+        for row, length, x_min, x_max, y_min, y_max in zip(rows, *arc_geometries(*columns)):
+            if length != length:
+                # no arc (see: arc_parameters), a straight move
+                continue
+            lengths[row] = length
+            # the arc bounding box is a print range (see: PrinterModel._print_arc)
+            self.flags[row] |= FLAG_X | FLAG_Y
+            self.arc_x_min.append(x_min)
+            self.arc_x_max.append(x_max)
+            self.arc_y_min.append(y_min)
+            self.arc_y_max.append(y_max)
+        for dx, dy, dz, de, feedrate, row in self._pending_moves:
+            length = lengths.get(row)
+            self.time_estimator.add_move(dx, dy, dz, de, feedrate, length)
+            self.move_statistics.add_move(dx, dy, dz, de, feedrate, length)
+        self._pending_arcs.clear()
+        self._pending_moves.clear()
+
+    def _read_event(self, code, splitted, line_number):
+        self._add_pending_moves()
+        for token in _given(splitted):
+            if token[0] == _LETTER_S:
+                value = float(token[1:])
+                self._add_event(code, value, line_number)
+                _THERMAL_MODEL_CALLS[code](self.thermal_model, value)
+
+    def _read_z(self, value):
+        if self._relative_positioning:
+            if math.isnan(self._z):
+                raise Exception("relative Z move without initial positioning")
+            value += self._z
+        self._z = value
+
+    def _read_e(self, value):
+        if self._relative_extruder:
+            self._e_physical += value
+            self._e_logical += value
+        else:
+            self._e_physical += value - self._e_logical
+            self._e_logical = value
+
+    def _read_other(self, word, splitted, line_number):
+        match word:
+            case b"G28":
+                self._read_home(splitted, line_number)
+            case b"G90":
+                self._relative_positioning = False
+            case b"G91":
+                self._relative_positioning = True
+            case b"G92":
+                for token in _given(splitted):
+                    if token[0] == _LETTER_E:
+                        self._e_logical = float(token[1:])
+            case b"M82":
+                self._relative_extruder = False
+            case b"M83":
+                self._relative_extruder = True
+            case b"M107":
+                self._add_pending_moves()
+                self._add_event(CODE_M106, 0.0, line_number)
+                self.thermal_model.set_fan(0.0)
+            case b"G4":
+                self._add_pending_moves()
+                for token in _given(splitted):
+                    self.time_estimator.dwell(float(token[1:]) / (1000 if token[0] == _LETTER_P else 1))
+            case b"M201" | b"M203" | b"M204" | b"M205":
+                self._add_pending_moves()
+                method = _TIME_ESTIMATOR_SETTERS[word]
+                for token in _given(splitted):
+                    method(self.time_estimator, chr(token[0]), float(token[1:]))
+
+    def _read_home(self, splitted, line_number):
+        x = y = None
+        for token in splitted[1:]:
+            # an axis without a value is homed (see: GCodeCommand.empty_value)
+            if token[0] == _LETTER_X:
+                x = float(token[1:]) if len(token) > 1 else 0.0
+            elif token[0] == _LETTER_Y:
+                y = float(token[1:]) if len(token) > 1 else 0.0
+        # home all three axis if no specific X or Y given, the same values are accepted (see: PrinterModel.home)
+        if x is None and y is None:
+            x = y = self._z = 0.0
+        if x is not None:
+            if x != 0:
+                raise Exception("homeX: Unexpected value: " + format_value(x))
+            self._x = 0.0
+        if y is not None:
+            if y != 0:
+                raise Exception("homeY: Unexpected value: " + format_value(y))
+            self._y = 0.0
+        self._add_row(CODE_G28, 0, line_number)
+
+    def _add_row(self, code, flags, line_number):
+        self.code.append(code)
+        self.x.append(self._x)
+        self.y.append(self._y)
+        self.z.append(self._z)
+        self.e.append(self._e_physical)
+        self.f.append(self._feedrate)
+        self.line.append(line_number)
+        self.flags.append(flags)
+
+    def _add_event(self, code, value, line_number):
+        self.event_code.append(code)
+        self.event_value.append(value)
+        self.event_line.append(line_number)
+
+    def _print_range(self, column, table):
+        # end points of the selected print moves and their start points (= end point of the previous row)
+        mask = self.flags.translate(table)
+        end_points = compress(column, mask)
+        start_points = compress(chain((math.nan,), column), mask)
+        return _value_range(chain(end_points, start_points))
+
+    def print_range_x(self):
+        return _value_range(chain(self._print_range(self.x, _PRINT_X), self.arc_x_min, self.arc_x_max))
+
+    def print_range_y(self):
+        return _value_range(chain(self._print_range(self.y, _PRINT_Y), self.arc_y_min, self.arc_y_max))
+
+    def print_range_z(self):
+        low, high = self._print_range(self.z, _PRINT_XYZ)
+        skirt_low, skirt_high = _value_range(self.event_values(CODE_SKIRT))
+        return _value_range((low, high, skirt_low, skirt_high))
+
+    def extruder_physical_max(self):
+        return max(0.0, max(self.e, default=0.0))
+
+    def event_values(self, *codes):
+        return compress(self.event_value, (code in codes for code in self.event_code))
+
+    def event_max(self, *codes):
+        return max(self.event_values(*codes), default=math.nan)
+
+    def to_printer_model(self):
+        # a PrinterModel with the min/max values as needed by the summary
+        printer = PrinterModel()
+        for value, (low, high) in ((printer.print_position_x, self.print_range_x()),
+                                   (printer.print_position_y, self.print_range_y()),
+                                   (printer.print_position_z, self.print_range_z())):
+            value.set(low)
+            value.set(high)
+        printer.extruder_physical.set(self.extruder_physical_max())
+        printer.extruder_temp.set(self.event_max(CODE_M104, CODE_M109))
+        printer.bed_temp.set(self.event_max(CODE_M140))
+        printer.fan.set(self.event_max(CODE_M106))
+        printer.time_estimator = self.time_estimator
+        printer.thermal_model = self.thermal_model
+        printer.move_statistics = self.move_statistics
+        return printer
@@ -0,0 +1,232 @@
+from printer_model.PrinterModel import PrinterModel
+from Trajectory import Trajectory
+from Trajectory import CODE_G1
+from Trajectory import CODE_G28
+from Trajectory import FLAG_PRINT
+from Trajectory import FLAG_X
+from Trajectory import FLAG_Y
+from Trajectory import FLAG_E
+from FileMetaInfos import FileMetaInfos
+from GDecoderLine import GDecoderLine
+import math
+import pytest
+pytestmark = pytest.mark.unittests
+
+
+def read_trajectory(lines):
+    trajectory = Trajectory()
+    trajectory.read_lines([(line + "\n").encode() for line in lines], FileMetaInfos())
+    return trajectory
+
+
+def test_read_lines_one_row_per_motion_command():
+    # act
+    trajectory = read_trajectory(["; comment", "G28", "M104 S200", "G1 X10 E1 F1200", "G92 E0"])
+
+    # assert
+    assert(list(trajectory.code)) == [CODE_G28, CODE_G1]
+    assert(list(trajectory.x)) == [0, 10]
+    assert(list(trajectory.e)) == [0, 1]
+    assert(trajectory.f[1]) == 1200
+    assert(list(trajectory.line)) == [2, 4]
+    assert(trajectory.flags[1]) == FLAG_PRINT | FLAG_X | FLAG_E
+    assert(trajectory.gcode_command_count) == 4
+
+
+def test_read_lines_extruder_physical_absolute_and_relative():
+    # act
+    trajectory = read_trajectory(["G1 E5", "G92 E0", "G1 E2", "M83", "G1 E1", "G1 E-0.5"])
+
+    # assert
+    assert(list(trajectory.e)) == [5, 7, 8, 7.5]
+    assert(trajectory.extruder_physical_max()) == 8
+
+
+def test_read_lines_relative_z():
+    # act
+    trajectory = read_trajectory(["G28", "G91", "G1 Z0.3", "G0 Z1"])
+
+    # assert
+    assert(trajectory.z[-1]) == pytest.approx(1.3)
+
+
+def test_read_lines_relative_x_raises_exception():
+    # act
+    with pytest.raises(Exception) as e_info:
+        read_trajectory(["G28", "G91", "G1 X1"])
+
+    # assert
+    assert(e_info.value.args[0]) == "relative X positions not implemented"
+
+
+def test_print_range_includes_start_points_only_for_print_moves():
+    # act
+    trajectory = read_trajectory(["G0 X1 Y5 Z0.2", "G1 X2 E1", "G0 X50", "G1 Y6 E2"])
+
+    # assert
+    assert(trajectory.print_range_x()) == (1, 2)
+    assert(trajectory.print_range_y()) == (5, 6)
+    assert(trajectory.print_range_z()) == (0.2, 0.2)
+
+
+def test_print_range_unknown():
+    # act
+    trajectory = read_trajectory(["G0 X1"])
+
+    # assert
+    assert(all(math.isnan(value) for value in trajectory.print_range_x()))
+
+
+def test_event_max_temperatures_and_fan():
+    # act
+    trajectory = read_trajectory(["M104 S200", "M109 S215", "M140 S60", "M106 S255", "M107"])
+
+    # assert
+    assert(trajectory.event_max(1104, 1109)) == 215
+    assert(trajectory.event_max(1140)) == 60
+    assert(trajectory.event_max(1106)) == 255
+    assert(math.isnan(trajectory.event_max(1190)))
+
+
+def test_to_printer_model_same_as_printer_model_summary_values():
+    # act
+    printer = read_trajectory(["G28", "G0 Z0.3", "G1 X1 Y2 E3", "M104 S210"]).to_printer_model()
+
+    # assert
+    assert(printer.print_position_x.get_min()) == 0
+    assert(printer.print_position_x.get_max()) == 1
+    assert(printer.print_position_z.get_max()) == 0.3
+    assert(printer.extruder_physical.get_max()) == 3
+    assert(printer.extruder_temp.get_max()) == 210
+    assert(math.isnan(printer.bed_temp.get_max()))
+
+
+@pytest.mark.parametrize("line", ["G28 X5", "G28 X0 Y-1.5"])
+def test_read_lines_home_unexpected_value_same_exception_as_printer_model(line):
+    # arrange
+    with pytest.raises(Exception) as printer_info:
+        GDecoderLine().apply_gcode_line(line, PrinterModel())
+
+    # act
+    with pytest.raises(Exception) as e_info:
+        read_trajectory([line])
+
+    # assert
+    assert(e_info.value.args[0]) == printer_info.value.args[0]
+
+
+def test_read_lines_home_zero_values():
+    # act
+    trajectory = read_trajectory(["G1 X10 Y20 Z5", "G28 X0", "G28 Y0.0"])
+
+    # assert
+    assert((trajectory.x[1], trajectory.y[1], trajectory.z[1])) == (0, 20, 5)
+    assert((trajectory.x[2], trajectory.y[2], trajectory.z[2])) == (0, 0, 5)
+
+
+def test_read_lines_parameter_without_value_same_as_printer_model():
+    # arrange
+    lines = ["G28 X Y", "G1 Z0.2 F600", "G1 X10 Y F E", "G1 X", "M104 S", "G92 E", "G4 P", "G2 X0 Y0 I J E",
+             "G1 X20 Y5 E1", "G28 X"]
+    printer = PrinterModel()
+    decode_line = GDecoderLine()
+    for line in lines:
+        decode_line.apply_gcode_line(line, printer)
+
+    # act
+    trajectory = read_trajectory(lines)
+    trajectory_printer = trajectory.to_printer_model()
+
+    # assert
+    assert((trajectory.x[-1], trajectory.y[-1])) == (printer.position_x.get(), printer.position_y.get())
+    assert(trajectory.f[-1]) == printer.feedrate
+    for name in ("print_position_x", "print_position_y", "extruder_physical"):
+        assert(getattr(trajectory_printer, name).get_max()) == getattr(printer, name).get_max()
+    assert(math.isnan(trajectory_printer.extruder_temp.get()))
+    assert(trajectory.time_estimator.get_time()) == pytest.approx(printer.time_estimator.get_time())
+
+
+def test_to_printer_model_arc_bounding_box_same_as_printer_model():
+    # arrange
+    lines = ["G28", "G1 X10 Y0 Z0.2 F1200", "G3 X-10 Y0 I-10 J0 E1", "G2 X-10 Y0 I10 J0 E2", "G2 X0 Y-10 R-10 E3"]
+    printer = PrinterModel()
+    decode_line = GDecoderLine()
+    for line in lines:
+        decode_line.apply_gcode_line(line, printer)
+
+    # act
+    trajectory = read_trajectory(lines)
+    trajectory_printer = trajectory.to_printer_model()
+
+    # assert
+    assert(len(trajectory.arc_x_min)) == 3
+    for name in ("print_position_x", "print_position_y", "print_position_z"):
+        value = getattr(printer, name)
+        trajectory_value = getattr(trajectory_printer, name)
+        assert(trajectory_value.get_min()) == value.get_min()
+        assert(trajectory_value.get_max()) == value.get_max()
+    assert(trajectory_printer.print_position_y.get_min()) == -10
+    assert(trajectory_printer.print_position_y.get_max()) == 10
+    assert(trajectory.time_estimator.get_time()) == pytest.approx(printer.time_estimator.get_time())
+    assert(trajectory_printer.move_statistics.get_state()) == printer.move_statistics.get_state()
+
+
+def test_read_lines_arc_batches_same_as_printer_model(monkeypatch):
+    # arrange
+    # events, dwell and batches with pending arcs
+    monkeypatch.setattr("Trajectory.ARC_BATCH", 3)
+    lines = ["G28", "G1 X10 Y0 Z0.2 F1200", "G3 X-10 Y0 I-10 J0 E1", "G1 X-10 Y5 E2", "M104 S200", "G2 E3",
+             "G2 X10 Y5 I5 J0 E4", "M106 S255", "G3 X0 Y-5 R8 E5", "G4 P500", "G2 X-5 Y-5 R-4 E6", "G1 X0 Y0 E7",
+             "M107", "G3 I5 J0 E8"]
+    printer = PrinterModel()
+    decode_line = GDecoderLine()
+    for line in lines:
+        decode_line.apply_gcode_line(line, printer)
+
+    # act
+    trajectory = read_trajectory(lines)
+
+    # assert
+    assert(len(trajectory.arc_x_min)) == 5
+    # no arc: no X/Y print range, a full circle without X/Y: its bounding box
+    assert(trajectory.flags[4]) == FLAG_PRINT | FLAG_E
+    assert(trajectory.flags[9]) == FLAG_PRINT | FLAG_X | FLAG_Y | FLAG_E
+    assert(trajectory.time_estimator.get_time()) == pytest.approx(printer.time_estimator.get_time())
+    # the heater state at the last event (M107)
+    assert(trajectory.thermal_model.get_state()["heaters"]["extruder"]) == \
+        pytest.approx(printer.thermal_model.get_state()["heaters"]["extruder"])
+    assert(trajectory.move_statistics.get_state()) == printer.move_statistics.get_state()
+
+
+@pytest.mark.parametrize("line_break", ["\n", "\r\n", "\r"])
+def test_read_line_breaks_same_meta_infos_and_rows(tmp_path, line_break):
+    # arrange
+    file_name = tmp_path / "test.gcode"
+    lines = [";generated by PrusaSlicer", "G28", "", "G1 X1 Y2 E3 ; comment", "M117 20 °C", "G1 X10"]
+    file_name.write_bytes(line_break.join(lines).encode('utf-8'))
+    meta_infos = FileMetaInfos()
+
+    # act
+    trajectory = Trajectory()
+    trajectory.read(str(file_name), meta_infos)
+
+    # assert
+    assert(meta_infos.generator) == "PrusaSlicer"
+    assert(meta_infos.line_count) == 6
+    assert(meta_infos.longest_line) == len("G1 X1 Y2 E3 ; comment\n")
+    assert(list(trajectory.x)) == [0, 1, 10]
+
+
+def test_read_empty_file(tmp_path):
+    # arrange
+    file_name = tmp_path / "empty.gcode"
+    file_name.write_bytes(b"")
+    meta_infos = FileMetaInfos()
+
+    # act
+    trajectory = Trajectory()
+    trajectory.read(str(file_name), meta_infos)
+
+    # assert
+    assert(meta_infos.line_count) == 0
+    assert(len(trajectory.x)) == 0
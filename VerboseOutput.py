@@ -0,0 +1,125 @@
+# Verbose output: the PrinterModel values after each decoded line (see: gdecoder --verbose)
+#
+# The full block of all values is very large for real world files (most of the values don't change from line
+# to line). VerboseDelta prints only the lines of the block whose values changed, and the full block
+# (snapshot) at the first line, every N lines and/or at layer changes.
+
+from FileMetaInfos import is_layer_change_comment
+from printer_model.PrinterModelValue import format_value
+import math
+
+SEPARATOR = ";------------------------------------------------------------------------------"
+
+
+def get_diff(value_high, value_low):
+    if not math.isnan(value_high) and not math.isnan(value_low):
+        diff_x_float = round(value_high - value_low, 2)
+        return str(diff_x_float)
+    else:
+        return "?"
+
+
+def _format_position(name, value, unit):
+    return (";" + name + ": " + format_value(value.get()) + " " + unit
+            + f" (min: {format_value(value.get_min())}"
+            + f" max: {format_value(value.get_max())} diff: {get_diff(value.get_max(), value.get_min())})")
+
+
+def _format_extruder(printer):
+    e_phys = round(printer.extruder_physical.get(), 2)
+    e_phys_max = round(printer.extruder_physical.get_max(), 2)
+    e_log = round(printer.extruder_logical.get(), 2)
+    return (";E: " + str(e_log) + " " + printer.unit
+            + " (phys: " + str(e_phys) + ", max: " + str(e_phys_max) + ", move mode: " + printer.extruder_move_mode + ")")
+
+
+def _format_temperatures(printer):
+    return (";Temperature: Extruder: " + format_value(printer.extruder_temp.get()) + " °C"
+            + ", bed: " + format_value(printer.bed_temp.get()) + " °C"
+            + ", fan: " + format_value(printer.fan.get()) + " (0-255)")
+
+
+# the lines of the block: (values of the line, text of the line)
+_LINES = (
+    (lambda printer: (printer.print_position_x.get(), printer.print_position_x.get_min(),
+                      printer.print_position_x.get_max()),
+     lambda printer: _format_position("X", printer.print_position_x, printer.unit)),
+    (lambda printer: (printer.print_position_y.get(), printer.print_position_y.get_min(),
+                      printer.print_position_y.get_max()),
+     lambda printer: _format_position("Y", printer.print_position_y, printer.unit)),
+    (lambda printer: (printer.print_position_z.get(), printer.print_position_z.get_min(),
+                      printer.print_position_z.get_max()),
+     lambda printer: _format_position("Z", printer.print_position_z, printer.unit)),
+    (lambda printer: (printer.extruder_logical.get(), printer.extruder_physical.get(),
+                      printer.extruder_physical.get_max(), printer.extruder_move_mode),
+     _format_extruder),
+    (lambda printer: (printer.feedrate,),
+     lambda printer: ";Feedrate: " + format_value(printer.feedrate) + " " + printer.unit + "/min"),
+    (lambda printer: (printer.extruder_temp.get(), printer.bed_temp.get(), printer.fan.get()),
+     _format_temperatures),
+)
+
+
+def print_printer_model(printer):
+    print(SEPARATOR)
+    for values, text in _LINES:
+        print(text(printer))
+    print(SEPARATOR)
+
+
+class VerboseFull:
+    # the full block after each gcode line
+
+    def comment_line(self, printer, line):
+        pass
+
+    def gcode_line(self, printer, line_number):
+        print_printer_model(printer)
+
+
+class VerboseDelta:
+    # the changed lines after each gcode line, a full block every snapshot_lines lines (0: never)
+    # and/or at each layer change (if snapshot_layers)
+    # hint: the snapshot of every N lines is printed after the first gcode line at or after the line number
+    # (e.g. a comment line isn't followed by any output)
+
+    def __init__(self, snapshot_lines=0, snapshot_layers=False):
+        self.snapshot_lines = snapshot_lines
+        self.snapshot_layers = snapshot_layers
+        # values of each line, as last printed (None: nothing printed yet)
+        self._values = None
+        # line number of the next snapshot of every N lines
+        self._snapshot_line = snapshot_lines
+
+    def comment_line(self, printer, line):
+        if self.snapshot_layers and is_layer_change_comment(line):
+            self.print_snapshot(printer)
+
+    def gcode_line(self, printer, line_number):
+        if self.snapshot_lines > 0 and line_number >= self._snapshot_line:
+            self._snapshot_line = line_number - line_number % self.snapshot_lines + self.snapshot_lines
+            self.print_snapshot(printer)
+            return
+        if self._values is None:
+            self.print_snapshot(printer)
+            return
+
+        last_values = self._values
+        for index, (values, text) in enumerate(_LINES):
+            current = values(printer)
+            if current != last_values[index]:
+                last_values[index] = current
+                print(text(printer))
+
+    def print_snapshot(self, printer):
+        print_printer_model(printer)
+        self._values = [values(printer) for values, text in _LINES]
+
+
+def create_verbose_output(args):
+    # None if no verbose output
+    if args.showVerboseDelta is True:
+        return VerboseDelta(args.snapshotLines, args.snapshotLayers)
+    if args.showVerbose is True:
+        return VerboseFull()
+    return None
@@ -0,0 +1,124 @@
+from VerboseOutput import VerboseDelta
+from VerboseOutput import print_printer_model
+from printer_model.PrinterModel import PrinterModel
+import pytest
+pytestmark = pytest.mark.unittests
+
+
+def test_print_printer_model_full_block(capsys):
+    # arrange
+    printer = PrinterModel()
+    printer.print_linear(1, 2, 0.2, 0.5)
+
+    # act
+    print_printer_model(printer)
+
+    # assert
+    lines = capsys.readouterr().out.splitlines()
+    assert(len(lines)) == 8
+    assert(lines[1]) == ";X: 1 mm (min: 1 max: 1 diff: 0)"
+    assert(lines[4]) == ";E: 0.5 mm (phys: 0.5, max: 0.5, move mode: absolute)"
+
+
+def test_print_printer_model_numbers_normalized(capsys):
+    # arrange
+    # e.g. "G1 F2100.00000 X60.0 Y0.500"
+    printer = PrinterModel()
+    printer.set_feedrate(2100.0)
+    printer.print_linear(60.0, 0.5, None, None)
+
+    # act
+    print_printer_model(printer)
+
+    # assert
+    lines = capsys.readouterr().out.splitlines()
+    assert(lines[1]) == ";X: 60 mm (min: 60 max: 60 diff: 0.0)"
+    assert(lines[2]) == ";Y: 0.5 mm (min: 0.5 max: 0.5 diff: 0.0)"
+    assert(lines[5]) == ";Feedrate: 2100 mm/min"
+
+
+def test_gcode_line_first_line_full_block(capsys):
+    # arrange
+    printer = PrinterModel()
+    verbose = VerboseDelta()
+
+    # act
+    verbose.gcode_line(printer, 1)
+    first_output = capsys.readouterr().out
+
+    # assert
+    print_printer_model(printer)
+    assert(first_output) == capsys.readouterr().out
+
+
+def test_gcode_line_only_changed_lines(capsys):
+    # arrange
+    printer = PrinterModel()
+    verbose = VerboseDelta()
+    verbose.gcode_line(printer, 1)
+    capsys.readouterr()
+
+    # act
+    printer.set_fan(255)
+    verbose.gcode_line(printer, 2)
+    verbose.gcode_line(printer, 3)
+
+    # assert
+    assert(capsys.readouterr().out) == ";Temperature: Extruder: ? °C, bed: ? °C, fan: 255 (0-255)\n"
+
+
+def test_gcode_line_snapshot_every_n_lines(capsys):
+    # arrange
+    printer = PrinterModel()
+    verbose = VerboseDelta(snapshot_lines=2)
+    verbose.gcode_line(printer, 1)
+    capsys.readouterr()
+
+    # act
+    verbose.gcode_line(printer, 2)
+    snapshot = capsys.readouterr().out
+    verbose.gcode_line(printer, 3)
+
+    # assert
+    print_printer_model(printer)
+    assert(capsys.readouterr().out) == snapshot
+
+
+def test_gcode_line_snapshot_after_comment_line(capsys):
+    # arrange
+    printer = PrinterModel()
+    verbose = VerboseDelta(snapshot_lines=3)
+    verbose.gcode_line(printer, 1)
+    verbose.gcode_line(printer, 2)
+    capsys.readouterr()
+
+    # act
+    # line 3 is a comment line: the snapshot is printed after line 4, the next one after line 6
+    verbose.gcode_line(printer, 4)
+    snapshot = capsys.readouterr().out
+    verbose.gcode_line(printer, 5)
+    no_snapshot = capsys.readouterr().out
+    verbose.gcode_line(printer, 6)
+    next_snapshot = capsys.readouterr().out
+
+    # assert
+    print_printer_model(printer)
+    assert(snapshot) == next_snapshot == capsys.readouterr().out
+    assert(no_snapshot) == ""
+
+
+@pytest.mark.parametrize("line, expected_lines", [
+    (";LAYER_CHANGE", 8),
+    (";LAYER:2", 8),
+    (";TYPE:WALL-OUTER", 0),
+])
+def test_comment_line_snapshot_at_layer_change(capsys, line, expected_lines):
+    # arrange
+    printer = PrinterModel()
+    verbose = VerboseDelta(snapshot_layers=True)
+
+    # act
+    verbose.comment_line(printer, line)
+
+    # assert
+    assert(len(capsys.readouterr().out.splitlines())) == expected_lines
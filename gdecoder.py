@@ -5,49 +5,63 @@
 # https://reprap.org/wiki/G-code
 # https://marlinfw.org/meta/gcode/
 
+from printer_model.ArcGeometry import ArcSegmentation
 from printer_model.PrinterModel import PrinterModel
+from printer_model.PrinterModelValue import format_value
+from printer_model.ThermalModel import AMBIENT_TEMPERATURE
+from printer_model.ThermalModel import BED_PARAMETERS
+from printer_model.ThermalModel import ENERGY_PRICE
+from printer_model.ThermalModel import EXTRUDER_PARAMETERS
+from printer_model.ThermalModel import FAN_LOSS
+from printer_model.ThermalModel import ThermalModel
+from ChunkDecoder import decode_chunks
+from FileMetaInfos import STDIN
 from FileMetaInfos import FileMetaInfos
+from FileMetaInfos import is_compressed
+from GCodeIndex import get_index
+from GCodeIndex import read_lines_at
+from GCodeIndex import restore_entry
+from GCodeTokenizer import tokenize_line
 from GDecoderLine import GDecoderLine
+from GDecoderLine import process_comment_line
+from OutputWriter import OutputWriter
+from OutputWriter import create_line_formatter
+from Profiler import Profiler
+from Trajectory import Trajectory
+from VerboseOutput import create_verbose_output
+from VerboseOutput import get_diff
+from concurrent.futures import ProcessPoolExecutor
 import argparse
+import contextlib
+import itertools
+import math
+import os
 import time
 import sys
 
 
-def get_diff(value_high, value_low):
-    if value_high != "?" and value_low != "?":
-        diff_x_float = round(float(value_high) - float(value_low), 2)
-        return str(diff_x_float)
-    else:
-        return "?"
+# follow mode: wait time (s) at the end of the file, max. number of lines decoded at once
+FOLLOW_INTERVAL = 0.5
+FOLLOW_BATCH_LINES = 10000
 
 
-def print_printer_model(printer):
-    diff_x = get_diff(printer.print_position_x.get_max(), printer.print_position_x.get_min())
-    diff_y = get_diff(printer.print_position_y.get_max(), printer.print_position_y.get_min())
-    diff_z = get_diff(printer.print_position_z.get_max(), printer.print_position_z.get_min())
-    e_phys = round(float(printer.extruder_physical.get()), 2)
-    e_phys_max = round(float(printer.extruder_physical.get_max()), 2)
-    e_log = round(float(printer.extruder_logical.get()), 2)
+def format_duration(seconds):
+    seconds = round(seconds)
+    return "%dh %02dm %02ds" % (seconds // 3600, seconds // 60 % 60, seconds % 60)
 
-    print(";------------------------------------------------------------------------------")
-    print(";X: " + printer.print_position_x.get() + " " + printer.unit, end="")
-    print(f" (min: {printer.print_position_x.get_min()} max: {printer.print_position_x.get_max()} diff: {diff_x})")
 
-    print(";Y: " + printer.print_position_y.get() + " " + printer.unit, end="")
-    print(f" (min: {printer.print_position_y.get_min()} max: {printer.print_position_y.get_max()} diff: {diff_y})")
+def format_length(value):
+    return format_value(round(value, 2))
 
-    print(";Z: " + printer.print_position_z.get() + " " + printer.unit, end="")
-    print(f" (min: {printer.print_position_z.get_min()} max: {printer.print_position_z.get_max()} diff: {diff_z})")
 
-    print(";E: " + str(e_log) + " " + printer.unit, end="")
-    print(" (phys: " + str(e_phys) + ", max: " + str(e_phys_max) + ", move mode: " + printer.extruder_move_mode + ")")
+def format_flow(value):
+    return format_value(round(value, 1))
 
-    print(";Feedrate: " + printer.feedrate + " " + printer.unit + "/min")
 
-    print(";Temperature: Extruder: " + printer.extruder_temp.get() + " °C", end="")
-    print(", bed: " + printer.bed_temp.get() + " °C", end="")
-    print(", fan: " + printer.fan.get() + " (0-255)")
-    print(";------------------------------------------------------------------------------")
+def format_percent(value):
+    if math.isnan(value):
+        return "?"
+    return str(round(value * 100)) + " %"
 
 
 filaments = [
@@ -61,8 +75,7 @@ filaments = [
 ]
 
 
-def print_filament_infos(filament, length):
-    material = filament[0]
+def get_filament_weight_and_price(filament, length):
     meter_per_kg_min = filament[1]
     meter_per_kg_max = filament[2]
     weight_min = round(length / meter_per_kg_max, 1)
@@ -71,6 +84,16 @@ def print_filament_infos(filament, length):
     price_per_kg_max = filament[4]
     price_min = round(weight_min * price_per_kg_min / 1000, 2)
     price_max = round(weight_max * price_per_kg_max / 1000, 2)
+    return weight_min, weight_max, price_min, price_max
+
+
+def print_filament_infos(filament, length):
+    material = filament[0]
+    meter_per_kg_min = filament[1]
+    meter_per_kg_max = filament[2]
+    weight_min, weight_max, price_min, price_max = get_filament_weight_and_price(filament, length)
+    price_per_kg_min = filament[3]
+    price_per_kg_max = filament[4]
     nozzle_min = filament[5]
     nozzle_max = filament[6]
     bed_min = filament[7]
@@ -99,27 +122,24 @@ def is_filament_suitable_for_temp(filament, temp_nozzle, temp_bed):
     bed_max = filament[8]
     bed_mandatory = filament[9]
 
-    if temp_nozzle.isdigit():
-        temp_nozzle_int = int(temp_nozzle)
-    else:
-        temp_nozzle_int = 0
-    if temp_bed.isdigit():
-        temp_bed_int = int(temp_bed)
-    else:
-        temp_bed_int = 0
+    # unknown temperatures: treat as "not heated"
+    if math.isnan(temp_nozzle):
+        temp_nozzle = 0
+    if math.isnan(temp_bed):
+        temp_bed = 0
 
     # check nozzle temp
-    if temp_nozzle_int < nozzle_min or temp_nozzle_int > nozzle_max:
+    if temp_nozzle < nozzle_min or temp_nozzle > nozzle_max:
         return False
 
     # check bed temp
-    if (bed_mandatory and temp_bed_int < bed_min) or temp_bed_int > bed_max:
+    if (bed_mandatory and temp_bed < bed_min) or temp_bed > bed_max:
         return False
 
     return True
 
 
-def print_summary_infos(meta_infos, printer, gcode_command_count):
+def print_summary_infos(meta_infos, printer, gcode_command_count, layers=None):
     diff_x = get_diff(printer.print_position_x.get_max(), printer.print_position_x.get_min())
     diff_y = get_diff(printer.print_position_y.get_max(), printer.print_position_y.get_min())
     diff_z = get_diff(printer.print_position_z.get_max(), printer.print_position_z.get_min())
@@ -131,6 +151,8 @@ def print_summary_infos(meta_infos, printer, gcode_command_count):
     print(";  Size      : " + str(meta_infos.file_size) + " bytes")
     print(";  Modified  : %s" % time.ctime(meta_infos.modified_time))
     print(";  Lines     : " + str(meta_infos.line_count))
+    if layers is not None:
+        print(";  Layers    : " + layers)
     print(";  Longest   : " + str(meta_infos.longest_line) + " characters (without comment lines)")
     print(";  GCode     : " + str(gcode_command_count) + " commands")
     generator_line = meta_infos.generator_line.strip(";")
@@ -143,11 +165,11 @@ def print_summary_infos(meta_infos, printer, gcode_command_count):
     print(";  Y         : " + diff_y + " " + printer.unit)
     print(";  Z         : " + diff_z + " " + printer.unit)
     print(";Temperature")
-    print(";  Extruder  : " + printer.extruder_temp.get_max() + " °C (max.)")
-    print(";  Bed       : " + printer.bed_temp.get_max() + " °C (max.)")
-    print(";  Fan       : " + printer.fan.get_max() + " (max.)")
+    print(";  Extruder  : " + format_value(printer.extruder_temp.get_max()) + " °C (max.)")
+    print(";  Bed       : " + format_value(printer.bed_temp.get_max()) + " °C (max.)")
+    print(";  Fan       : " + format_value(printer.fan.get_max()) + " (max.)")
 
-    e_phys_max = round(float(printer.extruder_physical.get_max()), 2)
+    e_phys_max = round(printer.extruder_physical.get_max(), 2)
     print(";Filament")
     print(";  Length    : " + str(e_phys_max) + " " + printer.unit)
 
@@ -161,69 +183,491 @@ def print_summary_infos(meta_infos, printer, gcode_command_count):
         if not is_filament_suitable_for_temp(filament, printer.extruder_temp.get_max(), printer.bed_temp.get_max()):
             print_filament_infos(filament, e_phys_max)
 
-    # TODO: Add Time, Energy costs
-
-
-def read_gcode(args, meta_infos, decode_line, printer):
-    file1 = open(args.input, 'r', encoding='utf-8')
-    lines = file1.readlines()
+    move_statistics = printer.move_statistics
+    print(";Moves")
+    print(";  Extruding : " + format_length(move_statistics.extrude_xy) + " mm (XY), " +
+          format_length(move_statistics.extrude_xyz) + " mm (XYZ)")
+    print(";  Travel    : " + format_length(move_statistics.travel_xy) + " mm (XY), " +
+          format_length(move_statistics.travel_xyz) + " mm (XYZ)")
+    print(";  Flow      : " + format_flow(move_statistics.flow_max) + " mm³/s (max.), " +
+          format_flow(move_statistics.flow_percentile(95)) + " mm³/s (95 %), " +
+          format_flow(move_statistics.flow_percentile(50)) + " mm³/s (median), " +
+          format_value(move_statistics.filament_diameter) + " mm filament")
+
+    time_estimator = printer.time_estimator
+    total_time = time_estimator.get_time()
+    print(";Time")
+    print(";  Total     : " + format_duration(total_time) + " (estimated)")
+    print(";  Moving    : " + format_duration(time_estimator.move_time))
+    print(";  Waiting   : " + format_duration(time_estimator.wait_time) + " (dwell, heat-up)")
+
+    thermal_model = printer.thermal_model
+    thermal_model.finish()
+    extruder_energy = thermal_model.get_energy("extruder")
+    bed_energy = thermal_model.get_energy("bed")
+    total_energy = extruder_energy + bed_energy
+    print(";Energy (heaters)")
+    print(";  Extruder  : " + str(round(extruder_energy, 3)) + " kWh (duty: " +
+          format_percent(thermal_model.get_duty("extruder")) + ")")
+    print(";  Bed       : " + str(round(bed_energy, 3)) + " kWh (duty: " + format_percent(thermal_model.get_duty("bed")) + ")")
+    print(";  Total     : " + str(round(total_energy, 3)) + " kWh, " +
+          str(round(total_energy * thermal_model.energy_price, 2)) + " € (" + str(thermal_model.energy_price) + " €/kWh)")
+
+
+def _number_or_none(value):
+    # JSON has no NaN
+    return None if math.isnan(value) else value
+
+
+def get_summary_infos(meta_infos, printer, gcode_command_count):
+    # the same infos as print_summary_infos, as a dict of (JSON serializable) values
+    # (lengths in mm, temperatures in °C, time in s, energy in kWh, unknown values are None)
+    def diff(value):
+        return _number_or_none(round(value.get_max() - value.get_min(), 2))
+
+    extruder_temp_max = printer.extruder_temp.get_max()
+    bed_temp_max = printer.bed_temp.get_max()
+    e_phys_max = round(printer.extruder_physical.get_max(), 2)
+    filament_infos = {"suitable": [], "unsuitable": []}
+    for filament in filaments:
+        weight_min, weight_max, price_min, price_max = get_filament_weight_and_price(filament, e_phys_max)
+        suitable = is_filament_suitable_for_temp(filament, extruder_temp_max, bed_temp_max)
+        filament_infos["suitable" if suitable else "unsuitable"].append({
+            "material": filament[0].strip(), "weight_min": weight_min, "weight_max": weight_max,
+            "price_min": price_min, "price_max": price_max,
+        })
+
+    move_statistics = printer.move_statistics
+    time_estimator = printer.time_estimator
+    total_time = time_estimator.get_time()
+    thermal_model = printer.thermal_model
+    thermal_model.finish()
+    extruder_energy = thermal_model.get_energy("extruder")
+    bed_energy = thermal_model.get_energy("bed")
+
+    return {
+        "file": {
+            "name": meta_infos.file_name,
+            "size": meta_infos.file_size,
+            "modified": meta_infos.modified_time,
+            "lines": meta_infos.line_count,
+            "longest": meta_infos.longest_line,
+            "gcode_commands": gcode_command_count,
+        },
+        "generator": {
+            "line": meta_infos.generator_line.strip(";").strip(),
+            "name": meta_infos.generator,
+            "flavor": meta_infos.generator_flavor,
+        },
+        "printed": {
+            "x": diff(printer.print_position_x),
+            "y": diff(printer.print_position_y),
+            "z": diff(printer.print_position_z),
+        },
+        "temperature": {
+            "extruder_max": _number_or_none(extruder_temp_max),
+            "bed_max": _number_or_none(bed_temp_max),
+            "fan_max": _number_or_none(printer.fan.get_max()),
+        },
+        "filament": dict(length=e_phys_max, **filament_infos),
+        "moves": {
+            "extruding_xy": move_statistics.extrude_xy,
+            "extruding_xyz": move_statistics.extrude_xyz,
+            "travel_xy": move_statistics.travel_xy,
+            "travel_xyz": move_statistics.travel_xyz,
+            "flow_max": _number_or_none(move_statistics.flow_max),
+            "flow_p95": _number_or_none(move_statistics.flow_percentile(95)),
+            "flow_median": _number_or_none(move_statistics.flow_percentile(50)),
+            "filament_diameter": move_statistics.filament_diameter,
+        },
+        "time": {
+            "total": total_time,
+            "moving": time_estimator.move_time,
+            "waiting": time_estimator.wait_time,
+        },
+        "energy": {
+            "extruder": extruder_energy,
+            "extruder_duty": _number_or_none(thermal_model.get_duty("extruder")),
+            "bed": bed_energy,
+            "bed_duty": _number_or_none(thermal_model.get_duty("bed")),
+            "total": extruder_energy + bed_energy,
+            "cost": (extruder_energy + bed_energy) * thermal_model.energy_price,
+            "price": thermal_model.energy_price,
+        },
+    }
+
+
+def read_gcode(args, meta_infos, decode_line, printer, column_width=0, profiler=None):
+    format_line, verbose = create_line_outputs(args, column_width)
+    if profiler is not None:
+        format_line = profiler.timed("output (format)", format_line)
+        if verbose is not None:
+            verbose.comment_line = profiler.timed("verbose", verbose.comment_line)
+            verbose.gcode_line = profiler.timed("verbose", verbose.gcode_line)
+    # iterate lazily over the file lines, memory usage doesn't depend on the file size
+    with meta_infos.open_input(args.input) as file1:
+        return decode_lines(args, file1, meta_infos, decode_line, printer, format_line, verbose)
+
+
+def is_summary_only(args):
+    # no line is shown, the text of the lines isn't needed: the summary is computed from the motion data
+    # (see: gdecoder_trajectory, the same summary as decoding the lines)
+    # (-u needs the text: its errors are found while creating it, the Trajectory takes the arcs as a whole)
+    return args.hideComments is True and args.hideGCode is True and args.hideDecoded is True \
+        and args.stopOnUndecoded is False and args.showVerbose is False and args.showVerboseDelta is False \
+        and args.arcSegments is False
+
+
+def create_line_outputs(args, column_width):
+    # the output of a gcode line (see: create_line_formatter) and the verbose output (None: no verbose output)
+    return create_line_formatter(column_width, args.hideGCode, args.hideDecoded), create_verbose_output(args)
+
+
+def decode_lines(args, lines, meta_infos, decode_line, printer, format_line, verbose):
     gcode_command_count = 0
+    # stdout is an OutputWriter (see: gdecoder), write it directly instead of print() for each line
+    write = sys.stdout.write
 
-    for line in lines:
-        line = line.strip()
+    for raw_line in lines:
+        line, splitted = tokenize_line(raw_line)
+        meta_infos.process_stripped_line(raw_line, line)
 
         # comment line?
-        if line.startswith(";"):
-            # reset z value, caused by extruder initial cleanup procedure (at least on Cura/Marlin and PrusaSlicer)
-            if ";TYPE:SKIRT".lower() in line.lower():
-                current_z = printer.position_z.get()
-                printer.print_position_z.set(current_z)
+        if splitted is None:
+            process_comment_line(printer, line)
 
             if args.hideComments is False:
-                print(line)
+                write(line + "\n")
+            if verbose is not None:
+                verbose.comment_line(printer, line)
             continue
 
-        decoded = decode_line.decode_gcode_line(meta_infos, line, printer)
+        decoded = decode_line.decode_gcode_line(meta_infos, line, printer, splitted)
 
         if decoded != "":
             gcode_command_count += 1
 
-        if args.hideGCode is False:
-            format_str = "{:" + str(meta_infos.longest_line + 1) + "}"
-            print(format_str.format(line.strip()), end="")
+        write(format_line(line, decoded))
 
-        if args.hideDecoded is False and decoded != "":
-            print(' ; ' + decoded)
-        else:
-            if args.hideGCode is False:
-                print()
+        if verbose is not None:
+            verbose.gcode_line(printer, meta_infos.line_count)
 
-        if args.showVerbose is True:
-            print_printer_model(printer)
+    return gcode_command_count
+
+
+def replay_lines(lines, meta_infos, decode_line, printer):
+    # the PrinterModel changes of the lines, without any output
+    gcode_command_count = 0
+    for raw_line in lines:
+        line, splitted = tokenize_line(raw_line)
+        meta_infos.process_stripped_line(raw_line, line)
+
+        if splitted is None:
+            process_comment_line(printer, line)
+            continue
+
+        if decode_line.apply_gcode_line(line, printer, splitted):
+            gcode_command_count += 1
 
     return gcode_command_count
 
 
-def gdecoder(args):
+def read_gcode_parallel(args, meta_infos, decode_line, printer, column_width=0):
+    # same output as read_gcode, the text is decoded by a process pool (see: ChunkDecoder)
+    gcode_command_count = 0
+    format_line, verbose = create_line_outputs(args, column_width)
+    write = sys.stdout.write
+
+    with open(args.input, 'r', encoding='utf-8') as file1, ProcessPoolExecutor(args.jobs) as executor:
+        for decoded_texts, error in decode_chunks(executor, args.input, args, 2 * args.jobs):
+            for decoded in decoded_texts:
+                raw_line = next(file1)
+                line, splitted = tokenize_line(raw_line)
+                meta_infos.process_stripped_line(raw_line, line)
+
+                if splitted is None:
+                    process_comment_line(printer, line)
+                    if args.hideComments is False:
+                        write(line + "\n")
+                    if verbose is not None:
+                        verbose.comment_line(printer, line)
+                    continue
+
+                # generator dependent: decoded here, with the meta infos of all previous lines
+                if decoded is None:
+                    decoded = decode_line.decode_gcode_text(meta_infos, line, splitted)
+
+                if decode_line.apply_gcode_line(line, printer, splitted):
+                    gcode_command_count += 1
+
+                write(format_line(line, decoded))
+
+                if verbose is not None:
+                    verbose.gcode_line(printer, meta_infos.line_count)
+
+            if error is not None:
+                meta_infos.process_line(next(file1))
+                raise error
+
+    return gcode_command_count
+
+
+def create_printer_model(args):
     printer = PrinterModel()
+    if args.arcSegments is True:
+        # the print time of the arcs from their straight segments, like the firmware moves them
+        printer.arc_segmentation = ArcSegmentation()
+    printer.thermal_model = create_thermal_model(args, printer.time_estimator)
+    return printer
+
+
+def create_thermal_model(args, time_estimator):
+    # the heaters and the fan of the printer (see: --extruder-heater, --bed-heater, ...)
+    return ThermalModel(time_estimator, args.ambientTemperature, args.extruderHeater, args.bedHeater, args.fanLoss,
+                        args.energyPrice)
 
+
+def heater_parameters(text):
+    # "40,15,0.067" -> (max. power in W, heat capacity in J/K, heat loss in W/K)
+    values = tuple(float(value) for value in text.split(","))
+    if len(values) != 3 or min(values) <= 0:
+        raise ValueError("Invalid heater parameters: " + text)
+    return values
+
+
+def gdecoder_trajectory(args):
+    # summary only, computed from the columnar motion data
+    if args.arcSegments is True:
+        raise Exception("--arc-segments isn't supported with --trajectory (the arcs are taken as a whole)")
+    meta_infos = FileMetaInfos()
+    meta_infos.read_file_infos(args.input)
+
+    trajectory = Trajectory()
+    trajectory.thermal_model = create_thermal_model(args, trajectory.time_estimator)
+    trajectory.read(args.input, meta_infos)
+
+    if args.hideSummary is False:
+        print_summary_infos(meta_infos, trajectory.to_printer_model(), trajectory.gcode_command_count)
+
+
+def gdecoder(args):
+    profiler = Profiler() if args.profile is not None else None
+    # all output (including print()) is buffered and written to stdout or the output file
+    stream = contextlib.nullcontext(sys.stdout) if args.output is None else open(args.output, 'w', encoding='utf-8')
+    with stream as file1, OutputWriter(file1) as output, contextlib.redirect_stdout(output):
+        if profiler is not None:
+            output.write = profiler.timed("output (write)", output.write)
+        if args.follow is True:
+            gdecoder_follow(args)
+        elif args.layers is not None:
+            gdecoder_layers(args)
+        elif args.fromLine is not None:
+            gdecoder_from_line(args)
+        elif args.trajectory is True or is_summary_only(args):
+            gdecoder_trajectory(args)
+        else:
+            gdecoder_decode(args, profiler)
+
+    if profiler is not None:
+        profiler.write_report(args.profile)
+
+
+def gdecoder_decode(args, profiler=None):
+    printer = create_printer_model(args)
+    phase = profiler.phase if profiler is not None else _no_phase
+
+    # the meta infos are completed while reading the gcode (single pass over the file)
+    meta_infos = FileMetaInfos()
+    meta_infos.read_file_infos(args.input)
+
+    # the original gcode column must be aligned before the first line is printed
+    # (a plain file is scanned first, see: FileMetaInfos.scan_longest_line; stdin and a compressed file are
+    # read only once, the column width adapts while reading)
+    column_width = 0
+    if args.width is not None:
+        column_width = args.width
+    elif args.input == STDIN or is_compressed(args.input):
+        column_width = None
+    elif args.hideGCode is False:
+        with phase("scan longest line"):
+            column_width = meta_infos.scan_longest_line(args.input)
+
+    decode_line = GDecoderLine()
+    if profiler is not None:
+        # the same results, each step timed
+        decode_line.timing_hook = profiler.add_command
+        meta_infos.process_stripped_line = profiler.timed("meta infos", meta_infos.process_stripped_line)
+    decode_line.stop_on_undecoded = args.stopOnUndecoded
+
+    with phase("decode lines"):
+        # stdin or a compressed file can't be split into chunks (no seek to a byte offset)
+        if args.jobs > 1 and args.input != STDIN and not is_compressed(args.input):
+            gcode_command_count = read_gcode_parallel(args, meta_infos, decode_line, printer, column_width)
+        else:
+            gcode_command_count = read_gcode(args, meta_infos, decode_line, printer, column_width, profiler)
+
+    if args.hideSummary is False:
+        with phase("summary"):
+            print_summary_infos(meta_infos, printer, gcode_command_count)
+
+
+def _no_phase(name):
+    return contextlib.nullcontext()
+
+
+def parse_layer_range(text, layer_count):
+    # "400-420" or "412" -> first, last (the layers are numbered from 0, in file order)
+    first, separator, last = text.partition("-")
+    try:
+        first = int(first)
+        last = int(last) if separator else first
+    except ValueError:
+        raise Exception("Invalid layer range: " + text)
+    if not 0 <= first <= last < layer_count:
+        raise Exception("Layer range " + text + " not in the file (" + str(layer_count) + " layers, numbered from 0)")
+    return first, last
+
+
+def gdecoder_layers(args):
+    # decode only some layers, continuing from the PrinterModel state at the start of the first one
+    # (see: GCodeIndex, the index is built on the first call)
+    if args.input == STDIN:
+        raise Exception("--layers needs an input file (stdin can't seek)")
+    index = get_index(args.input)
+    first, last = parse_layer_range(args.layers, len(index.layers))
+    layer = index.layers[first]
+
+    printer = create_printer_model(args)
     meta_infos = FileMetaInfos()
-    meta_infos.read_meta_infos(args.input)
+    meta_infos.read_file_infos(args.input)
+    # the original line numbers (e.g. verbose snapshots)
+    restore_entry(layer, meta_infos, printer)
+    first_line = layer["line"]
+
+    # the summary contains the min/max values, filament, time and energy of these layers only
+    printer.reset_ranges()
+    meta_infos.longest_line = 0
 
     decode_line = GDecoderLine()
     decode_line.stop_on_undecoded = args.stopOnUndecoded
 
-    gcode_command_count = read_gcode(args, meta_infos, decode_line, printer)
+    lines = index.read_layers(args.input, first, last)
+    format_line, verbose = create_line_outputs(args, _index_column_width(args, index))
+    gcode_command_count = decode_lines(args, lines, meta_infos, decode_line, printer, format_line, verbose)
+
+    if args.hideSummary is False:
+        meta_infos.line_count -= first_line - 1
+        layers = (str(first) + "-" + str(last) + " of " + str(len(index.layers)) + " (Z: " + format_value(layer["z"])
+                  + "-" + format_value(index.layers[last]["z"]) + " " + printer.unit + ")")
+        print_summary_infos(meta_infos, printer, gcode_command_count, layers)
+
+
+def gdecoder_from_line(args):
+    # decode from a line on (e.g. the line of an error report): the PrinterModel is restored from the nearest
+    # layer start or checkpoint before the line (see: GCodeIndex), only the lines after it are replayed
+    if args.input == STDIN:
+        raise Exception("--from-line needs an input file (stdin can't seek)")
+    index = get_index(args.input)
+    if not 1 <= args.fromLine <= index.line_count:
+        raise Exception("Line " + str(args.fromLine) + " not in the file (" + str(index.line_count) + " lines)")
+
+    printer = create_printer_model(args)
+    meta_infos = FileMetaInfos()
+    meta_infos.read_file_infos(args.input)
+    decode_line = GDecoderLine()
+    decode_line.stop_on_undecoded = args.stopOnUndecoded
+
+    offset = 0
+    gcode_command_count = 0
+    entry = index.find_entry(args.fromLine)
+    if entry is not None:
+        gcode_command_count = restore_entry(entry, meta_infos, printer)
+        offset = entry["offset"]
+
+    lines = read_lines_at(args.input, offset)
+    replayed_lines = itertools.islice(lines, args.fromLine - 1 - meta_infos.line_count)
+    gcode_command_count += replay_lines(replayed_lines, meta_infos, decode_line, printer)
+    format_line, verbose = create_line_outputs(args, _index_column_width(args, index))
+    gcode_command_count += decode_lines(args, lines, meta_infos, decode_line, printer, format_line, verbose)
 
     if args.hideSummary is False:
         print_summary_infos(meta_infos, printer, gcode_command_count)
 
 
+def read_appended_lines(file1, max_count):
+    # the complete lines appended to the (binary) file since the last call, at most max_count
+    lines = []
+    while len(lines) < max_count:
+        raw_line = file1.readline()
+        if not raw_line.endswith(b"\n"):
+            # end of the file, or the rest of the line isn't written yet: read it again next time
+            file1.seek(-len(raw_line), os.SEEK_CUR)
+            break
+        line = raw_line.decode('utf-8')
+        if line.endswith("\r\n"):
+            line = line[:-2] + "\n"
+        lines.append(line)
+    return lines
+
+
+def gdecoder_follow(args):
+    # decode a growing file (e.g. written by a slicer or a printer host) like "tail -f", until Ctrl+C:
+    # the PrinterModel and the meta infos are kept, only the appended lines are read and decoded,
+    # the summary so far is printed whenever all lines written so far are decoded
+    # hint: the motion is taken as stopped at each summary, the estimated time can differ slightly
+    if args.input == STDIN or is_compressed(args.input):
+        raise Exception("--follow needs an uncompressed input file")
+
+    printer = create_printer_model(args)
+    meta_infos = FileMetaInfos()
+    meta_infos.read_file_infos(args.input)
+    decode_line = GDecoderLine()
+    decode_line.stop_on_undecoded = args.stopOnUndecoded
+    # the longest line isn't known in advance (as for stdin)
+    format_line, verbose = create_line_outputs(args, args.width)
+    gcode_command_count = 0
+
+    with open(args.input, 'rb') as file1:
+        try:
+            while True:
+                lines = read_appended_lines(file1, FOLLOW_BATCH_LINES)
+                if lines:
+                    gcode_command_count += decode_lines(args, lines, meta_infos, decode_line, printer, format_line,
+                                                        verbose)
+                    if len(lines) == FOLLOW_BATCH_LINES:
+                        # not at the end yet
+                        continue
+                    if args.hideSummary is False:
+                        meta_infos.file_size = file1.tell()
+                        meta_infos.modified_time = os.path.getmtime(args.input)
+                        print_summary_infos(meta_infos, printer, gcode_command_count)
+                    sys.stdout.flush()
+                elif os.path.getsize(args.input) < file1.tell():
+                    raise Exception("--follow: " + args.input + " was truncated")
+                time.sleep(FOLLOW_INTERVAL)
+        except KeyboardInterrupt:
+            pass
+
+
+def _index_column_width(args, index):
+    # same as gdecoder_decode, the longest line is known from the index
+    if args.width is not None:
+        return args.width
+    if args.hideGCode is False:
+        return index.longest_line
+    return 0
+
+
 def parse_args(args):
     parser = argparse.ArgumentParser(formatter_class=argparse.ArgumentDefaultsHelpFormatter)
-    # TODO: use stdin as default
     parser.add_argument('--input', '-i',
-                        help='input gcode file', required="True")
+                        help='input gcode file (also compressed: .gcode.gz, .gcode.bz2, .gcode.xz), "-": stdin',
+                        default=STDIN)
+    parser.add_argument('--width', '-w',
+                        help='width of the gcode column (default: longest line of the input, growing for stdin)',
+                        type=int, default=None, dest="width")
+    parser.add_argument('--output', '-o',
+                        help='output file (default: stdout)', default=None, dest="output")
     parser.add_argument('--summary', '-s',
                         help='hide summary', action='store_true', dest="hideSummary")
     parser.add_argument('--comments', '-c',
@@ -234,9 +678,82 @@ def parse_args(args):
                         help='hide gcode decoded output', action='store_true', dest="hideDecoded")
     parser.add_argument('--verbose', '-v',
                         help='show verbose output (can be slow!)', action='store_true', dest="showVerbose")
+    parser.add_argument('--verbose-delta', '-V',
+                        help='show only the changed printer model values after each line', action='store_true',
+                        dest="showVerboseDelta")
+    parser.add_argument('--snapshot',
+                        help='with --verbose-delta: show all printer model values every N lines (0: never)',
+                        type=int, default=0, dest="snapshotLines")
+    parser.add_argument('--snapshot-layers',
+                        help='with --verbose-delta: show all printer model values at each layer change',
+                        action='store_true', dest="snapshotLayers")
     parser.add_argument('--undecoded', '-u',
                         help='stop on undecoded gcode', action='store_true', dest="stopOnUndecoded")
-    return parser.parse_args(args)
+    parser.add_argument('--trajectory', '-t',
+                        help='fast summary from the extracted motion data only (no decoded output)',
+                        action='store_true', dest="trajectory")
+    parser.add_argument('--arc-segments',
+                        help='estimate the print time of G2/G3 arcs from their straight segments like the firmware '
+                        '(Marlin defaults: max. 1 mm, min. 72 segments per circle)', action='store_true',
+                        dest="arcSegments")
+    parser.add_argument('--extruder-heater',
+                        help='extruder heater of the energy simulation: max. power (W), heat capacity (J/K), '
+                        'heat loss (W/K), e.g. "40,15,0.067"', type=heater_parameters, default=EXTRUDER_PARAMETERS,
+                        dest="extruderHeater")
+    parser.add_argument('--bed-heater',
+                        help='bed heater of the energy simulation: max. power (W), heat capacity (J/K), '
+                        'heat loss (W/K), e.g. "200,358,1"', type=heater_parameters, default=BED_PARAMETERS,
+                        dest="bedHeater")
+    parser.add_argument('--fan-loss',
+                        help='additional heat loss of the extruder (W/K) with the part cooling fan at full speed',
+                        type=float, default=FAN_LOSS, dest="fanLoss")
+    parser.add_argument('--ambient-temperature',
+                        help='ambient temperature (°C) of the energy simulation', type=float,
+                        default=AMBIENT_TEMPERATURE, dest="ambientTemperature")
+    parser.add_argument('--energy-price',
+                        help='energy price (€/kWh)', type=float, default=ENERGY_PRICE, dest="energyPrice")
+    parser.add_argument('--layers', '-l',
+                        help='decode only these layers, e.g. "400-420" or "412" (numbered from 0), '
+                        'an index of the layers is stored as <input>.gdindex', default=None, dest="layers")
+    parser.add_argument('--from-line',
+                        help='decode from this line on (e.g. of an error report), uses the index <input>.gdindex',
+                        type=int, default=None, dest="fromLine")
+    parser.add_argument('--follow', '-f',
+                        help='follow a growing file (like "tail -f"), decode the appended lines until Ctrl+C',
+                        action='store_true', dest="follow")
+    parser.add_argument('--profile',
+                        help='show the time of each phase and gcode command and the peak memory on stderr, '
+                        'or write them to a JSON file (not with -t, -c -g -d, -l, --from-line, -f, -j)',
+                        nargs='?', const="-", default=None, dest="profile")
+    parser.add_argument('--jobs', '-j',
+                        help='number of processes decoding the gcode in parallel (for huge files)',
+                        type=int, default=1, dest="jobs")
+    parsed = parser.parse_args(args)
+    if (parsed.snapshotLines != 0 or parsed.snapshotLayers is True) and parsed.showVerboseDelta is False:
+        parser.error("--snapshot and --snapshot-layers need --verbose-delta (-V)")
+    if parsed.profile is not None:
+        unprofiled = _unprofiled_options(parsed)
+        if unprofiled is not None:
+            parser.error("--profile isn't supported with " + unprofiled + " (only decoding the lines of the whole "
+                         "file in this process is measured)")
+    return parsed
+
+
+def _unprofiled_options(args):
+    # the options of a mode without the profiled steps (see: gdecoder_decode), None: the mode is profiled
+    if args.follow is True:
+        return "--follow"
+    if args.layers is not None:
+        return "--layers"
+    if args.fromLine is not None:
+        return "--from-line"
+    if args.trajectory is True:
+        return "--trajectory"
+    if is_summary_only(args):
+        return "-c -g -d (the summary is computed by the Trajectory engine)"
+    if args.jobs > 1:
+        return "--jobs (the lines are decoded in other processes)"
+    return None
 
 
 if __name__ == '__main__':
@@ -0,0 +1,111 @@
+# Summaries of many gcode files, one JSON record per line (NDJSON)
+#
+# The files are distributed over a process pool, each file is read by the fast trajectory mode
+# (same summary as gdecoder, see: Trajectory). A file that can't be read gives a record with the error,
+# the other files are not affected.
+#
+# With --cache, the summaries are stored in a directory (see: ResultCache), a file that was already summarized
+# (same content) isn't read again.
+#
+# Example:
+# gdecoder_batch examples_synthetic "jobs/**/*.gcode" > summaries.ndjson
+# gdecoder_batch --cache ~/.cache/gdecoder "jobs/**/*.gcode" > summaries.ndjson
+
+from FileMetaInfos import FileMetaInfos
+from ResultCache import MAX_SIZE
+from ResultCache import ResultCache
+from Trajectory import Trajectory
+from gdecoder import get_summary_infos
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import as_completed
+import argparse
+import glob
+import json
+import os
+import sys
+
+# (cache directory, max. size) -> ResultCache of this (worker) process: the size of the cache is scanned only once
+_caches = {}
+
+
+def expand_inputs(inputs):
+    # file names, glob patterns or directories (all .gcode files, also compressed, including sub directories)
+    file_names = []
+    for name in inputs:
+        if os.path.isdir(name):
+            file_names += sorted(file_name for pattern in ("*.gcode", "*.gcode.gz", "*.gcode.bz2", "*.gcode.xz")
+                                 for file_name in glob.glob(os.path.join(name, "**", pattern), recursive=True))
+        elif glob.has_magic(name):
+            file_names += sorted(glob.glob(name, recursive=True))
+        else:
+            file_names.append(name)
+    return file_names
+
+
+def get_cache(cache_directory, cache_size):
+    cache = _caches.get((cache_directory, cache_size))
+    if cache is None:
+        cache = _caches[(cache_directory, cache_size)] = ResultCache(cache_directory, cache_size)
+    return cache
+
+
+def summarize_file(file_name, cache_directory=None, cache_size=MAX_SIZE):
+    meta_infos = FileMetaInfos()
+    try:
+        cache = None
+        if cache_directory is not None:
+            cache = get_cache(cache_directory, cache_size)
+            summary = cache.get(file_name)
+            if summary is not None:
+                # the cached summary may be from a file with the same content, but another name
+                meta_infos.read_file_infos(file_name)
+                summary["file"]["name"] = meta_infos.file_name
+                summary["file"]["modified"] = meta_infos.modified_time
+                return summary
+
+        meta_infos.read_file_infos(file_name)
+
+        trajectory = Trajectory()
+        trajectory.read(file_name, meta_infos)
+
+        summary = get_summary_infos(meta_infos, trajectory.to_printer_model(), trajectory.gcode_command_count)
+        if cache is not None:
+            cache.put(file_name, summary)
+        return summary
+    except Exception as exception:
+        return {"file": {"name": file_name}, "error": type(exception).__name__ + ": " + str(exception)}
+
+
+def gdecoder_batch(args):
+    # the records are written as soon as a file is finished (not in the order of the inputs)
+    file_names = expand_inputs(args.inputs)
+    error_count = 0
+
+    with ProcessPoolExecutor(args.jobs) as executor:
+        futures = [executor.submit(summarize_file, file_name, args.cache, args.cacheSize * 1024 * 1024)
+                   for file_name in file_names]
+        for future in as_completed(futures):
+            record = future.result()
+            if "error" in record:
+                error_count += 1
+            print(json.dumps(record, ensure_ascii=False))
+
+    return error_count
+
+
+def parse_args(args):
+    parser = argparse.ArgumentParser(formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    parser.add_argument('inputs', nargs='+',
+                        help='gcode files, glob patterns (e.g. "**/*.gcode") or directories')
+    parser.add_argument('--jobs', '-j',
+                        help='number of processes (default: number of CPUs)', type=int, default=None, dest="jobs")
+    parser.add_argument('--cache',
+                        help='directory to cache the summaries (e.g. ~/.cache/gdecoder)', default=None, dest="cache")
+    parser.add_argument('--cache-size',
+                        help='max. size of the cache (MB)', type=int, default=100, dest="cacheSize")
+    return parser.parse_args(args)
+
+
+if __name__ == '__main__':
+    parser = parse_args(sys.argv[1:])
+    sys.exit(1 if gdecoder_batch(parser) > 0 else 0)
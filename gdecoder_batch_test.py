@@ -0,0 +1,117 @@
+# test gdecoder_batch.py with some example files
+from gdecoder_batch import expand_inputs
+from gdecoder_batch import gdecoder_batch
+from gdecoder_batch import get_cache
+from gdecoder_batch import parse_args
+from gdecoder_batch import summarize_file
+import json
+import os
+import pytest
+pytestmark = pytest.mark.integration
+
+
+def test_expand_inputs_file_glob_and_directory():
+    # act
+    file_names = expand_inputs(["README.gcode", "examples_synthetic/g*.gcode", "examples_synthetic"])
+
+    # assert
+    assert(file_names[0]) == "README.gcode"
+    assert(file_names[1]) == os.path.join("examples_synthetic", "generic.gcode")
+    assert(len(file_names)) == 7
+
+
+def test_summarize_file_readme():
+    # act
+    record = summarize_file("README.gcode")
+
+    # assert
+    assert(record["file"]["gcode_commands"]) == 19
+    assert(record["printed"]) == {"x": 37.52, "y": 38.69, "z": 9.7}
+    assert(record["temperature"]["extruder_max"]) == 200
+    assert(record["filament"]["length"]) == 5.13
+    assert([filament["material"] for filament in record["filament"]["suitable"]]) == ["PLA", "TPU"]
+    assert(record["time"]["total"]) > 0
+    assert(record["moves"]["travel_xy"]) == pytest.approx(43.34, abs=0.01)
+    assert(record["moves"]["flow_max"]) == pytest.approx(8.4, abs=0.1)
+
+
+def test_summarize_file_unknown_values_none():
+    # act
+    record = summarize_file("examples_synthetic/empty.gcode")
+
+    # assert
+    assert(record["printed"]) == {"x": None, "y": None, "z": None}
+    assert(record["energy"]["bed_duty"]) is None
+    assert(record["moves"]["flow_max"]) is None
+    assert(record["moves"]["flow_p95"]) is None
+
+
+def test_summarize_file_missing_file_error():
+    # act
+    record = summarize_file("missing.gcode")
+
+    # assert
+    assert(record["file"]) == {"name": "missing.gcode"}
+    assert(record["error"]).startswith("FileNotFoundError")
+
+
+def test_gdecoder_batch_one_record_per_file(capsys):
+    # arrange
+    args = parse_args(["README.gcode", "missing.gcode", "-j", "2"])
+
+    # act
+    error_count = gdecoder_batch(args)
+
+    # assert
+    records = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert(error_count) == 1
+    assert(sorted(record["file"]["name"] for record in records)) == ["README.gcode", "missing.gcode"]
+
+
+def test_parser_defaults():
+    parser = parse_args(["a.gcode", "b.gcode"])
+
+    assert(parser.inputs == ["a.gcode", "b.gcode"])
+    assert(parser.jobs is None)
+
+
+def test_summarize_file_cache_hit_same_summary(tmp_path):
+    # arrange
+    summarize_file("README.gcode", str(tmp_path))
+
+    # act
+    record = summarize_file("README.gcode", str(tmp_path))
+
+    # assert
+    assert(record) == summarize_file("README.gcode")
+
+
+def test_summarize_file_cache_copied_file_own_name(tmp_path):
+    # arrange
+    copy_name = str(tmp_path / "copy.gcode")
+    with open("README.gcode", 'rb') as source, open(copy_name, 'wb') as copy:
+        copy.write(source.read())
+    summarize_file("README.gcode", str(tmp_path / "cache"))
+
+    # act
+    record = summarize_file(copy_name, str(tmp_path / "cache"))
+
+    # assert
+    assert(record["file"]["name"]) == copy_name
+    assert(record["file"]["gcode_commands"]) == 19
+
+
+def test_get_cache_once_per_process(tmp_path):
+    # act
+    cache = get_cache(str(tmp_path), 1000)
+
+    # assert
+    assert(get_cache(str(tmp_path), 1000)) is cache
+    assert(get_cache(str(tmp_path), 2000)) is not cache
+
+
+def test_parser_cache():
+    parser = parse_args(["--cache", "cache_dir", "--cache-size", "10", "a.gcode"])
+
+    assert(parser.cache == "cache_dir")
+    assert(parser.cacheSize == 10)
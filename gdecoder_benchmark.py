@@ -0,0 +1,223 @@
+# Benchmarks of the decoding stages with large synthetic gcode files (see: SyntheticGCode)
+#
+# Measured for each file layout (Cura, PrusaSlicer, Slic3r): lines/s and peak memory of
+# - read_meta_infos: FileMetaInfos.read_meta_infos
+# - decode_gcode_line: GDecoderLine.decode_gcode_line of each line (text and PrinterModel changes)
+# - printer_model: only the PrinterModel changes of each line (GDecoderLine.apply_gcode_line)
+# - gdecoder: end-to-end gdecoder() for each flag combination (output to os.devnull)
+# The line stages include reading the lines from the file.
+#
+# Each benchmark runs in a new process, the peak memory is the max. resident set size of that process
+# (not available on Windows). The results are written as JSON, --compare shows the change of lines/s
+# against an older result file (same layouts and number of lines).
+#
+# Example:
+# python gdecoder_benchmark.py --lines 1000000 --output benchmark.json
+# python gdecoder_benchmark.py --lines 1000000 --output benchmark_new.json --compare benchmark.json
+
+from printer_model.PrinterModel import PrinterModel
+from FileMetaInfos import FileMetaInfos
+from GCodeTokenizer import tokenize_line
+from GDecoderLine import GDecoderLine
+from GDecoderLine import process_comment_line
+from Profiler import peak_memory_mb
+from SyntheticGCode import LAYOUTS
+from SyntheticGCode import write_synthetic_gcode
+from gdecoder import gdecoder
+from gdecoder import parse_args as gdecoder_parse_args
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import datetime
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+# changed, whenever the results are not comparable to older ones anymore
+BENCHMARK_VERSION = 1
+
+# the gdecoder options of the end-to-end benchmark
+FLAG_COMBINATIONS = ("", "-c", "-g", "-d", "-c -g", "-c -d", "-g -d", "-c -g -d", "-s", "-V", "-t", "-j 4")
+
+STAGES = ("read_meta_infos", "decode_gcode_line", "printer_model", "gdecoder")
+
+
+def bench_read_meta_infos(file_name, flags):
+    FileMetaInfos().read_meta_infos(file_name)
+
+
+def bench_decode_gcode_line(file_name, flags):
+    meta_infos = FileMetaInfos()
+    decode_line = GDecoderLine()
+    printer = PrinterModel()
+    with open(file_name, 'r', encoding='utf-8') as file1:
+        for raw_line in file1:
+            line, splitted = tokenize_line(raw_line)
+            meta_infos.process_stripped_line(raw_line, line)
+            if splitted is None:
+                process_comment_line(printer, line)
+                continue
+            decode_line.decode_gcode_line(meta_infos, line, printer, splitted)
+
+
+def bench_printer_model(file_name, flags):
+    decode_line = GDecoderLine()
+    printer = PrinterModel()
+    with open(file_name, 'r', encoding='utf-8') as file1:
+        for raw_line in file1:
+            line, splitted = tokenize_line(raw_line)
+            if splitted is None:
+                process_comment_line(printer, line)
+                continue
+            decode_line.apply_gcode_line(line, printer, splitted)
+
+
+def bench_gdecoder(file_name, flags):
+    gdecoder(gdecoder_parse_args(["-i", file_name, "-o", os.devnull] + flags.split()))
+
+
+_BENCHMARKS = {
+    "read_meta_infos": bench_read_meta_infos,
+    "decode_gcode_line": bench_decode_gcode_line,
+    "printer_model": bench_printer_model,
+    "gdecoder": bench_gdecoder,
+}
+
+
+def run_benchmark(stage, file_name, flags=""):
+    # (seconds, peak memory in MB) of a stage, run in this process
+    start = time.perf_counter()
+    _BENCHMARKS[stage](file_name, flags)
+    return time.perf_counter() - start, peak_memory_mb()
+
+
+def create_corpus(directory, line_count, layouts):
+    # the synthetic files, generated only if not already in the directory: layout -> file name
+    os.makedirs(directory, exist_ok=True)
+    file_names = {}
+    for layout in layouts:
+        file_name = os.path.join(directory, layout + "_" + str(line_count) + ".gcode")
+        if not os.path.exists(file_name):
+            write_synthetic_gcode(file_name + ".tmp", line_count, layout)
+            os.replace(file_name + ".tmp", file_name)
+        file_names[layout] = file_name
+    return file_names
+
+
+def run_benchmarks(file_names, line_count, stages=STAGES, flag_combinations=FLAG_COMBINATIONS, repeat=1):
+    # the result of each stage (and each flag combination of gdecoder) and layout, the best of the repetitions
+    results = []
+    for layout, file_name in file_names.items():
+        for stage in stages:
+            for flags in (flag_combinations if stage == "gdecoder" else ("",)):
+                runs = []
+                for repetition in range(repeat):
+                    # a new process: the peak memory of this run only
+                    with ProcessPoolExecutor(1) as executor:
+                        runs.append(executor.submit(run_benchmark, stage, file_name, flags).result())
+                seconds = min(seconds for seconds, memory in runs)
+                memories = [memory for seconds, memory in runs if memory is not None]
+                result = {
+                    "stage": stage,
+                    "layout": layout,
+                    "flags": flags,
+                    "lines": line_count,
+                    "bytes": os.path.getsize(file_name),
+                    "seconds": round(seconds, 3),
+                    "lines_per_second": round(line_count / seconds),
+                    "peak_memory_mb": max(memories) if memories else None,
+                }
+                print_result(result)
+                results.append(result)
+    return results
+
+
+def _result_key(result):
+    return result["stage"], result["layout"], result["flags"], result["lines"]
+
+
+def _result_name(result):
+    name = result["stage"] + " " + result["layout"]
+    if result["flags"]:
+        name += " " + result["flags"]
+    return name
+
+
+def print_result(result):
+    memory = "?" if result["peak_memory_mb"] is None else str(result["peak_memory_mb"])
+    print(f"{_result_name(result):40} {result['lines_per_second']:>10} lines/s {memory:>8} MB", flush=True)
+
+
+def compare_results(old_results, new_results):
+    # (name, old lines/s, new lines/s, change in percent) of the results in both lists
+    old_by_key = {_result_key(result): result for result in old_results}
+    comparisons = []
+    for result in new_results:
+        old_result = old_by_key.get(_result_key(result))
+        if old_result is None:
+            continue
+        old_speed = old_result["lines_per_second"]
+        new_speed = result["lines_per_second"]
+        comparisons.append((_result_name(result), old_speed, new_speed, round((new_speed / old_speed - 1) * 100, 1)))
+    return comparisons
+
+
+def gdecoder_benchmark(args):
+    corpus = args.corpus if args.corpus is not None else os.path.join(tempfile.gettempdir(), "gdecoder_benchmark")
+    file_names = create_corpus(corpus, args.lines, args.layouts)
+    flag_combinations = FLAG_COMBINATIONS if args.flags is None else args.flags
+    results = run_benchmarks(file_names, args.lines, args.stages, flag_combinations, args.repeat)
+
+    data = {
+        "version": BENCHMARK_VERSION,
+        "created": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "cpus": os.cpu_count(),
+        "results": results,
+    }
+    with open(args.output, 'w', encoding='utf-8') as file1:
+        json.dump(data, file1, indent=1)
+
+    if args.compare is not None:
+        with open(args.compare, encoding='utf-8') as file1:
+            old_data = json.load(file1)
+        if old_data.get("version") != BENCHMARK_VERSION:
+            raise Exception("Benchmark results of another version: " + args.compare)
+        print(";Compared to " + args.compare + " (" + old_data["created"] + ", Python " + old_data["python"] + ")")
+        for name, old_speed, new_speed, change in compare_results(old_data["results"], results):
+            print(f"{name:40} {old_speed:>10} -> {new_speed:>10} lines/s ({change:+} %)")
+
+
+def parse_args(args):
+    parser = argparse.ArgumentParser(formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    parser.add_argument('--lines', '-n',
+                        help='number of lines of each synthetic file (e.g. 1000000 to 50000000)',
+                        type=int, default=1000000, dest="lines")
+    parser.add_argument('--layouts',
+                        help='layouts of the synthetic files', nargs='+', choices=LAYOUTS, default=list(LAYOUTS),
+                        dest="layouts")
+    parser.add_argument('--stages',
+                        help='benchmarked stages', nargs='+', choices=STAGES, default=list(STAGES), dest="stages")
+    parser.add_argument('--flags',
+                        help='gdecoder options of the end-to-end benchmark, e.g. "-c -g -d" (default: all of '
+                        + ", ".join('"' + flags + '"' for flags in FLAG_COMBINATIONS) + ')', nargs='+', default=None,
+                        dest="flags")
+    parser.add_argument('--repeat', '-r',
+                        help='repetitions of each benchmark (the fastest is used)', type=int, default=1, dest="repeat")
+    parser.add_argument('--corpus',
+                        help='directory of the synthetic files (generated once, default: in the temp directory)',
+                        default=None, dest="corpus")
+    parser.add_argument('--output', '-o',
+                        help='JSON file of the results', default="benchmark.json", dest="output")
+    parser.add_argument('--compare',
+                        help='JSON file of older results to compare with', default=None, dest="compare")
+    return parser.parse_args(args)
+
+
+if __name__ == '__main__':
+    parser = parse_args(sys.argv[1:])
+    gdecoder_benchmark(parser)
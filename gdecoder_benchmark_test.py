@@ -0,0 +1,66 @@
+from gdecoder_benchmark import STAGES
+from gdecoder_benchmark import compare_results
+from gdecoder_benchmark import create_corpus
+from gdecoder_benchmark import gdecoder_benchmark
+from gdecoder_benchmark import parse_args
+from gdecoder_benchmark import run_benchmark
+import json
+import os
+import pytest
+pytestmark = pytest.mark.integration
+
+
+@pytest.mark.parametrize("stage", STAGES)
+def test_run_benchmark_seconds(tmp_path, stage):
+    # arrange
+    file_names = create_corpus(str(tmp_path), 2000, ["prusaslicer"])
+
+    # act
+    seconds, memory = run_benchmark(stage, file_names["prusaslicer"], "-c -g -d")
+
+    # assert
+    assert(seconds > 0)
+    assert(memory is None or memory > 0)
+
+
+def test_create_corpus_existing_file_kept(tmp_path):
+    # arrange
+    file_names = create_corpus(str(tmp_path), 1000, ["cura"])
+    modified_time = os.stat(file_names["cura"]).st_mtime_ns
+    os.utime(file_names["cura"], ns=(0, 1))
+
+    # act
+    file_names = create_corpus(str(tmp_path), 1000, ["cura"])
+
+    # assert
+    assert(modified_time) != 1
+    assert(os.stat(file_names["cura"]).st_mtime_ns) == 1
+
+
+def test_compare_results_change_percent():
+    # arrange
+    old_results = [{"stage": "gdecoder", "layout": "cura", "flags": "-c", "lines": 1000, "lines_per_second": 100}]
+    new_results = [{"stage": "gdecoder", "layout": "cura", "flags": "-c", "lines": 1000, "lines_per_second": 125},
+                   {"stage": "gdecoder", "layout": "cura", "flags": "-g", "lines": 1000, "lines_per_second": 100}]
+
+    # act
+    comparisons = compare_results(old_results, new_results)
+
+    # assert
+    assert(comparisons) == [("gdecoder cura -c", 100, 125, 25.0)]
+
+
+def test_gdecoder_benchmark_json(tmp_path, capsys):
+    # arrange
+    args = parse_args(["-n", "1000", "--layouts", "slic3r", "--stages", "read_meta_infos", "gdecoder",
+                       "--flags", "-c -g -d", "--corpus", str(tmp_path), "-o", str(tmp_path / "results.json")])
+
+    # act
+    gdecoder_benchmark(args)
+
+    # assert
+    with open(tmp_path / "results.json", encoding='utf-8') as file1:
+        results = json.load(file1)["results"]
+    assert([(result["stage"], result["flags"]) for result in results]) == [
+        ("read_meta_infos", ""), ("gdecoder", "-c -g -d")]
+    assert(all(result["lines"] == 1000 for result in results))
@@ -1,6 +1,17 @@
 # test gdecoder.py with some example files
+from printer_model.ThermalModel import AMBIENT_TEMPERATURE
+from printer_model.ThermalModel import BED_PARAMETERS
+from printer_model.ThermalModel import ENERGY_PRICE
+from printer_model.ThermalModel import EXTRUDER_PARAMETERS
+from printer_model.ThermalModel import FAN_LOSS
 from gdecoder import gdecoder
 from gdecoder import parse_args
+import FileMetaInfos
+import bz2
+import gzip
+import io
+import json
+import lzma
 import pathlib
 import pytest
 pytestmark = pytest.mark.integration
@@ -20,6 +31,23 @@ def create_args_emulation_with_defaults(input_file):
 
     # using verbose is very slow when using "real world" gcode files -> don't show by default
     ArgsEmulation.showVerbose = False
+    ArgsEmulation.trajectory = False
+    ArgsEmulation.arcSegments = False
+    ArgsEmulation.extruderHeater = EXTRUDER_PARAMETERS
+    ArgsEmulation.bedHeater = BED_PARAMETERS
+    ArgsEmulation.fanLoss = FAN_LOSS
+    ArgsEmulation.ambientTemperature = AMBIENT_TEMPERATURE
+    ArgsEmulation.energyPrice = ENERGY_PRICE
+    ArgsEmulation.jobs = 1
+    ArgsEmulation.output = None
+    ArgsEmulation.width = None
+    ArgsEmulation.showVerboseDelta = False
+    ArgsEmulation.snapshotLines = 0
+    ArgsEmulation.snapshotLayers = False
+    ArgsEmulation.layers = None
+    ArgsEmulation.fromLine = None
+    ArgsEmulation.follow = False
+    ArgsEmulation.profile = None
     return ArgsEmulation
 
 
@@ -35,20 +63,429 @@ def test_gcode_in_examples_synthetic_folder(synthetic_input_file):
     gdecoder(args_emulation)
 
 
+def test_trajectory_summary_same_as_decoded_summary(synthetic_input_file, capsys):
+    args_emulation = create_args_emulation_with_defaults(synthetic_input_file)
+    args_emulation.hideComments = True
+    args_emulation.hideGCode = True
+    args_emulation.hideDecoded = True
+    gdecoder(args_emulation)
+    decoded_summary = capsys.readouterr().out
+
+    args_emulation.trajectory = True
+    gdecoder(args_emulation)
+    trajectory_summary = capsys.readouterr().out
+
+    assert(trajectory_summary) == decoded_summary
+
+
+def test_verbose_delta_output_shorter_than_verbose(synthetic_input_file, capsys):
+    args_emulation = create_args_emulation_with_defaults(synthetic_input_file)
+    args_emulation.stopOnUndecoded = False
+    args_emulation.showVerbose = True
+    gdecoder(args_emulation)
+    verbose_output = capsys.readouterr().out
+
+    args_emulation.showVerboseDelta = True
+    args_emulation.snapshotLayers = True
+    gdecoder(args_emulation)
+    delta_output = capsys.readouterr().out
+
+    assert(len(delta_output)) <= len(verbose_output)
+
+
+def test_parallel_output_same_as_serial_output(synthetic_input_file, capsys):
+    args_emulation = create_args_emulation_with_defaults(synthetic_input_file)
+    args_emulation.stopOnUndecoded = False
+    args_emulation.showVerbose = True
+    gdecoder(args_emulation)
+    serial_output = capsys.readouterr().out
+
+    args_emulation.jobs = 2
+    gdecoder(args_emulation)
+    parallel_output = capsys.readouterr().out
+
+    assert(parallel_output) == serial_output
+
+
+def test_profile_output_same_as_output(synthetic_input_file, capsys):
+    args_emulation = create_args_emulation_with_defaults(synthetic_input_file)
+    args_emulation.showVerbose = True
+    gdecoder(args_emulation)
+    output = capsys.readouterr().out
+
+    args_emulation.profile = "-"
+    gdecoder(args_emulation)
+    captured = capsys.readouterr()
+
+    assert(captured.out) == output
+    assert(captured.err.startswith(";Profile\n")) is True
+
+
+def test_profile_json_file(capsys, tmp_path):
+    args_emulation = create_args_emulation_with_defaults("README.gcode")
+    args_emulation.profile = str(tmp_path / "profile.json")
+    gdecoder(args_emulation)
+
+    assert(capsys.readouterr().err) == ""
+    with open(args_emulation.profile, encoding='utf-8') as file1:
+        profile = json.load(file1)
+    assert(list(profile["phases"])) == ["scan longest line", "decode lines", "summary"]
+    assert(profile["calls"]["meta infos"]["count"]) == 20
+    assert(profile["commands"]["G1"]["count"]) > 0
+
+
+def test_summary_only_same_as_decoded_summary(synthetic_input_file, capsys):
+    args_emulation = create_args_emulation_with_defaults(synthetic_input_file)
+    args_emulation.stopOnUndecoded = False
+    args_emulation.hideComments = True
+    args_emulation.hideGCode = True
+    gdecoder(args_emulation)
+    decoded_output = capsys.readouterr().out
+
+    args_emulation.hideDecoded = True
+    gdecoder(args_emulation)
+    summary = capsys.readouterr().out
+
+    assert(decoded_output.endswith(summary)) is True
+    assert(";Summary:" in summary) is True
+
+
+def test_summary_only_from_trajectory(capsys, monkeypatch):
+    # arrange
+    args_emulation = create_args_emulation_with_defaults("README.gcode")
+    args_emulation.hideComments = args_emulation.hideGCode = args_emulation.hideDecoded = True
+    args_emulation.stopOnUndecoded = False
+    monkeypatch.setattr("gdecoder.GDecoderLine", None)
+
+    # act
+    gdecoder(args_emulation)
+
+    # assert
+    # no line is decoded
+    assert(";Summary:" in capsys.readouterr().out) is True
+
+
+@pytest.mark.parametrize("trajectory", [False, True])
+def test_thermal_parameters_in_summary(capsys, trajectory):
+    # arrange
+    args_emulation = create_args_emulation_with_defaults("examples_synthetic/generic.gcode")
+    args_emulation.hideComments = args_emulation.hideGCode = args_emulation.hideDecoded = True
+    args_emulation.trajectory = trajectory
+    gdecoder(args_emulation)
+    default_summary = capsys.readouterr().out
+    args_emulation.bedHeater = (400.0, 358.0, 2.0)
+    args_emulation.energyPrice = 0.5
+
+    # act
+    gdecoder(args_emulation)
+
+    # assert
+    summary = capsys.readouterr().out
+    assert("(0.5 €/kWh)" in summary) is True
+    assert(summary.split(";  Bed       : ")[1]) != default_summary.split(";  Bed       : ")[1]
+
+
+def test_output_file_same_as_stdout(capsys, tmp_path):
+    args_emulation = create_args_emulation_with_defaults("README.gcode")
+    gdecoder(args_emulation)
+    stdout_output = capsys.readouterr().out
+
+    args_emulation.output = str(tmp_path / "output.txt")
+    gdecoder(args_emulation)
+
+    assert(capsys.readouterr().out) == ""
+    with open(args_emulation.output, encoding='utf-8') as file1:
+        assert(file1.read()) == stdout_output
+
+
+@pytest.mark.parametrize("extension, compress", [(".gz", gzip.compress), (".bz2", bz2.compress), (".xz", lzma.compress)])
+def test_compressed_input_same_output(capsys, tmp_path, extension, compress):
+    args_emulation = create_args_emulation_with_defaults("README.gcode")
+    args_emulation.hideSummary = True
+    gdecoder(args_emulation)
+    plain_output = capsys.readouterr().out
+
+    file_name = tmp_path / ("README.gcode" + extension)
+    with open("README.gcode", 'rb') as file1:
+        file_name.write_bytes(compress(file1.read()))
+    args_emulation.input = str(file_name)
+    args_emulation.width = 45
+    args_emulation.jobs = 2
+    gdecoder(args_emulation)
+
+    assert(capsys.readouterr().out) == plain_output
+
+
+def test_compressed_input_decompressed_once(capsys, monkeypatch, tmp_path):
+    file_name = tmp_path / "README.gcode.gz"
+    with open("README.gcode", 'rb') as file1:
+        file_name.write_bytes(gzip.compress(file1.read()))
+    opened = []
+    open_gcode = FileMetaInfos.open_gcode
+    monkeypatch.setattr("FileMetaInfos.open_gcode", lambda *args: opened.append(args[0]) or open_gcode(*args))
+    args_emulation = create_args_emulation_with_defaults(file_name)
+    gdecoder(args_emulation)
+
+    assert(opened) == [str(file_name)]
+    assert(";  Longest   : 45 characters (without comment lines)\n" in capsys.readouterr().out)
+
+
+def test_compressed_input_trajectory_summary_same_as_decoded_summary(capsys, tmp_path):
+    file_name = tmp_path / "README.gcode.gz"
+    with open("README.gcode", 'rb') as file1:
+        file_name.write_bytes(gzip.compress(file1.read()))
+    args_emulation = create_args_emulation_with_defaults(file_name)
+    args_emulation.hideComments = args_emulation.hideGCode = True
+    gdecoder(args_emulation)
+    decoded_output = capsys.readouterr().out
+
+    args_emulation.trajectory = True
+    gdecoder(args_emulation)
+
+    assert(decoded_output.endswith(capsys.readouterr().out)) is True
+    assert("19 commands" in decoded_output)
+
+
+def set_stdin(monkeypatch, file_name):
+    with open(file_name, 'rb') as file1:
+        monkeypatch.setattr("sys.stdin", io.TextIOWrapper(io.BytesIO(file1.read())))
+
+
+def test_stdin_input_same_output(capsys, monkeypatch):
+    args_emulation = create_args_emulation_with_defaults("README.gcode")
+    gdecoder(args_emulation)
+    file_output = capsys.readouterr().out
+
+    set_stdin(monkeypatch, "README.gcode")
+    args_emulation.input = "-"
+    args_emulation.width = 45
+    args_emulation.jobs = 2
+    gdecoder(args_emulation)
+    stdin_output = capsys.readouterr().out
+
+    # same, except for the file name and modification time
+    different_lines = [(file_line, stdin_line) for file_line, stdin_line
+                       in zip(file_output.splitlines(), stdin_output.splitlines()) if file_line != stdin_line]
+    assert(len(stdin_output.splitlines())) == len(file_output.splitlines())
+    assert([file_line for file_line, stdin_line in different_lines]) == [
+        ";  Name      : README.gcode", ";  Modified  : " + file_output.split(";  Modified  : ")[1].splitlines()[0]]
+
+
+def test_file_input_column_of_longest_line(capsys, tmp_path):
+    # arrange
+    file_name = tmp_path / "test.gcode"
+    file_name.write_text("G90\nG1 X10.5 Y20.25 E1.5\n", encoding="utf-8")
+    args_emulation = create_args_emulation_with_defaults(str(file_name))
+    args_emulation.hideSummary = True
+
+    # act
+    gdecoder(args_emulation)
+
+    # assert
+    # the first (shorter) line is aligned to the longest line of the file
+    lines = capsys.readouterr().out.splitlines()
+    assert([line.index(" ; ") for line in lines]) == [22, 22]
+
+
+def test_stdin_input_trajectory_summary_same_as_decoded_summary(capsys, monkeypatch):
+    args_emulation = create_args_emulation_with_defaults("-")
+    args_emulation.hideComments = args_emulation.hideGCode = True
+    set_stdin(monkeypatch, "README.gcode")
+    gdecoder(args_emulation)
+    decoded_summary = capsys.readouterr().out.split(";Summary:")[1]
+
+    set_stdin(monkeypatch, "README.gcode")
+    args_emulation.trajectory = True
+    gdecoder(args_emulation)
+    trajectory_summary = capsys.readouterr().out
+
+    assert("Size      : 291 bytes" in decoded_summary)
+    assert(trajectory_summary.split(";Printed")[1]) == decoded_summary.split(";Printed")[1]
+
+
+LAYERS_GCODE = ("; generated by PrusaSlicer\n"
+                "M104 S200\n"
+                "G28\n"
+                ";LAYER_CHANGE\n"
+                "G1 Z0.2 F600\n"
+                "G1 X10 Y10 E1\n"
+                ";LAYER_CHANGE\n"
+                "G1 Z0.4\n"
+                "G1 X20 Y10 E2\n"
+                "M107\n"
+                ";LAYER_CHANGE\n"
+                "G1 Z0.6\n"
+                "G1 X20 Y30 E5\n")
+
+
+def test_layers_output_same_as_full_output(capsys, tmp_path):
+    (tmp_path / "a.gcode").write_text(LAYERS_GCODE)
+    args_emulation = create_args_emulation_with_defaults(tmp_path / "a.gcode")
+    args_emulation.hideSummary = True
+    gdecoder(args_emulation)
+    full_output = capsys.readouterr().out
+
+    args_emulation.layers = "1-1"
+    gdecoder(args_emulation)
+    layers_output = capsys.readouterr().out
+
+    assert(layers_output) == "".join(full_output.splitlines(keepends=True)[6:10])
+
+
+def test_layers_summary_of_layers_only(capsys, tmp_path):
+    (tmp_path / "a.gcode").write_text(LAYERS_GCODE)
+    args_emulation = create_args_emulation_with_defaults(tmp_path / "a.gcode")
+    args_emulation.hideComments = args_emulation.hideGCode = args_emulation.hideDecoded = True
+    args_emulation.layers = "1-2"
+    gdecoder(args_emulation)
+    summary = capsys.readouterr().out
+
+    assert(";  Lines     : 7\n" in summary)
+    assert(";  Layers    : 1-2 of 3 (Z: 0.4-0.6 mm)\n" in summary)
+    assert(";  X         : 10.0 mm\n" in summary)
+    assert(";  Y         : 20.0 mm\n" in summary)
+    assert(";  Extruder  : 200 °C (max.)\n" in summary)
+    assert(";  Length    : 4.0 mm\n" in summary)
+    assert(";  Extruding : 30 mm (XY), 30 mm (XYZ)\n" in summary)
+    assert(";  Travel    : 0 mm (XY), 0.4 mm (XYZ)\n" in summary)
+    assert(";  Flow      : 3.6 mm³/s (max.), 3.6 mm³/s (95 %), 3.6 mm³/s (median), 1.75 mm filament\n" in summary)
+
+
+@pytest.mark.parametrize("from_line", [1, 5, 8, 13])
+def test_from_line_output_same_as_full_output(capsys, monkeypatch, tmp_path, from_line):
+    monkeypatch.setattr("GCodeIndex.GCodeIndex.checkpoint_lines", 4)
+    (tmp_path / "a.gcode").write_text(LAYERS_GCODE)
+    args_emulation = create_args_emulation_with_defaults(tmp_path / "a.gcode")
+    gdecoder(args_emulation)
+    full_output = capsys.readouterr().out
+
+    args_emulation.fromLine = from_line
+    gdecoder(args_emulation)
+    from_line_output = capsys.readouterr().out
+
+    # same lines from this line on, the same summary of the whole file
+    assert(from_line_output) == "".join(full_output.splitlines(keepends=True)[from_line - 1:])
+
+
+def test_follow_appended_lines_decoded(capsys, monkeypatch, tmp_path):
+    (tmp_path / "a.gcode").write_bytes(b"G90\nG1 X1 Y1 E1\n")
+    appended = [b"G1 X2 Y2 E2\nG1 X3", b" Y3 E3\n"]
+
+    def sleep(seconds):
+        # the file grows while waiting, Ctrl+C after the last part
+        if not appended:
+            raise KeyboardInterrupt()
+        with open(tmp_path / "a.gcode", 'ab') as file1:
+            file1.write(appended.pop(0))
+
+    monkeypatch.setattr("time.sleep", sleep)
+    args_emulation = create_args_emulation_with_defaults(tmp_path / "a.gcode")
+    args_emulation.follow = True
+    args_emulation.hideSummary = True
+    args_emulation.width = 12
+    gdecoder(args_emulation)
+    output = capsys.readouterr().out
+
+    assert(output.splitlines()) == [
+        "G90           ; Set to Absolute Positioning",
+        "G1 X1 Y1 E1   ; Linear Move (print), X: 1 mm, Y: 1 mm, E: 1 mm",
+        "G1 X2 Y2 E2   ; Linear Move (print), X: 2 mm, Y: 2 mm, E: 2 mm",
+        "G1 X3 Y3 E3   ; Linear Move (print), X: 3 mm, Y: 3 mm, E: 3 mm"]
+
+
+def test_follow_summary_after_appended_lines(capsys, monkeypatch, tmp_path):
+    (tmp_path / "a.gcode").write_bytes(b"G90\nG1 X1 Y1 E1\n")
+    appended = [b"G1 X5 Y1 E2\n"]
+
+    def sleep(seconds):
+        if not appended:
+            raise KeyboardInterrupt()
+        with open(tmp_path / "a.gcode", 'ab') as file1:
+            file1.write(appended.pop(0))
+
+    monkeypatch.setattr("time.sleep", sleep)
+    args_emulation = create_args_emulation_with_defaults(tmp_path / "a.gcode")
+    args_emulation.follow = True
+    args_emulation.hideComments = args_emulation.hideGCode = args_emulation.hideDecoded = True
+    gdecoder(args_emulation)
+    summaries = capsys.readouterr().out.split(";Summary:")
+
+    assert(len(summaries)) == 3
+    assert(";  Lines     : 2\n" in summaries[1])
+    assert(";  Lines     : 3\n" in summaries[2])
+    assert(";  Size      : 28 bytes\n" in summaries[2])
+    assert(";  X         : 4.0 mm\n" in summaries[2])
+
+
+def test_arc_segments_summary_time(capsys, tmp_path):
+    # full circles with a radius of 0.5 mm: the 31 segments of 0.1 mm are slower than the arcs as a whole
+    (tmp_path / "a.gcode").write_text("G28\nG1 X10 Y10 F6000\n" + "".join("G2 I0.5 J0 E" + str(e) + "\n"
+                                                                          for e in range(1, 101)))
+    args_emulation = create_args_emulation_with_defaults(tmp_path / "a.gcode")
+    args_emulation.hideComments = args_emulation.hideGCode = args_emulation.hideDecoded = True
+    gdecoder(args_emulation)
+    summary = capsys.readouterr().out
+
+    args_emulation.arcSegments = True
+    gdecoder(args_emulation)
+    segments_summary = capsys.readouterr().out
+
+    assert(";  Total     : 0h 00m 04s (estimated)\n" in summary)
+    assert(";  Total     : 0h 00m 06s (estimated)\n" in segments_summary)
+    assert([line for line in segments_summary.splitlines() if "Total" not in line and "Moving" not in line]) == \
+        [line for line in summary.splitlines() if "Total" not in line and "Moving" not in line]
+
+
+def test_arc_segments_trajectory_exception(tmp_path):
+    (tmp_path / "a.gcode").write_text(LAYERS_GCODE)
+    args_emulation = create_args_emulation_with_defaults(tmp_path / "a.gcode")
+    args_emulation.trajectory = True
+    args_emulation.arcSegments = True
+
+    with pytest.raises(Exception, match="--arc-segments"):
+        gdecoder(args_emulation)
+
+
+def test_layers_not_in_file_exception(tmp_path):
+    (tmp_path / "a.gcode").write_text(LAYERS_GCODE)
+    args_emulation = create_args_emulation_with_defaults(tmp_path / "a.gcode")
+    args_emulation.layers = "2-3"
+
+    with pytest.raises(Exception, match="not in the file"):
+        gdecoder(args_emulation)
+
+
 def test_parser_all_optional_parameters_unused():
-    parser = parse_args(['-i', 'abc'])
+    parser = parse_args([])
 
-    assert(parser.input == "abc")
+    assert(parser.input == "-")
+    assert(parser.width is None)
     assert(parser.hideSummary is False)
     assert(parser.hideComments is False)
     assert(parser.hideGCode is False)
     assert(parser.hideDecoded is False)
     assert(parser.showVerbose is False)
     assert(parser.stopOnUndecoded is False)
+    assert(parser.trajectory is False)
+    assert(parser.arcSegments is False)
+    assert(parser.jobs == 1)
+    assert(parser.output is None)
+    assert(parser.showVerboseDelta is False)
+    assert(parser.snapshotLines == 0)
+    assert(parser.snapshotLayers is False)
+    assert(parser.layers is None)
+    assert(parser.fromLine is None)
+    assert(parser.follow is False)
+    assert(parser.profile is None)
+    assert(parser.extruderHeater == EXTRUDER_PARAMETERS)
+    assert(parser.bedHeater == BED_PARAMETERS)
+    assert(parser.energyPrice == ENERGY_PRICE)
 
 
 def test_parser_all_optional_parameters_used():
-    parser = parse_args(['-i', 'abc', "-s", "-c", "-g", "-d", "-v", "-u"])
+    parser = parse_args(['-i', 'abc', "-s", "-c", "-g", "-d", "-v", "-u", "-t", "-j", "4", "-o", "out.txt",
+                         "-V", "--snapshot", "100", "--snapshot-layers", "-w", "40",
+                         "-l", "400-420", "--from-line", "1000", "-f", "--arc-segments"])
 
     assert(parser.input == "abc")
     assert(parser.hideSummary is True)
@@ -57,3 +494,63 @@ def test_parser_all_optional_parameters_used():
     assert(parser.hideDecoded is True)
     assert(parser.showVerbose is True)
     assert(parser.stopOnUndecoded is True)
+    assert(parser.trajectory is True)
+    assert(parser.arcSegments is True)
+    assert(parser.jobs == 4)
+    assert(parser.output == "out.txt")
+    assert(parser.showVerboseDelta is True)
+    assert(parser.snapshotLines == 100)
+    assert(parser.snapshotLayers is True)
+    assert(parser.width == 40)
+    assert(parser.layers == "400-420")
+    assert(parser.fromLine == 1000)
+    assert(parser.follow is True)
+
+
+@pytest.mark.parametrize("options", [["--snapshot", "100"], ["--snapshot-layers"], ["-v", "--snapshot-layers"]])
+def test_parser_snapshot_without_verbose_delta_error(capsys, options):
+    with pytest.raises(SystemExit):
+        parse_args(["-i", "abc"] + options)
+
+    assert("--snapshot and --snapshot-layers need --verbose-delta (-V)" in capsys.readouterr().err) is True
+
+
+def test_parser_thermal_parameters():
+    parser = parse_args(["--extruder-heater", "50,12,0.1", "--bed-heater", "300,400,1.5", "--fan-loss", "0.02",
+                         "--ambient-temperature", "25", "--energy-price", "0.4"])
+
+    assert(parser.extruderHeater == (50, 12, 0.1))
+    assert(parser.bedHeater == (300, 400, 1.5))
+    assert(parser.fanLoss == 0.02)
+    assert(parser.ambientTemperature == 25)
+    assert(parser.energyPrice == 0.4)
+
+
+@pytest.mark.parametrize("value", ["40,15", "40,15,0", "a,b,c"])
+def test_parser_heater_parameters_invalid_error(capsys, value):
+    with pytest.raises(SystemExit):
+        parse_args(["--bed-heater", value])
+
+    assert("--bed-heater: invalid heater_parameters value" in capsys.readouterr().err) is True
+
+
+def test_parser_profile_without_file():
+    parser = parse_args(["--profile"])
+
+    assert(parser.profile == "-")
+
+
+def test_parser_profile_file():
+    parser = parse_args(["-i", "abc", "-c", "-g", "--profile", "profile.json"])
+
+    assert(parser.profile == "profile.json")
+
+
+@pytest.mark.parametrize("options,expected_option", [
+    (["-t"], "--trajectory"), (["-c", "-g", "-d"], "-c -g -d"), (["-l", "1-2"], "--layers"),
+    (["--from-line", "10"], "--from-line"), (["-f"], "--follow"), (["-j", "2"], "--jobs")])
+def test_parser_profile_unprofiled_mode_error(capsys, options, expected_option):
+    with pytest.raises(SystemExit):
+        parse_args(["-i", "abc", "--profile"] + options)
+
+    assert("--profile isn't supported with " + expected_option in capsys.readouterr().err) is True
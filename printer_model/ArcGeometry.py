@@ -0,0 +1,138 @@
+# Geometry of the G2/G3 arc moves: center, radius, angles, length and bounding box,
+# and the linearization into straight segments like the firmware does it (see: ArcSegmentation)
+#
+# The center is given by I/J (offset from the start point) or by R (radius, R < 0: more than a half circle),
+# the same as Marlin: https://marlinfw.org/docs/gcode/G002-G003.html
+# Like in the firmware, the arc follows the radius of the start point and its angle ends at the end point
+# (an end point at another radius is reached by the last segment, its length includes the radius difference).
+# With I/J, the same start and end point is a full circle.
+
+import math
+
+_FULL_CIRCLE = 2 * math.pi
+# the axis extremes of a circle: angle, X and Y direction
+_EXTREMES = ((0.0, 1.0, 0.0), (math.pi / 2, 0.0, 1.0), (math.pi, -1.0, 0.0), (math.pi * 3 / 2, 0.0, -1.0))
+
+
+def _center_from_radius(start_x, start_y, end_x, end_y, r, clockwise):
+    # center of the arc with radius r (R parameter), None if there is none (R0, end point = start point)
+    dx = end_x - start_x
+    dy = end_y - start_y
+    distance = math.hypot(dx, dy)
+    if r == 0 or distance == 0:
+        return None
+    # the center is on the perpendicular bisector, on the side given by the direction and the sign of R
+    # hint: a too small radius is taken as a half circle (Marlin: NaN)
+    side = -1.0 if clockwise != (r < 0) else 1.0
+    height = math.sqrt(max(r * r - distance * distance / 4, 0.0))
+    return ((start_x + end_x) / 2 - side * height * dy / distance,
+            (start_y + end_y) / 2 + side * height * dx / distance)
+
+
+def arc_parameters(start_x, start_y, end_x, end_y, i, j, r, clockwise):
+    # (center X, center Y, radius, start angle, sweep angle (clockwise: negative), end radius) of a G2/G3 move,
+    # None if it's no arc: no I/J/R (I and J 0), R with the same start and end point, unknown (NaN) positions
+    # hint: R is used, if given (like Marlin)
+    if r is not None:
+        center = _center_from_radius(start_x, start_y, end_x, end_y, r, clockwise)
+        if center is None:
+            return None
+        center_x, center_y = center
+    else:
+        i = 0.0 if i is None else i
+        j = 0.0 if j is None else j
+        if i == 0 and j == 0:
+            return None
+        center_x = start_x + i
+        center_y = start_y + j
+
+    start_dx = start_x - center_x
+    start_dy = start_y - center_y
+    end_dx = end_x - center_x
+    end_dy = end_y - center_y
+    radius = math.hypot(start_dx, start_dy)
+    # hint: comparisons with NaN are always False
+    if not (radius > 0 and end_dx == end_dx and end_dy == end_dy):
+        return None
+
+    # counter-clockwise angle from the start to the end point (0 .. 2 pi)
+    sweep = math.atan2(start_dx * end_dy - start_dy * end_dx, start_dx * end_dx + start_dy * end_dy)
+    if sweep < 0:
+        sweep += _FULL_CIRCLE
+    if clockwise:
+        sweep -= _FULL_CIRCLE
+    elif sweep == 0:
+        # the same start and end point
+        sweep = _FULL_CIRCLE
+    return center_x, center_y, radius, math.atan2(start_dy, start_dx), sweep, math.hypot(end_dx, end_dy)
+
+
+def arc_geometries(start_x, start_y, end_x, end_y, i, j, r, clockwise):
+    # arc_geometry of a batch of G2/G3 moves: the arguments are columns (sequences of the same length),
+    # the result are the columns (length, X min, X max, Y min, Y max), NaN in the rows which are no arc
+    parameters = list(map(arc_parameters, start_x, start_y, end_x, end_y, i, j, r, clockwise))
+    arcs = [index for index, values in enumerate(parameters) if values is not None]
+    lengths = [math.nan] * len(parameters)
+    x_min = lengths[:]
+    x_max = lengths[:]
+    y_min = lengths[:]
+    y_max = lengths[:]
+    for index in arcs:
+        radius, sweep, end_radius = parameters[index][2], parameters[index][4], parameters[index][5]
+        lengths[index] = abs(sweep) * radius + abs(end_radius - radius)
+        x_min[index], x_max[index] = sorted((start_x[index], end_x[index]))
+        y_min[index], y_max[index] = sorted((start_y[index], end_y[index]))
+
+    # the arcs bulge past their start and end point at each axis extreme they pass, one extreme after the other
+    # hint: an X extreme is between the Y values of the start and end point (and vice versa)
+    for angle, direction_x, direction_y in _EXTREMES:
+        for index in arcs:
+            center_x, center_y, radius, start_angle, sweep, end_radius = parameters[index]
+            passed = (angle - start_angle) % _FULL_CIRCLE if sweep > 0 else (start_angle - angle) % _FULL_CIRCLE
+            if passed > abs(sweep):
+                continue
+            if direction_x:
+                x = center_x + direction_x * radius
+                x_min[index] = min(x_min[index], x)
+                x_max[index] = max(x_max[index], x)
+            else:
+                y = center_y + direction_y * radius
+                y_min[index] = min(y_min[index], y)
+                y_max[index] = max(y_max[index], y)
+    return lengths, x_min, x_max, y_min, y_max
+
+
+def arc_geometry(start_x, start_y, end_x, end_y, i, j, r, clockwise):
+    # (length, X min, X max, Y min, Y max) of a G2/G3 move, None if it's no arc (see: arc_parameters)
+    columns = arc_geometries((start_x,), (start_y,), (end_x,), (end_y,), (i,), (j,), (r,), (clockwise,))
+    geometry = [column[0] for column in columns]
+    return None if geometry[0] != geometry[0] else tuple(geometry)
+
+
+class ArcSegmentation:
+    # the firmware settings of the arc linearization, default: Marlin (Configuration_adv.h)
+
+    def __init__(self, max_segment_mm=1.0, min_segment_mm=0.1, min_circle_segments=72):
+        # max./min. length of a segment (mm), min. number of segments of a full circle (smaller circles)
+        self.max_segment_mm = max_segment_mm
+        self.min_segment_mm = min_segment_mm
+        self.min_circle_segments = min_circle_segments
+
+    def segment_count(self, radius, length):
+        segment = min(self.max_segment_mm, radius * _FULL_CIRCLE / self.min_circle_segments)
+        segment = max(segment, self.min_segment_mm)
+        return max(1, round(length / segment))
+
+    def linearize(self, start_x, start_y, end_x, end_y, i, j, r, clockwise):
+        # the end points (X, Y) of the straight segments of a G2/G3 move, the last one is its end point
+        # (only the end point if it's no arc, see: arc_parameters)
+        parameters = arc_parameters(start_x, start_y, end_x, end_y, i, j, r, clockwise)
+        if parameters is None:
+            return [(end_x, end_y)]
+        center_x, center_y, radius, start_angle, sweep, end_radius = parameters
+        count = self.segment_count(radius, abs(sweep) * radius)
+        step = sweep / count
+        points = [(center_x + radius * math.cos(start_angle + step * index),
+                   center_y + radius * math.sin(start_angle + step * index)) for index in range(1, count)]
+        points.append((end_x, end_y))
+        return points
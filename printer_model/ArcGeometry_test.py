@@ -0,0 +1,139 @@
+from ArcGeometry import ArcSegmentation
+from ArcGeometry import arc_geometries
+from ArcGeometry import arc_geometry
+from ArcGeometry import arc_parameters
+import math
+import pytest
+pytestmark = pytest.mark.unittests
+
+arc_geometry_testdata = [
+    # start, end, I, J, R, clockwise -> length, X min, X max, Y min, Y max
+    ((10, 0), (-10, 0), -10, 0, None, False, (10 * math.pi, -10, 10, 0, 10)),
+    ((10, 0), (-10, 0), -10, 0, None, True, (10 * math.pi, -10, 10, -10, 0)),
+    ((10, 0), (0, 10), -10, 0, None, False, (5 * math.pi, 0, 10, 0, 10)),
+    ((10, 0), (0, 10), -10, 0, None, True, (15 * math.pi, -10, 10, -10, 10)),
+    # full circle
+    ((10, 0), (10, 0), -10, 0, None, False, (20 * math.pi, -10, 10, -10, 10)),
+    ((10, 0), (10, 0), -10, 0, None, True, (20 * math.pi, -10, 10, -10, 10)),
+    # no bulge (the arc doesn't pass an axis extreme)
+    ((math.sqrt(3), 1), (1, math.sqrt(3)), -math.sqrt(3), -1, None, False, (math.pi / 3, 1, math.sqrt(3), 1, math.sqrt(3))),
+    # R: the short (R > 0) or the long (R < 0) arc
+    ((10, 0), (0, 10), None, None, 10, False, (5 * math.pi, 0, 10, 0, 10)),
+    ((10, 0), (0, 10), None, None, -10, False, (15 * math.pi, 0, 20, 0, 20)),
+    ((10, 0), (0, 10), None, None, 10, True, (5 * math.pi, 0, 10, 0, 10)),
+    # R too small: half circle
+    ((10, 0), (-10, 0), None, None, 5, False, (10 * math.pi, -10, 10, 0, 10)),
+    # the end point at another radius: the radius difference is added
+    ((10, 0), (-20, 0), -10, 0, None, False, (10 * math.pi + 10, -20, 10, 0, 10)),
+]
+
+
+@pytest.mark.parametrize("start, end, i, j, r, clockwise, expected", arc_geometry_testdata)
+def test_arc_geometry(start, end, i, j, r, clockwise, expected):
+    # act
+    geometry = arc_geometry(start[0], start[1], end[0], end[1], i, j, r, clockwise)
+
+    # assert
+    assert(geometry) == pytest.approx(expected)
+
+
+no_arc_testdata = [
+    ((10, 0), (0, 10), None, None, None),
+    ((10, 0), (0, 10), 0, 0, None),
+    ((10, 0), (0, 10), None, None, 0),
+    ((10, 0), (10, 0), None, None, 5),
+    ((math.nan, math.nan), (0, 10), -10, 0, None),
+    ((10, 0), (math.nan, 10), -10, 0, None),
+]
+
+
+@pytest.mark.parametrize("start, end, i, j, r", no_arc_testdata)
+def test_arc_geometry_no_arc(start, end, i, j, r):
+    # act
+    geometry = arc_geometry(start[0], start[1], end[0], end[1], i, j, r, False)
+
+    # assert
+    assert(geometry) is None
+
+
+def test_arc_geometries_same_as_single_arcs():
+    # arrange
+    columns = list(zip(*[(start[0], start[1], end[0], end[1], i, j, r, clockwise)
+                         for start, end, i, j, r, clockwise, expected in arc_geometry_testdata]))
+
+    # act
+    geometries = arc_geometries(*columns)
+
+    # assert
+    assert(list(zip(*geometries))) == [arc_geometry(*row) for row in zip(*columns)]
+
+
+def test_arc_geometries_no_arc_nan():
+    # act
+    lengths, x_min, x_max, y_min, y_max = arc_geometries((10, 10), (0, 0), (0, -10), (10, 0), (None, -10), (None, 0),
+                                                         (None, None), (False, False))
+
+    # assert
+    assert(math.isnan(lengths[0]))
+    assert(math.isnan(x_min[0]) and math.isnan(x_max[0]) and math.isnan(y_min[0]) and math.isnan(y_max[0]))
+    assert(lengths[1]) == pytest.approx(10 * math.pi)
+    assert((x_min[1], x_max[1], y_min[1], y_max[1])) == pytest.approx((-10, 10, 0, 10))
+
+
+def test_arc_parameters_center_from_radius():
+    # act
+    center_x, center_y, radius, start_angle, sweep, end_radius = arc_parameters(0, 0, 2, 0, None, None, 2, False)
+
+    # assert
+    assert(center_x) == pytest.approx(1)
+    assert(center_y) == pytest.approx(math.sqrt(3))
+    assert(radius) == pytest.approx(2)
+    assert(start_angle) == pytest.approx(-math.pi * 2 / 3)
+    assert(sweep) == pytest.approx(math.pi / 3)
+    assert(end_radius) == pytest.approx(2)
+
+
+def test_arc_segmentation_linearize():
+    # arrange
+    segmentation = ArcSegmentation()
+
+    # act
+    points = segmentation.linearize(10, 0, -10, 0, -10, 0, None, False)
+
+    # assert
+    # 31.4 mm, 72 segments of a full circle
+    assert(len(points)) == 36
+    assert(points[-1]) == (-10, 0)
+    for x, y in points:
+        assert(math.hypot(x, y)) == pytest.approx(10)
+    assert(points[17]) == pytest.approx((0, 10))
+
+
+segment_count_testdata = [
+    # radius, length -> count
+    # large circle: segments of max. 1 mm
+    (20, 20 * math.pi, 63),
+    # small circle: at least 72 segments of a full circle
+    (5, 10 * math.pi, 72),
+    # tiny circle: segments of at least 0.1 mm
+    (0.5, math.pi, 31),
+    # very short arc: one segment
+    (10, 0.2, 1),
+]
+
+
+@pytest.mark.parametrize("radius, length, expected", segment_count_testdata)
+def test_arc_segmentation_segment_count(radius, length, expected):
+    # act
+    count = ArcSegmentation().segment_count(radius, length)
+
+    # assert
+    assert(count) == expected
+
+
+def test_arc_segmentation_linearize_no_arc():
+    # act
+    points = ArcSegmentation().linearize(10, 0, 0, 10, None, None, None, True)
+
+    # assert
+    assert(points) == [(0, 10)]
@@ -0,0 +1,97 @@
+# Path lengths and volumetric flow of the moves, summed up while reading (constant memory, no object per move)
+#
+# Extruding moves: X/Y/Z moves with increasing E. Travel moves: X/Y/Z moves without extrusion (G0, G1 without E,
+# also a move with a retract). Pure extruder moves (retract, prime) have no path and no flow.
+# The volumetric flow (mm³/s) of an extruding move is the filament cross section * E / duration,
+# the duration is taken from the path length and the commanded feedrate (without the firmware limits and the
+# acceleration, see: PrintTimeEstimator), so it's the flow the hotend has to melt at full speed.
+# The flow percentiles are weighted by the extrusion time, from a histogram with FLOW_BIN_WIDTH resolution.
+
+from printer_model.PrintTimeEstimator import PrintTimeEstimator
+import math
+
+# flow histogram: bin width (mm³/s), higher flows are counted in the last bin (the max. flow is exact)
+FLOW_BIN_WIDTH = 0.25
+FLOW_BINS = 400
+
+
+class MoveStatistics:
+    # filament diameter (mm)
+    filament_diameter = 1.75
+
+    def __init__(self):
+        # path lengths (mm), in the XY plane and in space
+        self.extrude_xy = 0.0
+        self.extrude_xyz = 0.0
+        self.travel_xy = 0.0
+        self.travel_xyz = 0.0
+        # flow (mm³/s), NaN: no extruding move (yet)
+        self.flow_max = math.nan
+        # extrusion time (s) of each flow bin, extended when needed
+        self.flow_histogram = []
+        # filament cross section (mm²)
+        self._area = math.pi / 4 * self.filament_diameter * self.filament_diameter
+
+    def add_move(self, dx, dy, dz, de, feedrate, length=None):
+        # the same values as PrintTimeEstimator.add_move: relative move (mm) and feedrate (mm/min),
+        # NaN: not known (yet) -> no movement on this axis, length: path length of an arc (in the XY plane)
+        dx = 0.0 if dx != dx else dx
+        dy = 0.0 if dy != dy else dy
+        xy = math.sqrt(dx * dx + dy * dy) if length is None else length
+        # hint: most moves are in the XY plane
+        xyz = xy if dz == 0 or dz != dz else math.sqrt(xy * xy + dz * dz)
+        if xyz == 0:
+            return
+        if not de > 0:
+            self.travel_xy += xy
+            self.travel_xyz += xyz
+            return
+
+        self.extrude_xy += xy
+        self.extrude_xyz += xyz
+        if feedrate != feedrate:
+            feedrate = PrintTimeEstimator.default_feedrate
+        if feedrate <= 0:
+            return
+        duration = xyz * 60 / feedrate
+        flow = self._area * de / duration
+        if flow > self.flow_max or self.flow_max != self.flow_max:
+            self.flow_max = flow
+        index = int(flow / FLOW_BIN_WIDTH)
+        histogram = self.flow_histogram
+        if index >= len(histogram):
+            if index >= FLOW_BINS:
+                index = FLOW_BINS - 1
+            histogram.extend([0.0] * (index + 1 - len(histogram)))
+        histogram[index] += duration
+
+    def flow_percentile(self, percent):
+        # the flow (mm³/s) of the given percentage of the extrusion time is at or below this value,
+        # NaN if there's no extruding move
+        # hint: the upper end of the histogram bin, not above the max. flow
+        total = sum(self.flow_histogram)
+        if total <= 0:
+            return math.nan
+        limit = total * percent / 100
+        summed = 0.0
+        for index, duration in enumerate(self.flow_histogram):
+            summed += duration
+            if summed >= limit and duration > 0:
+                return min((index + 1) * FLOW_BIN_WIDTH, self.flow_max)
+        return self.flow_max
+
+    def get_state(self):
+        # serializable state (see: PrinterModel.get_state)
+        return {"paths": [self.extrude_xy, self.extrude_xyz, self.travel_xy, self.travel_xyz],
+                "flow_max": self.flow_max, "flow_histogram": list(self.flow_histogram)}
+
+    def set_state(self, state):
+        self.extrude_xy, self.extrude_xyz, self.travel_xy, self.travel_xyz = state["paths"]
+        self.flow_max = state["flow_max"]
+        self.flow_histogram = list(state["flow_histogram"])
+
+    def reset(self):
+        # the values from now on (e.g. the summary of some layers)
+        self.extrude_xy = self.extrude_xyz = self.travel_xy = self.travel_xyz = 0.0
+        self.flow_max = math.nan
+        self.flow_histogram = []
@@ -0,0 +1,147 @@
+from MoveStatistics import MoveStatistics
+import json
+import math
+import pytest
+pytestmark = pytest.mark.unittests
+
+# filament cross section of 1.75 mm filament (mm²)
+AREA = math.pi / 4 * 1.75 * 1.75
+
+
+def test_add_move_extruding_and_travel_paths():
+    # arrange
+    statistics = MoveStatistics()
+
+    # act
+    statistics.add_move(3, 4, 0, 1, 600)
+    statistics.add_move(6, 8, 0, 0, 6000)
+    statistics.add_move(0, 0, 2, 0, 600)
+    statistics.add_move(3, 4, 12, 1, 600)
+
+    # assert
+    assert(statistics.extrude_xy) == 10
+    assert(statistics.extrude_xyz) == 18
+    assert(statistics.travel_xy) == 10
+    assert(statistics.travel_xyz) == 12
+
+
+def test_add_move_extruder_only_no_path():
+    # arrange
+    statistics = MoveStatistics()
+
+    # act
+    statistics.add_move(math.nan, math.nan, math.nan, -0.8, 2100)
+    statistics.add_move(0, 0, 0, 0.8, 2100)
+
+    # assert
+    assert(statistics.extrude_xyz) == 0
+    assert(statistics.travel_xyz) == 0
+    assert(math.isnan(statistics.flow_max))
+    assert(math.isnan(statistics.flow_percentile(95)))
+
+
+def test_add_move_retract_while_moving_travel():
+    # arrange
+    statistics = MoveStatistics()
+
+    # act
+    statistics.add_move(3, 4, 0, -1, 600)
+
+    # assert
+    assert(statistics.travel_xy) == 5
+    assert(statistics.extrude_xy) == 0
+
+
+def test_add_move_arc_length():
+    # arrange
+    statistics = MoveStatistics()
+
+    # act
+    statistics.add_move(20, 0, 0, 1, 600, 10 * math.pi)
+
+    # assert
+    assert(statistics.extrude_xy) == pytest.approx(10 * math.pi)
+
+
+def test_add_move_volumetric_flow():
+    # arrange
+    statistics = MoveStatistics()
+
+    # act
+    # 10 mm at 10 mm/s with 0.5 mm filament: 1 s
+    statistics.add_move(10, 0, 0, 0.5, 600)
+
+    # assert
+    assert(statistics.flow_max) == pytest.approx(AREA * 0.5)
+
+
+def test_add_move_unknown_feedrate_default():
+    # arrange
+    statistics = MoveStatistics()
+
+    # act
+    statistics.add_move(25, 0, 0, 1, math.nan)
+
+    # assert
+    # 1500 mm/min: 1 s
+    assert(statistics.flow_max) == pytest.approx(AREA)
+
+
+def test_flow_percentile_weighted_by_time():
+    # arrange
+    statistics = MoveStatistics()
+    # 9 s at about 2.4 mm³/s, 1 s at about 12 mm³/s
+    statistics.add_move(90, 0, 0, 9, 600)
+    statistics.add_move(10, 0, 0, 5, 600)
+
+    # act
+    median = statistics.flow_percentile(50)
+    percentile_95 = statistics.flow_percentile(95)
+
+    # assert
+    assert(median) == 2.5
+    assert(percentile_95) == pytest.approx(AREA * 5)
+    assert(statistics.flow_max) == pytest.approx(AREA * 5)
+
+
+def test_add_move_huge_flow_last_bin():
+    # arrange
+    statistics = MoveStatistics()
+
+    # act
+    statistics.add_move(0.01, 0, 0, 10, 6000)
+
+    # assert
+    assert(len(statistics.flow_histogram)) == 400
+    assert(statistics.flow_percentile(50)) == 100
+    assert(statistics.flow_max) > 100
+
+
+def test_get_state_set_state_same_values():
+    # arrange
+    statistics = MoveStatistics()
+    statistics.add_move(3, 4, 0, 1, 600)
+    statistics.add_move(6, 8, 0, 0, 6000)
+    restored = MoveStatistics()
+
+    # act
+    restored.set_state(json.loads(json.dumps(statistics.get_state())))
+
+    # assert
+    assert(restored.get_state()) == statistics.get_state()
+    assert(restored.flow_percentile(95)) == statistics.flow_percentile(95)
+
+
+def test_reset_values_from_now_on():
+    # arrange
+    statistics = MoveStatistics()
+    statistics.add_move(3, 4, 0, 1, 600)
+
+    # act
+    statistics.reset()
+    statistics.add_move(6, 8, 0, 0, 6000)
+
+    # assert
+    assert(statistics.extrude_xy) == 0
+    assert(statistics.travel_xy) == 10
+    assert(math.isnan(statistics.flow_max))
@@ -0,0 +1,281 @@
+# Estimate the print time from the stream of moves, similar to the Marlin motion planner
+#
+# Each move becomes a block with a trapezoidal velocity profile (accelerate, cruise, decelerate).
+# The entry speed of a block is limited by the jerk at the junction to the previous block
+# (simplified "classic jerk") and by the distance available to accelerate / decelerate.
+# Lookahead: blocks are buffered and planned in chunks (reverse pass: deceleration, forward pass: acceleration),
+# a block is finished as soon as its exit speed can't change anymore by later blocks.
+# Dwells (G4) and heat-up waits (M109/M190, see: ThermalModel) stop the motion and add their time.
+#
+# Hint: The default limits are the Marlin defaults (Configuration.h), M201/M203/M204/M205 change them.
+# https://marlinfw.org/docs/gcode/M201.html
+
+import math
+
+# start planning after this number of buffered blocks
+_CHUNK_SIZE = 1024
+# direction of "no movement"
+_STOPPED = (0.0, 0.0, 0.0, 0.0)
+
+
+def _axes_limited(value, parts, limits):
+    # limit a speed or acceleration along a direction (absolute unit vector parts) to the per axis limits
+    part_x, part_y, part_z, part_e = parts
+    limit_x, limit_y, limit_z, limit_e = limits
+    if value * part_x > limit_x:
+        value = limit_x / part_x
+    if value * part_y > limit_y:
+        value = limit_y / part_y
+    if value * part_z > limit_z:
+        value = limit_z / part_z
+    if value * part_e > limit_e:
+        value = limit_e / part_e
+    return value
+
+
+def _junction_speed(speed, previous, direction, jerks):
+    # limit the speed change of each axis at the junction to its jerk (simplified "classic jerk")
+    changes = (abs(previous[0] - direction[0]), abs(previous[1] - direction[1]),
+               abs(previous[2] - direction[2]), abs(previous[3] - direction[3]))
+    return _axes_limited(speed, changes, jerks)
+
+
+def _block_time(distance, acceleration, nominal, entry, exit):
+    # trapezoidal (or triangular if the nominal speed isn't reached) velocity profile
+    accelerate_distance = (nominal * nominal - entry * entry) / (2 * acceleration)
+    decelerate_distance = (nominal * nominal - exit * exit) / (2 * acceleration)
+    cruise_distance = distance - accelerate_distance - decelerate_distance
+    if cruise_distance >= 0:
+        return (2 * nominal - entry - exit) / acceleration + cruise_distance / nominal
+    peak = math.sqrt(acceleration * distance + (entry * entry + exit * exit) / 2)
+    return (2 * peak - entry - exit) / acceleration
+
+
+class PrintTimeEstimator:
+    # feedrate (mm/min) until the first F parameter
+    default_feedrate = 1500.0
+
+    def __init__(self):
+        # limits per axis: max. feedrate (mm/s), max. acceleration (mm/s²), jerk (mm/s)
+        self.max_feedrate = {"X": 300.0, "Y": 300.0, "Z": 5.0, "E": 25.0}
+        self.max_acceleration = {"X": 3000.0, "Y": 3000.0, "Z": 100.0, "E": 10000.0}
+        self.jerk = {"X": 10.0, "Y": 10.0, "Z": 0.3, "E": 5.0}
+        # the same limits as XYZE tuples, for the planner
+        self._max_feedrate = tuple(self.max_feedrate.values())
+        self._max_acceleration = tuple(self.max_acceleration.values())
+        self._jerk = tuple(self.jerk.values())
+        # default acceleration (mm/s²) of moves with extrusion, retracts (E only) and travel moves
+        self.print_acceleration = 3000.0
+        self.retract_acceleration = 3000.0
+        self.travel_acceleration = 3000.0
+
+        # results (s)
+        self.move_time = 0.0
+        self.wait_time = 0.0
+
+        # buffered blocks: distance, acceleration, nominal speed, max. entry speed²
+        self._distance = []
+        self._acceleration = []
+        self._nominal = []
+        self._max_entry2 = []
+        # entry speed² of the first buffered block (limited by the already finished blocks)
+        self._entry2 = math.inf
+        # last block: direction (unit vector XYZE), nominal speed
+        self._last_direction = _STOPPED
+        self._last_nominal = math.inf
+
+    def set_max_feedrate(self, axis, value):
+        # M203 (mm/s)
+        if axis in self.max_feedrate:
+            self.max_feedrate[axis] = value
+            self._max_feedrate = tuple(self.max_feedrate.values())
+
+    def set_max_acceleration(self, axis, value):
+        # M201 (mm/s²)
+        if axis in self.max_acceleration:
+            self.max_acceleration[axis] = value
+            self._max_acceleration = tuple(self.max_acceleration.values())
+
+    def set_default_acceleration(self, letter, value):
+        # M204 (mm/s²): P: printing, R: retract, T: travel, S: printing and travel (legacy)
+        if letter in ("P", "S"):
+            self.print_acceleration = value
+        if letter in ("T", "S"):
+            self.travel_acceleration = value
+        if letter == "R":
+            self.retract_acceleration = value
+
+    def set_jerk(self, axis, value):
+        # M205 (mm/s)
+        if axis in self.jerk:
+            self.jerk[axis] = value
+            self._jerk = tuple(self.jerk.values())
+
+    def get_state(self):
+        # the limits changed by the gcode (M201/M203/M204/M205) and the time so far,
+        # serializable (see: PrinterModel.get_state), the motion stops here
+        self.flush()
+        return {
+            "time": [self.move_time, self.wait_time],
+            "max_feedrate": dict(self.max_feedrate),
+            "max_acceleration": dict(self.max_acceleration),
+            "jerk": dict(self.jerk),
+            "acceleration": [self.print_acceleration, self.retract_acceleration, self.travel_acceleration],
+        }
+
+    def set_state(self, state):
+        self.move_time, self.wait_time = state["time"]
+        for axis, value in state["max_feedrate"].items():
+            self.set_max_feedrate(axis, value)
+        for axis, value in state["max_acceleration"].items():
+            self.set_max_acceleration(axis, value)
+        for axis, value in state["jerk"].items():
+            self.set_jerk(axis, value)
+        self.print_acceleration, self.retract_acceleration, self.travel_acceleration = state["acceleration"]
+
+    def dwell(self, seconds):
+        self.flush()
+        self.wait_time += seconds
+
+    def add_move(self, dx, dy, dz, de, feedrate, length=None):
+        # relative move (mm) and feedrate (mm/min), NaN: not known (yet) -> no movement on this axis
+        # length: path length of a curved move (G2/G3 arc), its direction is taken as the straight one
+        # hint: called for each move, _axes_limited and _junction_speed are inlined here
+        dx = 0.0 if dx != dx else dx
+        dy = 0.0 if dy != dy else dy
+        dz = 0.0 if dz != dz else dz
+        de = 0.0 if de != de else de
+        straight = math.sqrt(dx * dx + dy * dy + dz * dz)
+        distance = straight if length is None else length
+        if distance > 0:
+            acceleration = self.print_acceleration if de != 0 else self.travel_acceleration
+        elif de != 0:
+            distance = abs(de)
+            acceleration = self.retract_acceleration
+        else:
+            return
+
+        if feedrate != feedrate:
+            feedrate = self.default_feedrate
+        if straight > 0:
+            direction_x = dx / straight
+            direction_y = dy / straight
+            direction_z = dz / straight
+        else:
+            # retract or a full circle (no straight XYZ movement)
+            direction_x = direction_y = direction_z = 0.0
+        direction_e = de / distance
+        part_x = abs(direction_x)
+        part_y = abs(direction_y)
+        part_z = abs(direction_z)
+        part_e = abs(direction_e)
+
+        # nominal speed and acceleration, limited per axis
+        nominal = feedrate / 60
+        limit_x, limit_y, limit_z, limit_e = self._max_feedrate
+        nominal = limit_x / part_x if nominal * part_x > limit_x else nominal
+        nominal = limit_y / part_y if nominal * part_y > limit_y else nominal
+        nominal = limit_z / part_z if nominal * part_z > limit_z else nominal
+        nominal = limit_e / part_e if nominal * part_e > limit_e else nominal
+        limit_x, limit_y, limit_z, limit_e = self._max_acceleration
+        acceleration = limit_x / part_x if acceleration * part_x > limit_x else acceleration
+        acceleration = limit_y / part_y if acceleration * part_y > limit_y else acceleration
+        acceleration = limit_z / part_z if acceleration * part_z > limit_z else acceleration
+        acceleration = limit_e / part_e if acceleration * part_e > limit_e else acceleration
+
+        # junction speed: the speed change of each axis limited to its jerk
+        junction = nominal if nominal < self._last_nominal else self._last_nominal
+        last_x, last_y, last_z, last_e = self._last_direction
+        change_x = abs(last_x - direction_x)
+        change_y = abs(last_y - direction_y)
+        change_z = abs(last_z - direction_z)
+        change_e = abs(last_e - direction_e)
+        limit_x, limit_y, limit_z, limit_e = self._jerk
+        junction = limit_x / change_x if junction * change_x > limit_x else junction
+        junction = limit_y / change_y if junction * change_y > limit_y else junction
+        junction = limit_z / change_z if junction * change_z > limit_z else junction
+        junction = limit_e / change_e if junction * change_e > limit_e else junction
+
+        self._distance.append(distance)
+        self._acceleration.append(acceleration)
+        self._nominal.append(nominal)
+        self._max_entry2.append(junction * junction)
+        self._last_direction = (direction_x, direction_y, direction_z, direction_e)
+        self._last_nominal = nominal
+
+        if len(self._distance) >= _CHUNK_SIZE:
+            self._plan(False)
+
+    def flush(self):
+        # motion stops: plan and finish all buffered blocks
+        if self._distance:
+            self._plan(True)
+        self._entry2 = math.inf
+        self._last_direction = _STOPPED
+        self._last_nominal = math.inf
+
+    def elapsed_time(self):
+        # time (s) up to the end of the last move, including the waits and the still buffered blocks
+        # the buffered blocks are planned as if the motion stopped after the last one, without finishing them
+        # (later moves may still speed them up a bit, see: ThermalModel)
+        if not self._distance:
+            return self.move_time + self.wait_time
+        buffered = (self._distance, self._acceleration, self._nominal, self._max_entry2, self.move_time, self._entry2)
+        self._distance, self._acceleration, self._nominal, self._max_entry2 = (
+            list(self._distance), list(self._acceleration), list(self._nominal), list(self._max_entry2))
+        self._plan(True)
+        time = self.move_time + self.wait_time
+        self._distance, self._acceleration, self._nominal, self._max_entry2, self.move_time, self._entry2 = buffered
+        return time
+
+    def get_time(self):
+        self.flush()
+        return self.move_time + self.wait_time
+
+    def _plan(self, finish):
+        distance = self._distance
+        acceleration = self._acceleration
+        nominal = self._nominal
+        max_entry2 = self._max_entry2
+        count = len(distance)
+        # assume the motion stops after the last buffered block
+        stop = _junction_speed(self._last_nominal, _STOPPED, self._last_direction, self._jerk)
+        exit2 = stop * stop
+
+        # reverse pass: max. entry speeds to be able to decelerate until the end of the buffer
+        # the last block whose entry speed is only limited by its junction isn't affected by any later block
+        # -> all blocks before it can be finished
+        entry2 = [0.0] * count
+        next_entry2 = exit2
+        cut = count if finish else 0
+        for index in range(count - 1, -1, -1):
+            reachable2 = next_entry2 + 2 * acceleration[index] * distance[index]
+            if max_entry2[index] <= reachable2:
+                next_entry2 = max_entry2[index]
+                if cut == 0:
+                    cut = index
+            else:
+                next_entry2 = reachable2
+            entry2[index] = next_entry2
+        if cut == 0:
+            # (very unlikely) no such block: finish half of the buffer, slightly underestimated speeds
+            cut = count // 2
+
+        # forward pass: accelerate as far as possible
+        current2 = min(self._entry2, entry2[0])
+        move_time = 0.0
+        for index in range(cut):
+            block_acceleration = acceleration[index]
+            block_distance = distance[index]
+            following2 = entry2[index + 1] if index + 1 < count else exit2
+            block_exit2 = min(following2, current2 + 2 * block_acceleration * block_distance)
+            move_time += _block_time(block_distance, block_acceleration, nominal[index],
+                                     math.sqrt(current2), math.sqrt(block_exit2))
+            current2 = block_exit2
+
+        self.move_time += move_time
+        self._entry2 = current2
+        del distance[:cut]
+        del acceleration[:cut]
+        del nominal[:cut]
+        del max_entry2[:cut]
@@ -0,0 +1,138 @@
+from PrintTimeEstimator import PrintTimeEstimator
+import pytest
+pytestmark = pytest.mark.unittests
+
+
+def create_estimator(acceleration, jerk):
+    estimator = PrintTimeEstimator()
+    estimator.set_default_acceleration("S", acceleration)
+    for axis in "XYZE":
+        estimator.set_jerk(axis, jerk)
+    return estimator
+
+
+def test_get_time_no_moves_zero():
+    # arrange
+    estimator = PrintTimeEstimator()
+
+    # act
+    time = estimator.get_time()
+
+    # assert
+    assert(time) == 0
+
+
+def test_add_move_trapezoid():
+    # arrange
+    estimator = create_estimator(1000, 10)
+
+    # act
+    # 100 mm at 100 mm/s: start/stop at 10 mm/s (jerk), accelerate/decelerate 0.09 s (4.95 mm each)
+    estimator.add_move(100, 0, 0, 0, 6000)
+
+    # assert
+    assert(estimator.get_time()) == pytest.approx(0.09 + 90.1 / 100 + 0.09)
+
+
+def test_add_move_triangle():
+    # arrange
+    estimator = create_estimator(1000, 0)
+
+    # act
+    # 10 mm: the nominal speed isn't reached, peak speed 100 mm/s after 5 mm
+    estimator.add_move(10, 0, 0, 0, 60000)
+
+    # assert
+    assert(estimator.get_time()) == pytest.approx(0.2)
+
+
+def test_add_move_length_of_curved_move():
+    # arrange
+    estimator = create_estimator(1000, 10)
+
+    # act
+    # an arc of 100 mm from start to end point in 20 mm
+    estimator.add_move(20, 0, 0, 0, 6000, 100)
+
+    # assert
+    assert(estimator.get_time()) == pytest.approx(0.09 + 90.1 / 100 + 0.09)
+
+
+def test_add_move_length_of_full_circle():
+    # arrange
+    estimator = create_estimator(1000, 10)
+
+    # act
+    estimator.add_move(0, 0, 0, 1, 6000, 100)
+
+    # assert
+    # no straight XYZ direction: only the extruder jerk limits the start/stop speed (not reached)
+    assert(estimator.get_time()) == pytest.approx(100 / 100)
+
+
+def test_add_move_max_feedrate_z_limited():
+    # arrange
+    estimator = create_estimator(1000, 0)
+    estimator.set_max_feedrate("Z", 2)
+
+    # act
+    estimator.add_move(0, 0, 100, 0, 6000)
+
+    # assert
+    # Z max. acceleration 100 mm/s²: accelerate 0.02 s (0.02 mm) to 2 mm/s
+    assert(estimator.get_time()) == pytest.approx(0.02 + 99.96 / 2 + 0.02)
+
+
+def test_add_move_unknown_position_ignored():
+    # arrange
+    estimator = create_estimator(1000, 10)
+
+    # act
+    estimator.add_move(float("nan"), 0, 0, 0, 6000)
+
+    # assert
+    assert(estimator.get_time()) == 0
+
+
+def test_add_move_collinear_moves_same_as_single_move():
+    # arrange
+    single = create_estimator(1000, 10)
+    split = create_estimator(1000, 10)
+
+    # act
+    single.add_move(100, 100, 0, 0, 6000)
+    # more moves than planned in a single chunk
+    for index in range(5000):
+        split.add_move(0.02, 0.02, 0, 0, 6000)
+
+    # assert
+    assert(split.get_time()) == pytest.approx(single.get_time())
+
+
+def test_add_move_corner_slower_than_straight():
+    # arrange
+    straight = create_estimator(1000, 10)
+    corner = create_estimator(1000, 10)
+
+    # act
+    straight.add_move(50, 0, 0, 0, 6000)
+    straight.add_move(50, 0, 0, 0, 6000)
+    corner.add_move(50, 0, 0, 0, 6000)
+    corner.add_move(0, 50, 0, 0, 6000)
+
+    # assert
+    assert(corner.get_time()) > straight.get_time()
+
+
+def test_dwell_stops_motion():
+    # arrange
+    estimator = create_estimator(1000, 10)
+
+    # act
+    estimator.add_move(50, 0, 0, 0, 6000)
+    estimator.dwell(2)
+    estimator.add_move(50, 0, 0, 0, 6000)
+
+    # assert
+    assert(estimator.wait_time) == 2
+    assert(estimator.get_time()) == pytest.approx(2 + 2 * (0.09 + 40.1 / 100 + 0.09))
@@ -1,13 +1,29 @@
 # very simple 3d printer model
 # (many details not included, e.g. dual extruder)
 
+from printer_model.ArcGeometry import arc_geometry
+from printer_model.MoveStatistics import MoveStatistics
 from printer_model.PrinterModelValue import PrinterModelValue
+from printer_model.PrinterModelValue import format_value
+from printer_model.PrintTimeEstimator import PrintTimeEstimator
+from printer_model.ThermalModel import ThermalModel
+import math
+
+# the PrinterModelValue attributes
+_VALUE_NAMES = ("bed_temp", "extruder_temp", "fan", "extruder_physical", "extruder_logical",
+                "position_x", "position_y", "position_z", "print_position_x", "print_position_y", "print_position_z")
 
 
 class PrinterModel:
+    __slots__ = ("unit", "bed_temp", "extruder_temp", "fan", "feedrate", "positioning_mode",
+                 "extruder_move_mode", "extruder_physical", "extruder_logical",
+                 "position_x", "position_y", "position_z",
+                 "print_position_x", "print_position_y", "print_position_z", "time_estimator",
+                 "thermal_model", "move_statistics", "arc_segmentation")
 
     def __init__(self):
-        # hint: All values are stored as strings
+        # hint: All values are stored as floats, NaN if not known (yet)
+        # parameters not given in a gcode command are passed as None
 
         self.unit = "mm"
         # temperatures & fan
@@ -15,14 +31,14 @@ class PrinterModel:
         self.extruder_temp = PrinterModelValue()
         self.fan = PrinterModelValue()
         # general movement
-        self.feedrate = "?"
+        self.feedrate = math.nan
         self.positioning_mode = "absolute"
         # extruder
         self.extruder_move_mode = "absolute"
         self.extruder_physical = PrinterModelValue()
-        self.extruder_physical.set("0")
+        self.extruder_physical.set(0.0)
         self.extruder_logical = PrinterModelValue()
-        self.extruder_logical.set("0")
+        self.extruder_logical.set(0.0)
         # XYZ current position
         self.position_x = PrinterModelValue()
         self.position_y = PrinterModelValue()
@@ -31,15 +47,79 @@ class PrinterModel:
         self.print_position_x = PrinterModelValue()
         self.print_position_y = PrinterModelValue()
         self.print_position_z = PrinterModelValue()
+        # print time, from the moves, dwells and heat-up waits
+        self.time_estimator = PrintTimeEstimator()
+        # heater energy, along the print time
+        self.thermal_model = ThermalModel(self.time_estimator)
+        # path lengths and volumetric flow
+        self.move_statistics = MoveStatistics()
+        # G2/G3 arcs: None -> a single move of the arc length for the print time,
+        # ArcSegmentation -> its straight segments, like the firmware does it
+        self.arc_segmentation = None
+
+    def get_state(self):
+        # serializable (JSON) state, to continue in the middle of a file (see: GCodeIndex)
+        # the motion is taken as stopped at this point
+        return {
+            "values": {name: getattr(self, name).get_state() for name in _VALUE_NAMES},
+            "feedrate": self.feedrate,
+            "positioning_mode": self.positioning_mode,
+            "extruder_move_mode": self.extruder_move_mode,
+            "time_estimator": self.time_estimator.get_state(),
+            "thermal_model": self.thermal_model.get_state(),
+            "move_statistics": self.move_statistics.get_state(),
+        }
+
+    def set_state(self, state):
+        for name, value_state in state["values"].items():
+            getattr(self, name).set_state(value_state)
+        self.feedrate = state["feedrate"]
+        self.positioning_mode = state["positioning_mode"]
+        self.extruder_move_mode = state["extruder_move_mode"]
+        self.time_estimator.set_state(state["time_estimator"])
+        self.thermal_model.set_state(state["thermal_model"])
+        self.move_statistics.set_state(state["move_statistics"])
+
+    def reset_ranges(self):
+        # min/max values, the extruded length, time and energy from now on (e.g. the summary of some layers)
+        for name in _VALUE_NAMES:
+            getattr(self, name).reset_range()
+        # the last print position is from before the range
+        for value in (self.print_position_x, self.print_position_y, self.print_position_z):
+            value.set_state([value.get(), math.nan, math.nan])
+        self.extruder_physical.set_state([0.0, 0.0, 0.0])
+        # the moves still buffered by the planner are before the range
+        time_estimator = self.time_estimator
+        time_estimator.move_time -= time_estimator.elapsed_time() - time_estimator.wait_time
+        time_estimator.wait_time = 0.0
+        self.thermal_model.reset_energy()
+        self.move_statistics.reset()
 
     def set_fan(self, value):
         self.fan.set(value)
+        self.thermal_model.set_fan(value)
 
     def set_bed_temperature(self, value):
         self.bed_temp.set(value)
+        self.thermal_model.set_target("bed", value)
+
+    def wait_bed_temperature(self, value):
+        # hint: M190 doesn't change the bed temperature values (only M140 does)
+        self.thermal_model.wait_target("bed", value)
 
     def set_extruder_temperature(self, value):
         self.extruder_temp.set(value)
+        self.thermal_model.set_target("extruder", value)
+
+    def wait_extruder_temperature(self, value):
+        self.extruder_temp.set(value)
+        self.thermal_model.wait_target("extruder", value)
+
+    def dwell(self, seconds):
+        self.time_estimator.dwell(seconds)
+
+    def dwell_milliseconds(self, milliseconds):
+        self.time_estimator.dwell(milliseconds / 1000)
 
     def set_extruder_move_mode(self, value):
         if value != "relative" and value != "absolute":
@@ -61,78 +141,109 @@ class PrinterModel:
         self.feedrate = value
 
     def home(self, x, y):
-        z = ""
+        z = None
 
         # if no specific X or Y given, home all three axis
-        if x == "" and y == "":
-            x = "0"
-            y = "0"
-            z = "0"
+        if x is None and y is None:
+            x = 0.0
+            y = 0.0
+            z = 0.0
 
-        if x != "":
+        if x is not None:
             self._home_x(x)
-        if y != "":
+        if y is not None:
             self._home_y(y)
-        if z != "":
+        if z is not None:
             self._home_z()
 
     def _home_x(self, value):
-        if value != "0":
-            raise Exception("homeX: Unexpected value: " + value)
+        if value != 0:
+            raise Exception("homeX: Unexpected value: " + format_value(value))
         # TODO: Is the positioning mode important here?
-        self.position_x.set(value)
+        self.position_x.set(0.0)
 
     def _home_y(self, value):
-        if value != "0":
-            raise Exception("homeY: Unexpected value: " + value)
+        if value != 0:
+            raise Exception("homeY: Unexpected value: " + format_value(value))
         # TODO: Is the positioning mode important here?
-        self.position_y.set(value)
+        self.position_y.set(0.0)
 
     def _home_z(self):
         # TODO: Is the positioning mode important here?
-        self.position_z.set("0")
+        self.position_z.set(0.0)
+
+    def _get_position(self):
+        return self.position_x.get(), self.position_y.get(), self.position_z.get(), self.extruder_physical.get()
+
+    def _add_move(self, start, length=None):
+        # pass the move from start to the current position to the time estimation and the move statistics
+        x, y, z, e = start
+        dx = self.position_x.get() - x
+        dy = self.position_y.get() - y
+        dz = self.position_z.get() - z
+        de = self.extruder_physical.get() - e
+        self.time_estimator.add_move(dx, dy, dz, de, self.feedrate, length)
+        self.move_statistics.add_move(dx, dy, dz, de, self.feedrate, length)
 
     def print_linear(self, x, y, z, e):
-        # TODO: if distance calculation will be added, this must be improved
-        # if x != "" and y != "":
-        #    self._printX(x)
-        #    self._printY(y)
-        # else:
-        if x != "":
+        start = self._get_position()
+        # the axes are set one after the other, the move (path length, time) is taken from the start to the end
+        # position (see: _add_move)
+        if x is not None:
             self._print_x(x)
-        if y != "":
+        if y is not None:
             self._print_y(y)
-        if z != "":
+        if z is not None:
             self._print_z(z)
-        if e != "":
+        if e is not None:
             self._print_e(e)
+        self._add_move(start)
 
-    def print_cw(self, x, y, i, j, e):
-        # TODO: if distance calculation will be added, this must be improved
-        # if x != "" and y != "":
-        #    self._printX(x)
-        #    self._printY(y)
-        # else:
-        if x != "":
-            self._print_x(x)
-        if y != "":
-            self._print_y(y)
-        if e != "":
-            self._print_e(e)
+    def print_cw(self, x, y, i, j, r, e):
+        self._print_arc(x, y, i, j, r, e, True)
 
-    def print_ccw(self, x, y, i, j, e):
-        # TODO: if distance calculation will be added, this must be improved
-        # if x != "" and y != "":
-        #    self._printX(x)
-        #    self._printY(y)
-        # else:
-        if x != "":
+    def print_ccw(self, x, y, i, j, r, e):
+        self._print_arc(x, y, i, j, r, e, False)
+
+    def _print_arc(self, x, y, i, j, r, e, clockwise):
+        start = self._get_position()
+        if x is not None:
             self._print_x(x)
-        if y != "":
+        if y is not None:
             self._print_y(y)
-        if e != "":
+        if e is not None:
             self._print_e(e)
 
+        end_x = self.position_x.get()
+        end_y = self.position_y.get()
+        geometry = arc_geometry(start[0], start[1], end_x, end_y, i, j, r, clockwise)
+        if geometry is None:
+            # no arc (e.g. no I/J/R or an unknown start point): straight to the end point
+            self._add_move(start)
+            return
+
+        # the arc bulges past its start and end point (also a full circle without X/Y)
+        length, x_min, x_max, y_min, y_max = geometry
+        self._print_z_physical(self.position_z.get())
+        for value, low, high, end in ((self.print_position_x, x_min, x_max, end_x),
+                                      (self.print_position_y, y_min, y_max, end_y)):
+            value.set(low)
+            value.set(high)
+            value.set(end)
+
+        if self.arc_segmentation is None:
+            self._add_move(start, length)
+            return
+        # the segments, with the same part of the extrusion
+        start_x, start_y, start_z, start_e = start
+        self.move_statistics.add_move(end_x - start_x, end_y - start_y, 0.0, self.extruder_physical.get() - start_e,
+                                      self.feedrate, length)
+        points = self.arc_segmentation.linearize(start_x, start_y, end_x, end_y, i, j, r, clockwise)
+        segment_e = (self.extruder_physical.get() - start_e) / len(points)
+        for point_x, point_y in points:
+            self.time_estimator.add_move(point_x - start_x, point_y - start_y, 0.0, segment_e, self.feedrate)
+            start_x, start_y = point_x, point_y
+
     def _print_x(self, value):
         # G1 print commands will usually not include the z direction
         # call printZPhysical here to remember the Z min/max values correctly
@@ -168,6 +279,9 @@ class PrinterModel:
     def _print_z_physical(self, value):
         # remember the start point
         self.print_position_z.set(self.position_z.get())
+        if value == self.position_z.get():
+            # no Z move (e.g. G1 with X/Y only): the start point is the end point
+            return
 
         self.position_z.set(value)
 
@@ -179,40 +293,37 @@ class PrinterModel:
             case "absolute":
                 self._print_z_physical(value)
             case "relative":
-                if self.position_z.get() == "?":
+                if math.isnan(self.position_z.get()):
                     raise Exception("printZ: relative Z move without initial positioning")
 
-                new_position_z = str(float(self.position_z.get()) + float(value))
-                self._print_z_physical(str(new_position_z))
+                self._print_z_physical(self.position_z.get() + value)
             case _:
                 raise Exception("printZ: Positioning mode unexpected: " + self.positioning_mode)
 
     def _print_e(self, value):
         match self.extruder_move_mode:
             case "absolute":
-                new_physical = float(self.extruder_physical.get()) + float(value) - float(self.extruder_logical.get())
-                new_logical = float(value)
+                new_physical = self.extruder_physical.get() + value - self.extruder_logical.get()
+                new_logical = value
             case "relative":
-                new_physical = float(self.extruder_physical.get()) + float(value)
-                new_logical = float(self.extruder_logical.get()) + float(value)
+                new_physical = self.extruder_physical.get() + value
+                new_logical = self.extruder_logical.get() + value
             case _:
                 raise Exception("extruder move mode not implemented: " + self.extruder_move_mode)
 
-        self.extruder_physical.set(str(new_physical))
-        self.extruder_logical.set(str(new_logical))
+        self.extruder_physical.set(new_physical)
+        self.extruder_logical.set(new_logical)
 
     def move(self, x, y, z):
-        # TODO: if distance calculation will be added, this must be improved
-        # if x != "" and y != "":
-        #    self._moveX(x)
-        #    self._moveY(y)
-        # else:
-        if x != "":
+        start = self._get_position()
+        # like print_linear, the move is taken from the start to the end position
+        if x is not None:
             self._move_x(x)
-        if y != "":
+        if y is not None:
             self._move_y(y)
-        if z != "":
+        if z is not None:
             self._move_z(z)
+        self._add_move(start)
 
     def _move_x(self, value):
         match self.positioning_mode:
@@ -233,10 +344,9 @@ class PrinterModel:
             case "absolute":
                 self.position_z.set(value)
             case "relative":
-                if self.position_z.get() == "?":
+                if math.isnan(self.position_z.get()):
                     raise Exception("moveZ: relative Z move without initial positioning")
 
-                new_position_z = float(self.position_z.get()) + float(value)
-                self.position_z.set(str(new_position_z))
+                self.position_z.set(self.position_z.get() + value)
             case _:
                 raise Exception("moveZ: Positioning mode unexpected: " + self.positioning_mode)
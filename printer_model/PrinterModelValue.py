@@ -1,23 +1,35 @@
 # Keep a single float value with min and max.
-# The value is kept as a string, with an initial "?" to distinguish this state from "real" values.
+# The value is kept as a float, with an initial NaN to distinguish this state from "real" values.
+# (formatting to text is only done for the output, see: format_value)
+
+import math
+
+
+def format_value(value):
+    # the number as text: "?" if not known yet, an integer without decimal point (2100.0 -> "2100")
+    if math.isnan(value):
+        return "?"
+    if float(value).is_integer():
+        return str(int(value))
+    return str(value)
+
+
 class PrinterModelValue:
-    _value_current = "?"
-    _value_max = "?"
-    _value_min = "?"
+    __slots__ = ("_value_current", "_value_max", "_value_min")
+
+    def __init__(self):
+        self._value_current = math.nan
+        self._value_max = math.nan
+        self._value_min = math.nan
 
     def set(self, value):
         self._value_current = value
 
-        if self._value_max == "?":
+        # hint: comparisons with NaN are always False, (x != x) is True only for NaN
+        if value > self._value_max or self._value_max != self._value_max:
             self._value_max = value
 
-        if self._value_min == "?":
-            self._value_min = value
-
-        if float(value) > float(self._value_max):
-            self._value_max = value
-
-        if float(value) < float(self._value_min):
+        if value < self._value_min or self._value_min != self._value_min:
             self._value_min = value
 
     def get(self):
@@ -28,3 +40,15 @@ class PrinterModelValue:
 
     def get_min(self):
         return self._value_min
+
+    def get_state(self):
+        # serializable state (see: PrinterModel.get_state)
+        return [self._value_current, self._value_min, self._value_max]
+
+    def set_state(self, state):
+        self._value_current, self._value_min, self._value_max = state
+
+    def reset_range(self):
+        # min/max from now on, starting with the current value
+        self._value_min = self._value_current
+        self._value_max = self._value_current
@@ -1,4 +1,6 @@
 from PrinterModelValue import PrinterModelValue
+from PrinterModelValue import format_value
+import math
 import pytest
 pytestmark = pytest.mark.unittests
 
@@ -11,90 +13,153 @@ def test_get_initial_question_mark():
     value = printer_value.get()
 
     # assert
-    assert(value) == "?"
+    assert(math.isnan(value))
 
 
 def test_set_value_ok():
     # arrange
     printer_value = PrinterModelValue()
-    assert(printer_value.get()) == "?"
+    assert(math.isnan(printer_value.get()))
 
     # act / assert
-    printer_value.set("100")
-    assert(printer_value.get()) == "100"
+    printer_value.set(100)
+    assert(printer_value.get()) == 100
 
 
 def test_set_max_initial_ok():
     # arrange
     printer_value = PrinterModelValue()
-    assert(printer_value.get_max()) == "?"
+    assert(math.isnan(printer_value.get_max()))
 
     # act
-    printer_value.set("100")
+    printer_value.set(100)
 
     # assert
-    assert(printer_value.get_max()) == "100"
+    assert(printer_value.get_max()) == 100
 
 
 def test_set_max_second_time_ok():
     # arrange
     printer_value = PrinterModelValue()
-    printer_value.set("100")
-    assert(printer_value.get_max()) == "100"
+    printer_value.set(100)
+    assert(printer_value.get_max()) == 100
 
     # act
-    printer_value.set("110")
+    printer_value.set(110)
 
     # assert
-    assert(printer_value.get_max()) == "110"
+    assert(printer_value.get_max()) == 110
 
 
 def test_set_max_kept_on_lower_value():
     # arrange
     printer_value = PrinterModelValue()
-    printer_value.set("100")
-    assert(printer_value.get_max()) == "100"
+    printer_value.set(100)
+    assert(printer_value.get_max()) == 100
 
     # act
-    printer_value.set("80")
+    printer_value.set(80)
 
     # assert
-    assert(printer_value.get_max()) == "100"
+    assert(printer_value.get_max()) == 100
 
 
 def test_set_min_initial_ok():
     # arrange
     printer_value = PrinterModelValue()
-    assert(printer_value.get_min()) == "?"
+    assert(math.isnan(printer_value.get_min()))
 
     # act
-    printer_value.set("100")
+    printer_value.set(100)
 
     # assert
-    assert(printer_value.get_min()) == "100"
+    assert(printer_value.get_min()) == 100
 
 
 def test_set_min_second_time_ok():
     # arrange
     printer_value = PrinterModelValue()
-    printer_value.set("100")
-    assert(printer_value.get_min()) == "100"
+    printer_value.set(100)
+    assert(printer_value.get_min()) == 100
 
     # act
-    printer_value.set("90")
+    printer_value.set(90)
 
     # assert
-    assert(printer_value.get_min()) == "90"
+    assert(printer_value.get_min()) == 90
 
 
 def test_set_min_kept_on_higher_value():
     # arrange
     printer_value = PrinterModelValue()
-    printer_value.set("100")
-    assert(printer_value.get_min()) == "100"
+    printer_value.set(100)
+    assert(printer_value.get_min()) == 100
 
     # act
-    printer_value.set("120")
+    printer_value.set(120)
 
     # assert
-    assert(printer_value.get_min()) == "100"
+    assert(printer_value.get_min()) == 100
+
+
+def test_set_unknown_value_keeps_min_max():
+    # arrange
+    printer_value = PrinterModelValue()
+    printer_value.set(100.0)
+
+    # act
+    printer_value.set(math.nan)
+
+    # assert
+    assert(math.isnan(printer_value.get()))
+    assert(printer_value.get_min()) == 100
+    assert(printer_value.get_max()) == 100
+
+
+format_value_testdata = [
+    (math.nan, "?"),
+    (200.0, "200"),
+    (-0.8, "-0.8"),
+    (77.699, "77.699"),
+    (123456.7, "123456.7"),
+]
+
+
+@pytest.mark.parametrize("value,expected_text", format_value_testdata)
+def test_format_value(value, expected_text):
+    # act
+    text = format_value(value)
+
+    # assert
+    assert(text) == expected_text
+
+
+def test_set_state_same_values():
+    # arrange
+    printer_value = PrinterModelValue()
+    printer_value.set(100.0)
+    printer_value.set(50.0)
+    restored_value = PrinterModelValue()
+
+    # act
+    restored_value.set_state(printer_value.get_state())
+
+    # assert
+    assert(restored_value.get()) == 50
+    assert(restored_value.get_min()) == 50
+    assert(restored_value.get_max()) == 100
+
+
+def test_reset_range_min_max_current():
+    # arrange
+    printer_value = PrinterModelValue()
+    printer_value.set(100.0)
+    printer_value.set(50.0)
+
+    # act
+    printer_value.reset_range()
+    printer_value.set(60.0)
+
+    # assert
+    assert(printer_value.get_min()) == 50
+    assert(printer_value.get_max()) == 60
@@ -1,4 +1,5 @@
 from PrinterModel import PrinterModel
+import math
 import pytest
 pytestmark = pytest.mark.unittests
 
@@ -9,7 +10,7 @@ def test_defaults():
 
     # assert
     assert(printer.positioning_mode == "absolute")
-    assert(printer.feedrate == "?")
+    assert(math.isnan(printer.feedrate))
 
 
 def test_set_positioning_mode_valid_input_ok():
@@ -47,42 +48,42 @@ def test_set_feedrate():
     printer = PrinterModel()
 
     # act
-    printer.set_feedrate("100")
+    printer.set_feedrate(100)
 
     # assert
-    assert(printer.feedrate == "100")
+    assert(printer.feedrate == 100)
 
 
 def test_home_no_xyz_position_becomes_0():
     # arrange
     printer = PrinterModel()
-    printer._move_x("1")
-    printer._move_y("2")
-    printer._move_z("3")
+    printer._move_x(1)
+    printer._move_y(2)
+    printer._move_z(3)
 
     # act
-    printer.home("", "")
+    printer.home(None, None)
 
     # assert
-    assert(printer.position_x.get() == "0")
-    assert(printer.position_y.get() == "0")
-    assert(printer.position_z.get() == "0")
+    assert(printer.position_x.get() == 0)
+    assert(printer.position_y.get() == 0)
+    assert(printer.position_z.get() == 0)
 
 
 def test_home_xy_unchanged_z():
     # arrange
     printer = PrinterModel()
-    printer._move_x("1")
-    printer._move_y("2")
-    printer._move_z("3")
+    printer._move_x(1)
+    printer._move_y(2)
+    printer._move_z(3)
 
     # act
-    printer.home("0", "0")
+    printer.home(0, 0)
 
     # assert
-    assert(printer.position_x.get() == "0")
-    assert(printer.position_y.get() == "0")
-    assert(printer.position_z.get() == "3")
+    assert(printer.position_x.get() == 0)
+    assert(printer.position_y.get() == 0)
+    assert(printer.position_z.get() == 3)
 
 
 def test_home_x_not0_raises_exception():
@@ -91,7 +92,7 @@ def test_home_x_not0_raises_exception():
 
     # act / assert
     with pytest.raises(Exception) as e_info:
-        printer.home("1", "0")
+        printer.home(1, 0)
 
     # assert
     exception_msg = e_info.value.args[0]
@@ -104,7 +105,7 @@ def test_home_y_not0_raises_exception():
 
     # act / assert
     with pytest.raises(Exception) as e_info:
-        printer.home("0", "1")
+        printer.home(0, 1)
 
     # assert
     exception_msg = e_info.value.args[0]
@@ -116,12 +117,12 @@ def test_move_all_directions_set_position_ok():
     printer = PrinterModel()
 
     # act
-    printer.move("1", "2", "3")
+    printer.move(1, 2, 3)
 
     # assert
-    assert(printer.position_x.get() == "1")
-    assert(printer.position_y.get() == "2")
-    assert(printer.position_z.get() == "3")
+    assert(printer.position_x.get() == 1)
+    assert(printer.position_y.get() == 2)
+    assert(printer.position_z.get() == 3)
 
 
 def test_move_x_in_relative_mode_raises_exception():
@@ -131,7 +132,7 @@ def test_move_x_in_relative_mode_raises_exception():
 
     # act
     with pytest.raises(Exception) as e_info:
-        printer.move("1", "", "")
+        printer.move(1, None, None)
 
     # assert
     exception_msg = e_info.value.args[0]
@@ -145,7 +146,7 @@ def test_move_y_in_relative_mode_raises_exception():
 
     # act
     with pytest.raises(Exception) as e_info:
-        printer.move("", "1", "")
+        printer.move(None, 1, None)
 
     # assert
     exception_msg = e_info.value.args[0]
@@ -159,7 +160,7 @@ def test_move_z_in_relative_mode_without_initial_z_raises_exception():
 
     # act
     with pytest.raises(Exception) as e_info:
-        printer.move("", "", "1")
+        printer.move(None, None, 1)
 
     # assert
     exception_msg = e_info.value.args[0]
@@ -169,25 +170,25 @@ def test_move_z_in_relative_mode_without_initial_z_raises_exception():
 def test_move_z_in_relative_mode_with_initial_z_z_position_ok():
     # arrange
     printer = PrinterModel()
-    printer.home("", "")
+    printer.home(None, None)
     printer.set_positioning_mode("relative")
 
     # act
-    printer.move("", "", "1")
+    printer.move(None, None, 1)
 
     # assert
-    assert(printer.position_z.get() == "1.0")
+    assert(printer.position_z.get() == 1.0)
 
 
 def test_move_z_in_invalid_position_mode_raises_exception():
     # arrange
     printer = PrinterModel()
-    printer.home("", "")
+    printer.home(None, None)
     printer.positioning_mode = "invalid"
 
     # act
     with pytest.raises(Exception) as e_info:
-        printer.move("", "", "1")
+        printer.move(None, None, 1)
 
     # assert
     exception_msg = e_info.value.args[0]
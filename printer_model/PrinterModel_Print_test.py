@@ -1,4 +1,6 @@
 from PrinterModel import PrinterModel
+from ArcGeometry import ArcSegmentation
+import math
 import pytest
 pytestmark = pytest.mark.unittests
 
@@ -7,45 +9,45 @@ def test_print_x_absolute_mode_x_positions_ok():
     # arrange
     printer = PrinterModel()
     printer.set_positioning_mode("absolute")
-    printer.home("", "")
-    printer._move_x("1")
+    printer.home(None, None)
+    printer._move_x(1)
 
     # act
-    printer._print_x("2")
+    printer._print_x(2)
 
     # assert
-    assert(printer.position_x.get()) == "2"
-    assert(printer.position_x.get_min()) == "0"
-    assert(printer.position_x.get_max()) == "2"
-    assert(printer.print_position_x.get()) == "2"
-    assert(printer.print_position_x.get_min()) == "1"
-    assert(printer.print_position_x.get_max()) == "2"
+    assert(printer.position_x.get()) == 2
+    assert(printer.position_x.get_min()) == 0
+    assert(printer.position_x.get_max()) == 2
+    assert(printer.print_position_x.get()) == 2
+    assert(printer.print_position_x.get_min()) == 1
+    assert(printer.print_position_x.get_max()) == 2
 
 
 def test_print_x_absolute_mode_print_z_updated():
     # arrange
     printer = PrinterModel()
     printer.set_positioning_mode("absolute")
-    printer.home("", "")
-    printer._move_z("1")
-    assert(printer.print_position_z.get()) == "?"
+    printer.home(None, None)
+    printer._move_z(1)
+    assert(math.isnan(printer.print_position_z.get()))
 
     # act
-    printer._print_x("2")
+    printer._print_x(2)
 
     # assert
-    assert(printer.print_position_z.get()) == "1"
+    assert(printer.print_position_z.get()) == 1
 
 
 def test_print_x_relative_mode_raises_exception():
     # arrange
     printer = PrinterModel()
     printer.set_positioning_mode("relative")
-    printer.home("", "")
+    printer.home(None, None)
 
     # act
     with pytest.raises(Exception) as e_info:
-        printer._print_x("1")
+        printer._print_x(1)
 
     # assert
     exception_msg = e_info.value.args[0]
@@ -56,45 +58,45 @@ def test_print_y_absolute_mode_y_positions_ok():
     # arrange
     printer = PrinterModel()
     printer.set_positioning_mode("absolute")
-    printer.home("", "")
-    printer._move_y("1")
+    printer.home(None, None)
+    printer._move_y(1)
 
     # act
-    printer._print_y("2")
+    printer._print_y(2)
 
     # assert
-    assert(printer.position_y.get()) == "2"
-    assert(printer.position_y.get_min()) == "0"
-    assert(printer.position_y.get_max()) == "2"
-    assert(printer.print_position_y.get()) == "2"
-    assert(printer.print_position_y.get_min()) == "1"
-    assert(printer.print_position_y.get_max()) == "2"
+    assert(printer.position_y.get()) == 2
+    assert(printer.position_y.get_min()) == 0
+    assert(printer.position_y.get_max()) == 2
+    assert(printer.print_position_y.get()) == 2
+    assert(printer.print_position_y.get_min()) == 1
+    assert(printer.print_position_y.get_max()) == 2
 
 
 def test_print_y_absolute_mode_print_z_updated():
     # arrange
     printer = PrinterModel()
     printer.set_positioning_mode("absolute")
-    printer.home("", "")
-    printer._move_z("1")
-    assert(printer.print_position_z.get()) == "?"
+    printer.home(None, None)
+    printer._move_z(1)
+    assert(math.isnan(printer.print_position_z.get()))
 
     # act
-    printer._print_y("2")
+    printer._print_y(2)
 
     # assert
-    assert(printer.print_position_z.get()) == "1"
+    assert(printer.print_position_z.get()) == 1
 
 
 def test_print_y_relative_mode_raises_exception():
     # arrange
     printer = PrinterModel()
     printer.set_positioning_mode("relative")
-    printer.home("", "")
+    printer.home(None, None)
 
     # act
     with pytest.raises(Exception) as e_info:
-        printer._print_y("1")
+        printer._print_y(1)
 
     # assert
     exception_msg = e_info.value.args[0]
@@ -104,56 +106,56 @@ def test_print_y_relative_mode_raises_exception():
 def test_print_z_physical_positions_ok():
     # arrange
     printer = PrinterModel()
-    printer.home("", "")
-    printer._move_z("1")
+    printer.home(None, None)
+    printer._move_z(1)
 
     # act
-    printer._print_z_physical("2")
+    printer._print_z_physical(2)
 
     # assert
-    assert(printer.position_z.get()) == "2"
-    assert(printer.position_z.get_min()) == "0"
-    assert(printer.position_z.get_max()) == "2"
-    assert(printer.print_position_z.get()) == "2"
-    assert(printer.print_position_z.get_min()) == "1"
-    assert(printer.print_position_z.get_max()) == "2"
+    assert(printer.position_z.get()) == 2
+    assert(printer.position_z.get_min()) == 0
+    assert(printer.position_z.get_max()) == 2
+    assert(printer.print_position_z.get()) == 2
+    assert(printer.print_position_z.get_min()) == 1
+    assert(printer.print_position_z.get_max()) == 2
 
 
 def test_print_z_absolute_positions_ok():
     # arrange
     printer = PrinterModel()
-    printer.home("", "")
-    printer._move_z("1")
+    printer.home(None, None)
+    printer._move_z(1)
 
     # act
-    printer._print_z("2")
+    printer._print_z(2)
 
     # assert
-    assert(printer.position_z.get()) == "2"
-    assert(printer.position_z.get_min()) == "0"
-    assert(printer.position_z.get_max()) == "2"
-    assert(printer.print_position_z.get()) == "2"
-    assert(printer.print_position_z.get_min()) == "1"
-    assert(printer.print_position_z.get_max()) == "2"
+    assert(printer.position_z.get()) == 2
+    assert(printer.position_z.get_min()) == 0
+    assert(printer.position_z.get_max()) == 2
+    assert(printer.print_position_z.get()) == 2
+    assert(printer.print_position_z.get_min()) == 1
+    assert(printer.print_position_z.get_max()) == 2
 
 
 def test_print_z_relative_positions_ok():
     # arrange
     printer = PrinterModel()
-    printer.home("", "")
-    printer._move_z("1")
+    printer.home(None, None)
+    printer._move_z(1)
     printer.set_positioning_mode("relative")
 
     # act
-    printer._print_z("2")
+    printer._print_z(2)
 
     # assert
-    assert(printer.position_z.get()) == "3.0"
-    assert(printer.position_z.get_min()) == "0"
-    assert(printer.position_z.get_max()) == "3.0"
-    assert(printer.print_position_z.get()) == "3.0"
-    assert(printer.print_position_z.get_min()) == "1"
-    assert(printer.print_position_z.get_max()) == "3.0"
+    assert(printer.position_z.get()) == 3.0
+    assert(printer.position_z.get_min()) == 0
+    assert(printer.position_z.get_max()) == 3.0
+    assert(printer.print_position_z.get()) == 3.0
+    assert(printer.print_position_z.get_min()) == 1
+    assert(printer.print_position_z.get_max()) == 3.0
 
 
 def test_print_z_no_initial_position_in_relative_raises_exception():
@@ -163,7 +165,7 @@ def test_print_z_no_initial_position_in_relative_raises_exception():
 
     # act
     with pytest.raises(Exception) as e_info:
-        printer._print_z("1")
+        printer._print_z(1)
 
     # assert
     exception_msg = e_info.value.args[0]
@@ -177,7 +179,7 @@ def test_print_z_invalid_positioning_mode_raises_exception():
 
     # act
     with pytest.raises(Exception) as e_info:
-        printer._print_z("1")
+        printer._print_z(1)
 
     # assert
     exception_msg = e_info.value.args[0]
@@ -187,41 +189,156 @@ def test_print_z_invalid_positioning_mode_raises_exception():
 def test_print_linear():
     # arrange
     printer = PrinterModel()
-    printer.home("", "")
+    printer.home(None, None)
 
     # act
-    printer.print_linear("1", "2", "3", "4")
+    printer.print_linear(1, 2, 3, 4)
 
     # assert
-    assert(printer.position_x.get()) == "1"
-    assert(printer.position_y.get()) == "2"
-    assert(printer.position_z.get()) == "3"
-    assert(printer.extruder_physical.get()) == "4.0"
+    assert(printer.position_x.get()) == 1
+    assert(printer.position_y.get()) == 2
+    assert(printer.position_z.get()) == 3
+    assert(printer.extruder_physical.get()) == 4.0
 
 
 def test_print_cw():
     # arrange
     printer = PrinterModel()
-    printer.home("", "")
+    printer.home(None, None)
 
     # act
-    printer.print_cw("1", "2", "3", "4", "5")
+    printer.print_cw(1, 2, 3, 4, None, 5)
 
     # assert
-    assert(printer.position_x.get()) == "1"
-    assert(printer.position_y.get()) == "2"
-    assert(printer.extruder_physical.get()) == "5.0"
+    assert(printer.position_x.get()) == 1
+    assert(printer.position_y.get()) == 2
+    assert(printer.extruder_physical.get()) == 5.0
 
 
 def test_print_ccw():
     # arrange
     printer = PrinterModel()
-    printer.home("", "")
+    printer.home(None, None)
 
     # act
-    printer.print_ccw("1", "2", "3", "4", "5")
+    printer.print_ccw(1, 2, 3, 4, None, 5)
 
     # assert
-    assert(printer.position_x.get()) == "1"
-    assert(printer.position_y.get()) == "2"
-    assert(printer.extruder_physical.get()) == "5.0"
+    assert(printer.position_x.get()) == 1
+    assert(printer.position_y.get()) == 2
+    assert(printer.extruder_physical.get()) == 5.0
+
+
+def test_print_ccw_half_circle_print_position_bounding_box():
+    # arrange
+    printer = PrinterModel()
+    printer.home(None, None)
+    printer.move(10, 0, 0.2)
+
+    # act
+    printer.print_ccw(-10, 0, -10, 0, None, 1)
+
+    # assert
+    assert(printer.position_x.get()) == -10
+    assert(printer.position_y.get()) == 0
+    assert(printer.print_position_x.get()) == -10
+    assert(printer.print_position_x.get_min()) == -10
+    assert(printer.print_position_x.get_max()) == 10
+    assert(printer.print_position_y.get()) == 0
+    assert(printer.print_position_y.get_min()) == 0
+    assert(printer.print_position_y.get_max()) == 10
+    assert(printer.print_position_z.get_max()) == 0.2
+
+
+def test_print_cw_full_circle_without_x_y():
+    # arrange
+    printer = PrinterModel()
+    printer.home(None, None)
+    printer.move(10, 0, None)
+
+    # act
+    printer.print_cw(None, None, -5, 0, None, 1)
+
+    # assert
+    assert(printer.position_x.get()) == 10
+    assert(printer.print_position_x.get_min()) == 0
+    assert(printer.print_position_x.get_max()) == 10
+    assert(printer.print_position_y.get_min()) == -5
+    assert(printer.print_position_y.get_max()) == 5
+
+
+def test_print_cw_arc_length_time_estimated():
+    # arrange
+    printers = [PrinterModel(), PrinterModel()]
+    for printer in printers:
+        printer.home(None, None)
+        printer.set_feedrate(6000)
+        printer.move(10, 0, None)
+
+    # act
+    # half circle: 31.4 mm instead of the 20 mm chord, the same time as a straight move of this length
+    printers[0].print_cw(-10, 0, None, None, 10, 1)
+    printers[1].print_linear(10 - 10 * math.pi, None, None, 1)
+
+    # assert
+    assert(printers[0].time_estimator.get_time()) == pytest.approx(printers[1].time_estimator.get_time())
+    assert(printers[0].position_x.get()) == -10
+
+
+def test_print_ccw_arc_segmentation_time_estimated():
+    # arrange
+    printer = PrinterModel()
+    printer.home(None, None)
+    printer.set_feedrate(600)
+    printer.move(10, 0, None)
+    printer.arc_segmentation = ArcSegmentation()
+    start_time = printer.time_estimator.get_time()
+
+    # act
+    printer.print_ccw(-10, 0, -10, 0, None, 1)
+
+    # assert
+    # 10 mm/s, nearly no slow down at the junctions of the 31 segments
+    assert(printer.time_estimator.get_time() - start_time) == pytest.approx(10 * math.pi / 10, abs=0.1)
+    assert(printer.extruder_physical.get()) == 1
+
+
+def test_print_cw_no_arc_straight_move():
+    # arrange
+    printer = PrinterModel()
+    printer.home(None, None)
+
+    # act
+    printer.print_cw(3, 4, None, None, None, 1)
+
+    # assert
+    assert(printer.position_x.get()) == 3
+    assert(printer.print_position_x.get_max()) == 3
+    assert(printer.print_position_y.get_max()) == 4
+
+
+def test_print_linear_move_time_estimated():
+    # arrange
+    printer = PrinterModel()
+    printer.home(None, None)
+    printer.set_feedrate(6000)
+    printer.time_estimator.set_default_acceleration("S", 1000)
+
+    # act
+    printer.move(None, None, 0.2)
+    printer.print_linear(100, None, None, 5)
+
+    # assert
+    assert(printer.time_estimator.get_time()) > 1
+    assert(printer.time_estimator.wait_time) == 0
+
+
+def test_print_linear_unknown_start_no_time():
+    # arrange
+    printer = PrinterModel()
+
+    # act
+    printer.print_linear(100, 100, None, None)
+
+    # assert
+    assert(printer.time_estimator.get_time()) == 0
@@ -1,4 +1,5 @@
 from PrinterModel import PrinterModel
+import math
 import pytest
 pytestmark = pytest.mark.unittests
 
@@ -6,34 +7,34 @@ pytestmark = pytest.mark.unittests
 def test_set_bed_temperature():
     # arrange
     printer = PrinterModel()
-    assert(printer.bed_temp.get()) == "?"
+    assert(math.isnan(printer.bed_temp.get()))
 
     # act
-    printer.set_bed_temperature("100")
+    printer.set_bed_temperature(100)
 
     # assert
-    assert(printer.bed_temp.get()) == "100"
+    assert(printer.bed_temp.get()) == 100
 
 
 def test_set_extruder_temperature():
     # arrange
     printer = PrinterModel()
-    assert(printer.extruder_temp.get()) == "?"
+    assert(math.isnan(printer.extruder_temp.get()))
 
     # act
-    printer.set_extruder_temperature("100")
+    printer.set_extruder_temperature(100)
 
     # assert
-    assert(printer.extruder_temp.get()) == "100"
+    assert(printer.extruder_temp.get()) == 100
 
 
 def test_set_fan():
     # arrange
     printer = PrinterModel()
-    assert(printer.fan.get()) == "?"
+    assert(math.isnan(printer.fan.get()))
 
     # act
-    printer.set_fan("100")
+    printer.set_fan(100)
 
     # assert
-    assert(printer.fan.get()) == "100"
+    assert(printer.fan.get()) == 100
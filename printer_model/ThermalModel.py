@@ -0,0 +1,183 @@
+# Simulate the heaters (extruder, bed) along the print timeline to get their duty and energy
+#
+# Each heater is a single heat capacity with a heat loss to the ambient proportional to the temperature
+# difference (the part cooling fan increases the loss of the extruder):
+#   heat_capacity * dT/dt = power - loss * (T - ambient)
+# The firmware control is simplified: full power until the target is reached, then just the power to hold it
+# (no overshoot), no power while cooling down.
+# The equation is solved exactly for the time between two events (target/fan change, wait, end of print),
+# so the simulation needs a single pass and constant memory.
+#
+# The time is taken from the PrintTimeEstimator (including the moves still buffered by its planner),
+# the heat-up waits (M109/M190) are added there as dwells.
+# The parameters of the heaters and the fan are rough values of a common 3d printer, each can be given to
+# the ThermalModel (see: gdecoder --extruder-heater, --bed-heater, ...).
+
+import math
+
+# rough values of a common 3d printer (2024)
+AMBIENT_TEMPERATURE = 20.0
+# extruder: 40 W cartridge, about 80 s from 20 °C to 200 °C, about 12 W to hold 200 °C
+# (max. power in W, heat capacity in J/K, heat loss in W/K, see: Heater)
+EXTRUDER_PARAMETERS = (40.0, 15.0, 0.067)
+# bed: 200 W, about 80 s from 20 °C to 60 °C, about 40 W to hold 60 °C
+BED_PARAMETERS = (200.0, 358.0, 1.0)
+# additional extruder heat loss (W/K) with the part cooling fan at full speed (255)
+FAN_LOSS = 0.05
+# energy price (€/kWh)
+ENERGY_PRICE = 0.30
+
+
+class Heater:
+    __slots__ = ("power", "heat_capacity", "loss", "target", "temperature", "time", "energy")
+
+    def __init__(self, power, heat_capacity, loss, ambient_temperature):
+        # max. heater power (W), heat capacity (J/K), heat loss (W/K)
+        self.power = power
+        self.heat_capacity = heat_capacity
+        self.loss = loss
+        # target temperature (°C), NaN: heater off
+        self.target = math.nan
+        self.temperature = ambient_temperature
+        # simulated until this time (s)
+        self.time = 0.0
+        # used energy (J)
+        self.energy = 0.0
+
+    def advance(self, time, ambient_temperature, extra_loss=0.0):
+        # simulate until the given time, the target and the losses didn't change in between
+        duration = time - self.time
+        if duration <= 0:
+            # hint: the time of the still buffered moves may get a bit shorter (see: PrintTimeEstimator.elapsed_time)
+            return
+        self.time = time
+        loss = self.loss + extra_loss
+        target = self.target if self.target > ambient_temperature else ambient_temperature
+
+        if self.temperature < target:
+            duration = self._heat(duration, target, ambient_temperature, loss)
+        if self.temperature > target:
+            duration = self._cool(duration, target, ambient_temperature, loss)
+        if duration > 0:
+            # hold the target
+            self.energy += min(self.power, loss * (target - ambient_temperature)) * duration
+
+    def time_to_reach_target(self, ambient_temperature, extra_loss=0.0):
+        # heat-up time (s) with full power, 0 if the target can't be reached at all (with these parameters)
+        loss = self.loss + extra_loss
+        final_temperature = ambient_temperature + self.power / loss
+        if not self.temperature < self.target or self.target >= final_temperature:
+            return 0.0
+        return self.heat_capacity / loss * math.log((final_temperature - self.temperature)
+                                                    / (final_temperature - self.target))
+
+    def _heat(self, duration, target, ambient_temperature, loss):
+        # full power, exponential approach to the final temperature (which may be above the target)
+        final_temperature = ambient_temperature + self.power / loss
+        reach = math.inf
+        if target < final_temperature:
+            reach = self.heat_capacity / loss * math.log((final_temperature - self.temperature)
+                                                         / (final_temperature - target))
+        heat_time = min(duration, reach)
+        self.energy += self.power * heat_time
+        if heat_time == reach:
+            self.temperature = target
+        else:
+            self.temperature = final_temperature + (self.temperature - final_temperature) * math.exp(
+                -loss * heat_time / self.heat_capacity)
+        return duration - heat_time
+
+    def _cool(self, duration, target, ambient_temperature, loss):
+        # no power, exponential approach to the ambient temperature
+        reach = math.inf
+        if target > ambient_temperature:
+            reach = self.heat_capacity / loss * math.log((self.temperature - ambient_temperature)
+                                                         / (target - ambient_temperature))
+        cool_time = min(duration, reach)
+        if cool_time == reach:
+            self.temperature = target
+        else:
+            self.temperature = ambient_temperature + (self.temperature - ambient_temperature) * math.exp(
+                -loss * cool_time / self.heat_capacity)
+        return duration - cool_time
+
+
+class ThermalModel:
+
+    def __init__(self, time_estimator, ambient_temperature=AMBIENT_TEMPERATURE, extruder_parameters=EXTRUDER_PARAMETERS,
+                 bed_parameters=BED_PARAMETERS, fan_loss=FAN_LOSS, energy_price=ENERGY_PRICE):
+        # heater parameters: (max. power in W, heat capacity in J/K, heat loss in W/K)
+        self.time_estimator = time_estimator
+        self.ambient_temperature = ambient_temperature
+        self.heaters = {
+            "extruder": Heater(*extruder_parameters, ambient_temperature),
+            "bed": Heater(*bed_parameters, ambient_temperature),
+        }
+        self.fan_loss = fan_loss
+        self.energy_price = energy_price
+        self.fan = 0.0
+
+    def _extra_loss(self, name):
+        return self.fan_loss * self.fan / 255 if name == "extruder" else 0.0
+
+    def _advance(self, name):
+        time = self.time_estimator.elapsed_time()
+        self.heaters[name].advance(time, self.ambient_temperature, self._extra_loss(name))
+
+    def set_target(self, name, value):
+        # M104/M140: heating starts, the motion continues
+        self._advance(name)
+        self.heaters[name].target = value
+
+    def wait_target(self, name, value):
+        # M109/M190: the motion stops until the target is reached
+        self.time_estimator.flush()
+        self.set_target(name, value)
+        heater = self.heaters[name]
+        self.time_estimator.dwell(heater.time_to_reach_target(self.ambient_temperature, self._extra_loss(name)))
+
+    def set_fan(self, value):
+        # M106/M107
+        self._advance("extruder")
+        self.fan = value
+
+    def get_state(self):
+        # fan, target, temperature and used energy of each heater, serializable (see: PrinterModel.get_state)
+        self.finish()
+        return {"fan": self.fan,
+                "heaters": {name: [heater.target, heater.temperature, heater.energy]
+                            for name, heater in self.heaters.items()}}
+
+    def set_state(self, state):
+        # the simulation continues from the current time (see: PrintTimeEstimator.set_state)
+        self.fan = state["fan"]
+        time = self.time_estimator.elapsed_time()
+        for name, (target, temperature, energy) in state["heaters"].items():
+            heater = self.heaters[name]
+            heater.target = target
+            heater.temperature = temperature
+            heater.energy = energy
+            heater.time = time
+
+    def reset_energy(self):
+        # the energy from now on
+        time = self.time_estimator.elapsed_time()
+        for heater in self.heaters.values():
+            heater.energy = 0.0
+            heater.time = time
+
+    def finish(self):
+        # simulate until the end of the print
+        for name in self.heaters:
+            self._advance(name)
+
+    def get_energy(self, name):
+        # energy (kWh)
+        return self.heaters[name].energy / 3600000
+
+    def get_duty(self, name):
+        # average duty (0-1) of the heater over the print, NaN if there's no print time
+        heater = self.heaters[name]
+        if heater.time <= 0:
+            return math.nan
+        return heater.energy / (heater.power * heater.time)
@@ -0,0 +1,223 @@
+from PrintTimeEstimator import PrintTimeEstimator
+from ThermalModel import Heater
+from ThermalModel import ThermalModel
+import math
+import pytest
+pytestmark = pytest.mark.unittests
+
+
+def create_heater():
+    # 100 W, 10 J/K, 0.5 W/K -> final temperature with full power: 220 °C
+    return Heater(100.0, 10.0, 0.5, 20.0)
+
+
+def test_heater_off_no_energy():
+    # arrange
+    heater = create_heater()
+
+    # act
+    heater.advance(100, 20.0)
+
+    # assert
+    assert(heater.energy) == 0
+    assert(heater.temperature) == 20
+
+
+def test_heater_heat_up_full_power():
+    # arrange
+    heater = create_heater()
+    heater.target = 120
+
+    # act
+    heater.advance(1, 20.0)
+
+    # assert
+    assert(heater.energy) == 100
+    assert(heater.temperature) == pytest.approx(220 - 200 * math.exp(-0.05))
+
+
+def test_heater_heat_up_and_hold():
+    # arrange
+    heater = create_heater()
+    heater.target = 120
+    # half way to the final temperature
+    heat_up_time = 20 * math.log(2)
+
+    # act
+    heater.advance(heat_up_time + 10, 20.0)
+
+    # assert
+    assert(heater.temperature) == pytest.approx(120)
+    # hold 120 °C: 0.5 W/K * 100 K
+    assert(heater.energy) == pytest.approx(100 * heat_up_time + 50 * 10)
+
+
+def test_heater_cool_down_no_energy():
+    # arrange
+    heater = create_heater()
+    heater.temperature = 120
+    heater.target = 70
+
+    # act
+    heater.advance(20 * math.log(2), 20.0)
+
+    # assert
+    assert(heater.temperature) == pytest.approx(70)
+    assert(heater.energy) == 0
+
+
+def test_heater_time_to_reach_target():
+    # arrange
+    heater = create_heater()
+    heater.target = 120
+
+    # act
+    time = heater.time_to_reach_target(20.0)
+
+    # assert
+    assert(time) == pytest.approx(20 * math.log(2))
+
+
+def test_heater_time_to_reach_unreachable_target_zero():
+    # arrange
+    heater = create_heater()
+    heater.target = 300
+
+    # act
+    time = heater.time_to_reach_target(20.0)
+
+    # assert
+    assert(time) == 0
+
+
+def test_wait_target_adds_heat_up_time():
+    # arrange
+    time_estimator = PrintTimeEstimator()
+    thermal_model = ThermalModel(time_estimator)
+
+    # act
+    thermal_model.wait_target("bed", 60)
+
+    # assert
+    assert(time_estimator.wait_time) == pytest.approx(80, abs=0.5)
+    assert(thermal_model.heaters["bed"].temperature) == pytest.approx(20)
+
+
+def test_wait_target_given_bed_parameters():
+    # arrange
+    time_estimator = PrintTimeEstimator()
+    # twice the power of the default bed
+    thermal_model = ThermalModel(time_estimator, bed_parameters=(400.0, 358.0, 1.0))
+
+    # act
+    thermal_model.wait_target("bed", 60)
+
+    # assert
+    assert(time_estimator.wait_time) == pytest.approx(358 * math.log(400 / 360), abs=0.01)
+    assert(time_estimator.wait_time) < 40
+
+
+def test_init_given_ambient_temperature_fan_loss_and_price():
+    # act
+    thermal_model = ThermalModel(PrintTimeEstimator(), ambient_temperature=25.0, fan_loss=0.1, energy_price=0.5)
+    thermal_model.fan = 255
+
+    # assert
+    assert(thermal_model.heaters["extruder"].temperature) == 25
+    assert(thermal_model._extra_loss("extruder")) == pytest.approx(0.1)
+    assert(thermal_model.energy_price) == 0.5
+
+
+def test_wait_target_heating_started_before_shorter():
+    # arrange
+    time_estimator = PrintTimeEstimator()
+    thermal_model = ThermalModel(time_estimator)
+
+    # act
+    thermal_model.set_target("bed", 60)
+    time_estimator.dwell(30)
+    thermal_model.wait_target("bed", 60)
+
+    # assert
+    # 30 s dwell + the rest of the heat-up
+    assert(time_estimator.wait_time) == pytest.approx(80, abs=0.5)
+
+
+def test_finish_energy_and_duty():
+    # arrange
+    time_estimator = PrintTimeEstimator()
+    thermal_model = ThermalModel(time_estimator)
+    thermal_model.wait_target("bed", 60)
+    time_estimator.dwell(100)
+
+    # act
+    thermal_model.finish()
+
+    # assert
+    bed = thermal_model.heaters["bed"]
+    assert(bed.temperature) == pytest.approx(60)
+    assert(thermal_model.get_energy("bed")) == pytest.approx(bed.energy / 3600000)
+    assert(thermal_model.get_duty("bed")) == pytest.approx(bed.energy / (200 * bed.time))
+    assert(math.isnan(thermal_model.get_duty("extruder"))) is False
+
+
+def test_get_duty_no_time_unknown():
+    # arrange
+    thermal_model = ThermalModel(PrintTimeEstimator())
+
+    # act
+    thermal_model.finish()
+
+    # assert
+    assert(math.isnan(thermal_model.get_duty("bed")))
+
+
+def test_set_fan_increases_extruder_energy():
+    # arrange
+    time_estimator = PrintTimeEstimator()
+    without_fan = ThermalModel(time_estimator)
+    with_fan = ThermalModel(time_estimator)
+    with_fan.set_fan(255)
+    for thermal_model in (without_fan, with_fan):
+        thermal_model.set_target("extruder", 200)
+    time_estimator.dwell(600)
+
+    # act
+    without_fan.finish()
+    with_fan.finish()
+
+    # assert
+    assert(with_fan.get_energy("extruder")) > without_fan.get_energy("extruder")
+
+
+def test_set_target_after_buffered_moves_timed():
+    # arrange
+    time_estimator = PrintTimeEstimator()
+    thermal_model = ThermalModel(time_estimator)
+    thermal_model.set_target("bed", 60)
+    # back and forth, about 500 s: less moves than the planner buffers
+    for index in range(500):
+        time_estimator.add_move(10 if index % 2 == 0 else -10, 0, 0, 0, 600)
+
+    # act
+    thermal_model.set_target("bed", 0)
+
+    # assert
+    assert(thermal_model.heaters["bed"].time) == pytest.approx(time_estimator.get_time())
+    assert(thermal_model.heaters["bed"].time) > 500
+    assert(thermal_model.get_energy("bed")) > 0
+
+
+def test_set_fan_after_buffered_moves_timed():
+    # arrange
+    time_estimator = PrintTimeEstimator()
+    thermal_model = ThermalModel(time_estimator)
+    thermal_model.set_target("extruder", 200)
+    for index in range(100):
+        time_estimator.add_move(10 if index % 2 == 0 else -10, 0, 0, 0, 600)
+
+    # act
+    thermal_model.set_fan(255)
+
+    # assert
+    assert(thermal_model.heaters["extruder"].time) == pytest.approx(time_estimator.get_time())